@@ -1,8 +1,33 @@
-import axios from 'axios';
+import axios, { type AxiosInstance } from 'axios';
 
 export const API_URL = import.meta.env.VITE_API_URL;
 export const api = axios.create({
   baseURL: API_URL,
 });
 
+// After a write the API answers with X-Primary-Until; sending it back keeps
+// our reads on the primary database until the replicas have our write. The
+// server compares it with its own clock, so it is sent as is.
+const PRIMARY_UNTIL_HEADER = 'X-Primary-Until';
+let primaryUntil: string | null = null;
 
+const stickToPrimaryAfterWrites = (instance: AxiosInstance) => {
+  instance.interceptors.request.use((config) => {
+    const url = config.baseURL ?? config.url ?? '';
+    if (primaryUntil && url.startsWith(API_URL)) {
+      config.headers.set(PRIMARY_UNTIL_HEADER, primaryUntil);
+    }
+    return config;
+  });
+  instance.interceptors.response.use((response) => {
+    const until = response.headers[PRIMARY_UNTIL_HEADER.toLowerCase()];
+    if (until) {
+      primaryUntil = until;
+    }
+    return response;
+  });
+};
+
+// The pages call axios directly with API_URL, the apis/ modules go through `api`
+stickToPrimaryAfterWrites(api);
+stickToPrimaryAfterWrites(axios);
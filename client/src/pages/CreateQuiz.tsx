@@ -364,8 +364,9 @@ const handleImageUpload = async (file: File) => {
     }
 
     try {
-      for (const question of questions) {
-        await axios.post(`${API_URL}/api/quizzes/${createdQuiz.id}/questions`, {
+      // One request and one transaction for every question
+      await axios.post(`${API_URL}/api/quizzes/${createdQuiz.id}/questions/batch`, {
+        add: questions.map(question => ({
           text: question.text,
           question_type: question.question_type,
           options: question.question_type === 'multiple_choice' ? question.options : [],
@@ -377,8 +378,8 @@ const handleImageUpload = async (file: File) => {
             type: m.type,
             size: m.size
           })) || []
-        });
-      }
+        }))
+      });
 
       toast.current?.show({
         severity: 'success',
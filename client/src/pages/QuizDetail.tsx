@@ -36,22 +36,48 @@ interface Quiz {
   questions: Question[];
 }
 
+// One row of GET /api/quizzes/:id/responses
 interface QuizAttempt {
-  id: string;
+  attempt_id: string;
   user_name: string;
-  score: number;
+  user_email: string;
+  user_phone: string | null;
+  submitted_at: string;
+  points_earned: number;
   total_points: number;
+  correct_answers: number;
+  total_questions: number;
   percentage: number;
-  completed_at: string;
-  time_taken: number; // in minutes
 }
 
+interface QuizResponsesPage {
+  quiz_id: string;
+  quiz_title: string;
+  total_attempts: number;
+  user_responses: QuizAttempt[];
+  next_cursor: string | null;
+}
+
+// GET /api/quizzes/:id/stats, computed over every attempt
+interface QuizStats {
+  attempts: number;
+  mean_percentage: number | null;
+  percentiles: Record<string, number | null>;
+  histogram: { min_percentage: number; max_percentage: number; attempts: number }[];
+}
+
+const ATTEMPTS_PAGE_SIZE = 50;
+
 const QuizDetail = () => {
   const { quizId } = useParams<{ quizId: string }>();
   const navigate = useNavigate();
   const [quiz, setQuiz] = useState<Quiz | null>(null);
   const [loading, setLoading] = useState(true);
   const [quizAttempts, setQuizAttempts] = useState<QuizAttempt[]>([]);
+  const [totalAttempts, setTotalAttempts] = useState(0);
+  const [attemptsCursor, setAttemptsCursor] = useState<string | null>(null);
+  const [loadingMoreAttempts, setLoadingMoreAttempts] = useState(false);
+  const [quizStats, setQuizStats] = useState<QuizStats | null>(null);
   const [showQuestionDialog, setShowQuestionDialog] = useState(false);
   const [editingQuestion, setEditingQuestion] = useState<Question | null>(null);
   const [questionForm, setQuestionForm] = useState({
@@ -73,6 +99,7 @@ const QuizDetail = () => {
   useEffect(() => {
     if (quiz) {
       fetchQuizAttempts();
+      fetchQuizStats();
     }
   }, [quiz]);
 
@@ -93,27 +120,18 @@ const QuizDetail = () => {
     }
   };
 
+  const fetchAttemptsPage = async (cursor?: string) => {
+    const response = await axios.get<QuizResponsesPage>(`${API_URL}/api/quizzes/${quizId}/responses`, {
+      params: { limit: ATTEMPTS_PAGE_SIZE, cursor }
+    });
+    setTotalAttempts(response.data.total_attempts);
+    setAttemptsCursor(response.headers['x-next-cursor'] ?? null);
+    return response.data.user_responses;
+  };
+
   const fetchQuizAttempts = async () => {
     try {
-      const response = await axios.get(`${API_URL}/api/quizzes/${quizId}/responses`);
-      const data = response.data;
-      
-      // Transform API data to match our interface
-      console.log('data: ',data);
-      console.log('response: ',response);
-      const transformedAttempts = data.user_responses 
-      // console.log('quiz responses: ',quizId, data.user_responses.filter((userResponse: any) => userResponse.quiz_id === quizId));
-      // const transformedAttempts: QuizAttempt[] = data.user_responses.filter((userResponse: any) => userResponse.quiz_id === quizId).map((userResponse: any, index: number) => ({
-      //   id: (index + 1).toString(),
-      //   user_name: userResponse.user_name,
-      //   score: userResponse.points_earned,
-      //   total_points: getTotalPoints(),
-      //   percentage: (userResponse.points_earned / getTotalPoints()) * 100,
-      //   completed_at: userResponse.submitted_at,
-      //   time_taken: Math.floor(Math.random() * 20) + 5 // Mock time for now
-      // }));
-      
-      setQuizAttempts(transformedAttempts);
+      setQuizAttempts(await fetchAttemptsPage());
     } catch (error) {
       console.error('Failed to fetch quiz attempts:', error);
       // Fallback to empty array if API fails
@@ -121,6 +139,34 @@ const QuizDetail = () => {
     }
   };
 
+  const loadMoreAttempts = async () => {
+    if (!attemptsCursor) return;
+    try {
+      setLoadingMoreAttempts(true);
+      const page = await fetchAttemptsPage(attemptsCursor);
+      setQuizAttempts(prev => [...prev, ...page]);
+    } catch (error) {
+      toast.current?.show({
+        severity: 'error',
+        summary: 'Error',
+        detail: 'Failed to fetch more attempts',
+        life: 3000
+      });
+    } finally {
+      setLoadingMoreAttempts(false);
+    }
+  };
+
+  const fetchQuizStats = async () => {
+    try {
+      const response = await axios.get<QuizStats>(`${API_URL}/api/quizzes/${quizId}/stats`);
+      setQuizStats(response.data);
+    } catch (error) {
+      console.error('Failed to fetch quiz stats:', error);
+      setQuizStats(null);
+    }
+  };
+
   const copyShareCode = (shareCode: string) => {
     navigator.clipboard.writeText(shareCode);
     toast.current?.show({
@@ -147,17 +193,10 @@ const QuizDetail = () => {
     return quiz.questions.reduce((sum, q) => sum + q.points, 0);
   };
 
-  const getAverageScore = () => {
-    if (quizAttempts.length === 0) return 0;
-    const totalPercentage = quizAttempts.reduce((sum, attempt) => sum + attempt.percentage, 0);
-    return Math.round(totalPercentage / quizAttempts.length);
-  };
+  // Averages and the distribution come from /stats, so they cover attempts not loaded into the table
+  const getAverageScore = () => Math.round(quizStats?.mean_percentage ?? 0);
 
-  const getAverageTime = () => {
-    if (quizAttempts.length === 0) return 0;
-    const totalTime = quizAttempts.reduce((sum, attempt) => sum + attempt.time_taken, 0);
-    return Math.round(totalTime / quizAttempts.length);
-  };
+  const getMedianScore = () => quizStats?.percentiles.p50 ?? 0;
 
   const getScoreDistribution = () => {
     const distribution = {
@@ -168,12 +207,12 @@ const QuizDetail = () => {
       'Below 60%': 0
     };
 
-    quizAttempts.forEach(attempt => {
-      if (attempt.percentage >= 90) distribution['90-100%']++;
-      else if (attempt.percentage >= 80) distribution['80-89%']++;
-      else if (attempt.percentage >= 70) distribution['70-79%']++;
-      else if (attempt.percentage >= 60) distribution['60-69%']++;
-      else distribution['Below 60%']++;
+    quizStats?.histogram.forEach(bin => {
+      if (bin.min_percentage >= 90) distribution['90-100%'] += bin.attempts;
+      else if (bin.min_percentage >= 80) distribution['80-89%'] += bin.attempts;
+      else if (bin.min_percentage >= 70) distribution['70-79%'] += bin.attempts;
+      else if (bin.min_percentage >= 60) distribution['60-69%'] += bin.attempts;
+      else distribution['Below 60%'] += bin.attempts;
     });
 
     return distribution;
@@ -219,10 +258,6 @@ const QuizDetail = () => {
     setShowQuestionDialog(true);
   };
 
-  useEffect(() => {
-    console.log('quiz attempts: ',quizAttempts);
-  }, [quizAttempts]);
-
 
   const handleQuestionSubmit = async () => {
     if (!quiz || !questionForm.text.trim() || !questionForm.correct_answer.trim()) {
@@ -356,7 +391,7 @@ const QuizDetail = () => {
 
   const totalPoints = getTotalPoints();
   const averageScore = getAverageScore();
-  const averageTime = getAverageTime();
+  const medianScore = getMedianScore();
   const scoreDistribution = getScoreDistribution();
   return (
     <div className="max-w-7xl mx-auto">
@@ -407,7 +442,7 @@ const QuizDetail = () => {
       {/* Statistics Overview */}
       <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-4 gap-6 mb-8">
         <Card className="text-center">
-          <div className="text-3xl font-bold text-blue-600 mb-2">{quizAttempts.length}</div>
+          <div className="text-3xl font-bold text-blue-600 mb-2">{totalAttempts}</div>
           <div className="text-gray-600">Total Attempts</div>
         </Card>
         
@@ -417,8 +452,8 @@ const QuizDetail = () => {
         </Card>
         
         <Card className="text-center">
-          <div className="text-3xl font-bold text-purple-600 mb-2">{averageTime} min</div>
-          <div className="text-gray-600">Average Time</div>
+          <div className="text-3xl font-bold text-purple-600 mb-2">{medianScore}%</div>
+          <div className="text-gray-600">Median Score</div>
         </Card>
         
         <Card className="text-center">
@@ -506,10 +541,10 @@ const QuizDetail = () => {
           >
             <Column field="user_name" header="User" sortable />
             <Column 
-              field="score" 
+              field="points_earned" 
               header="Score" 
               sortable 
-              body={(rowData) => `${rowData.score}/${rowData.total_points}`}
+              body={(rowData) => `${rowData.points_earned}/${rowData.total_points}`}
             />
             <Column 
               field="percentage" 
@@ -523,19 +558,25 @@ const QuizDetail = () => {
               )}
             />
             <Column 
-              field="time_taken" 
-              header="Time Taken" 
-              sortable 
-              body={(rowData) => `${rowData.time_taken} min`}
-            />
-            <Column 
-              field="completed_at" 
+              field="submitted_at" 
               header="Completed" 
               sortable 
-              body={(rowData) => formatDate(rowData.completed_at)}
+              body={(rowData) => formatDate(rowData.submitted_at)}
             />
           </DataTable>
         )}
+
+        {attemptsCursor && (
+          <div className="flex justify-center mt-4">
+            <Button
+              label={`Load More (${quizAttempts.length} of ${totalAttempts})`}
+              icon="pi pi-angle-down"
+              onClick={loadMoreAttempts}
+              loading={loadingMoreAttempts}
+              className="p-button-outlined"
+            />
+          </div>
+        )}
       </Card>
 
       {/* Question Add/Edit Dialog */}
@@ -25,12 +25,18 @@ interface Quiz {
   share_code: string;
   user_id: string;
   created_at: string;
-  questions: Question[];
+  question_count: number;
+  questions?: Question[];
 }
 
+const PAGE_SIZE = 20;
+const QUIZ_LIST_FIELDS = 'id,title,description,is_public,share_code,user_id,created_at,question_count';
+
 const QuizList = () => {
   const [quizzes, setQuizzes] = useState<Quiz[]>([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const navigate = useNavigate();
   const toast = useRef<Toast>(null);
   const { user } = useAuth();
@@ -38,18 +44,25 @@ const QuizList = () => {
     fetchQuizzes();
   }, []);
 
+  const fetchQuizPage = async (cursor?: string) => {
+    const response = await axios.get(`${API_URL}/api/quizzes`, {
+      params: {
+        user_id: user?.id,
+        limit: PAGE_SIZE,
+        fields: QUIZ_LIST_FIELDS,
+        cursor
+      }
+    });
+    setNextCursor(response.headers['x-next-cursor'] ?? null);
+    return response.data as Quiz[];
+  };
+
   const fetchQuizzes = async () => {
     try {
       setLoading(true);
       // For demo purposes, using a mock user ID
       // const mockUserId = 'a5140530-3ed6-4b97-ae3b-75c61744c7ad';
-      const response = await axios.get(`${API_URL}/api/quizzes`, {
-        params: {
-          user_id: user?.id
-        }
-      });
-      console.log(response.data);
-      setQuizzes(response.data);
+      setQuizzes(await fetchQuizPage());
     } catch (error) {
       toast.current?.show({
         severity: 'error',
@@ -62,6 +75,24 @@ const QuizList = () => {
     }
   };
 
+  const loadMoreQuizzes = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await fetchQuizPage(nextCursor);
+      setQuizzes(prev => [...prev, ...page]);
+    } catch (error) {
+      toast.current?.show({
+        severity: 'error',
+        summary: 'Error',
+        detail: 'Failed to fetch more quizzes',
+        life: 3000
+      });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const deleteQuiz = async (quizId: string) => {
     try {
       await axios.delete(`${API_URL}/api/quizzes/${quizId}`);
@@ -122,7 +153,7 @@ const QuizList = () => {
                   severity={quiz.is_public ? 'success' : 'warning'}
                 />
                 <span className="text-sm text-gray-500">
-                  {quiz?.questions?.length} questions
+                  {quiz.question_count} questions
                 </span>
               </div>
             </div>
@@ -218,6 +249,18 @@ const QuizList = () => {
             rows={5}
             className="bg-white rounded-lg shadow-sm"
           />
+
+          {nextCursor && (
+            <div className="flex justify-center mt-4">
+              <Button
+                label="Load More"
+                icon="pi pi-angle-down"
+                onClick={loadMoreQuizzes}
+                loading={loadingMore}
+                className="p-button-outlined"
+              />
+            </div>
+          )}
         </div>
       )}
     </div>
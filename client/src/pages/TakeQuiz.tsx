@@ -58,6 +58,8 @@ const TakeQuiz = () => {
   const [score, setScore] = useState(0);
   const [totalPoints, setTotalPoints] = useState(0);
   const [showResults, setShowResults] = useState(false);
+  // Sent with the submission so a retried request is recorded only once
+  const [attemptKey, setAttemptKey] = useState(() => crypto.randomUUID());
   const toast = useRef<Toast>(null);
 
   useEffect(() => {
@@ -144,6 +146,8 @@ const TakeQuiz = () => {
         user_email: userInfo.email,
         user_phone: userInfo.phone,
         responses: responsesData
+      }, {
+        headers: { 'Idempotency-Key': attemptKey }
       });
 
       console.log('Quiz responses submitted:', response.data);
@@ -170,6 +174,7 @@ const TakeQuiz = () => {
   };
 
   const restartQuiz = () => {
+    setAttemptKey(crypto.randomUUID());
     setCurrentQuestionIndex(0);
     setAnswers(quiz?.questions.map(q => ({ questionId: q.id, answer: '' })) || []);
     // setQuizCompleted(false);
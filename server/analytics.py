@@ -0,0 +1,128 @@
+"""
+Per-question item analysis for a quiz.
+
+A quiz's graded answers are read in batches from a server-side cursor into
+columns (NumPy arrays), and every statistic is computed with whole-array
+operations over those columns:
+
+- percent correct per question
+- how often each distinct answer was chosen per question
+- discrimination index: the share of the top 27% of attempts (by overall
+  percentage) that got the question right, minus the share of the bottom 27%
+"""
+
+import numpy as np
+
+# Kelley's classic split for the upper and lower scoring groups
+DISCRIMINATION_GROUP_FRACTION = 0.27
+
+
+class ResponseColumns:
+    """A quiz's graded answers as parallel arrays, one entry per answer"""
+
+    def __init__(self, attempt_ids, attempt_scores, question_ids, answers, is_correct):
+        self.attempt_ids = attempt_ids
+        self.attempt_scores = attempt_scores
+        self.question_ids = question_ids
+        self.answers = answers
+        self.is_correct = is_correct
+
+    def __len__(self):
+        return len(self.is_correct)
+
+
+def columns_from_batches(batches):
+    """Transpose batches of (attempt_id, percentage, question_id, answer, is_correct) rows into columns"""
+    columns = [[], [], [], [], []]
+    for batch in batches:
+        if not batch:
+            continue
+        for column, values in zip(columns, zip(*batch)):
+            column.append(np.array(values, dtype=object))
+
+    def join(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.array([], dtype=dtype)
+
+    return ResponseColumns(
+        attempt_ids=join(columns[0], object),
+        attempt_scores=join(columns[1], float),
+        question_ids=join(columns[2], object),
+        answers=join(columns[3], str),
+        is_correct=join(columns[4], bool)
+    )
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+
+
+def _scoring_groups(attempt_codes, attempt_scores, attempt_count):
+    """Boolean masks over answers for the upper and lower scoring groups of attempts"""
+    scores = np.zeros(attempt_count)
+    scores[attempt_codes] = attempt_scores
+    group_size = int(round(attempt_count * DISCRIMINATION_GROUP_FRACTION))
+    if group_size == 0:
+        return np.zeros(len(attempt_codes), dtype=bool), np.zeros(len(attempt_codes), dtype=bool)
+    ranked = np.argsort(scores, kind='stable')
+    in_lower = np.zeros(attempt_count, dtype=bool)
+    in_upper = np.zeros(attempt_count, dtype=bool)
+    in_lower[ranked[:group_size]] = True
+    in_upper[ranked[-group_size:]] = True
+    return in_upper[attempt_codes], in_lower[attempt_codes]
+
+
+def _optional(value, digits=2):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def item_analysis(columns, question_ids):
+    """Statistics for each of `question_ids` (in that order) from a quiz's response columns"""
+    question_count = len(question_ids)
+    question_index = {question_id: i for i, question_id in enumerate(question_ids)}
+    # Answers to questions that have since been deleted are left out
+    seen_questions, question_inverse = np.unique(columns.question_ids, return_inverse=True)
+    codes = np.array([question_index.get(q, -1) for q in seen_questions], dtype=int)
+    question_codes = codes[question_inverse]
+    known = question_codes >= 0
+    question_codes = question_codes[known]
+    is_correct = columns.is_correct[known]
+    answers = columns.answers[known]
+    attempt_ids, attempt_codes = np.unique(columns.attempt_ids[known], return_inverse=True)
+    attempt_scores = columns.attempt_scores[known]
+
+    responses = np.bincount(question_codes, minlength=question_count)
+    correct = np.bincount(question_codes, weights=is_correct, minlength=question_count)
+    percent_correct = _ratio(correct * 100, responses)
+
+    upper, lower = _scoring_groups(attempt_codes, attempt_scores, len(attempt_ids))
+    upper_rate = _ratio(
+        np.bincount(question_codes[upper], weights=is_correct[upper], minlength=question_count),
+        np.bincount(question_codes[upper], minlength=question_count)
+    )
+    lower_rate = _ratio(
+        np.bincount(question_codes[lower], weights=is_correct[lower], minlength=question_count),
+        np.bincount(question_codes[lower], minlength=question_count)
+    )
+    discrimination = upper_rate - lower_rate
+
+    # Count each distinct (question, answer) pair in one pass
+    answer_values, answer_codes = np.unique(answers, return_inverse=True)
+    pair_codes = question_codes.astype(np.int64) * max(len(answer_values), 1) + answer_codes
+    pairs, pair_counts = np.unique(pair_codes, return_counts=True)
+    options = [[] for _ in range(question_count)]
+    for pair, count in zip(pairs.tolist(), pair_counts.tolist()):
+        question, answer = divmod(pair, max(len(answer_values), 1))
+        options[question].append({
+            'answer': str(answer_values[answer]),
+            'count': count,
+            'percentage': round(count * 100 / int(responses[question]), 2)
+        })
+
+    return [{
+        'question_id': question_id,
+        'responses': int(responses[i]),
+        'percent_correct': _optional(percent_correct[i]),
+        'discrimination_index': _optional(discrimination[i], 3),
+        'options': sorted(options[i], key=lambda option: (-option['count'], option['answer']))
+    } for i, question_id in enumerate(question_ids)]
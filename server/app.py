@@ -1,73 +1,130 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, current_app, request, jsonify, stream_with_context
+from flask.cli import AppGroup
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+import functools
+import hmac
+import io
+import weakref
 import uuid
+import atexit
+import time
 import click
 from flask_cors import CORS
-from sqlalchemy import text
+from sqlalchemy import text, insert, delete, func, select, case, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy import inspect as sa_inspect
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from flask import g
 import os
-from flask_migrate import Migrate
+from flask_migrate import Migrate, stamp as migrate_stamp, upgrade as migrate_upgrade
+from grading import build_answer_key, grade_responses
+from cache import LRUCache, PayloadCache, RedisBackend, make_payload
+from log_config import configure_logging
+from metrics import init_metrics
+from pooling import database_uri, engine_options, init_pool_liveness, pool_profile, pool_stats
+from query_budget import init_query_budget, query_budget
+from replicas import STICKY_HEADER, RoutingSession, init_replicas, primary_reads, read_replica, replica_binds
+from serialization import (
+    EVENT, JSONProvider, LEADERBOARD_ENTRY, PUBLIC_QUESTION, QUESTION, QUIZ, QUIZ_ATTEMPT, QUIZ_LISTING, USER, dumps
+)
+from stats import count_percentages, parse_leaderboard_size, score_summary
+from share_codes import ShareCodeAllocator
+from quiz_transfer import (
+    IMPORT_BATCH_SIZE, batched_records, encode_quizzes, iter_quiz_records, quiz_record_error, read_quizzes
+)
+from analytics import columns_from_batches, item_analysis
+from seeding import SEED_BATCH_SIZE, SeedPlan, generate
+from ingestion import Flusher, QueueFull, SubmissionQueue
+from export import EXPORT_FORMATS, EXPORT_BATCH_SIZE, RESPONSE_EXPORT_FIELDS, iter_export
+from pagination import (
+    PaginationError, NEXT_CURSOR_HEADER, parse_page_args, parse_fields, paginate, page_response
+)
 
 # from faker import Faker
 
-app = Flask(__name__)
-def init_app(app):
-    db.init_app(app)
-    # TODO: Uncomment this when we have a model
-    with app.app_context():
-        db.create_all()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate(directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
+import logging
 
-def get_db(app):
-    if 'db' not in g:
-        g.db = create_engine(os.getenv("LOCAL_SQLALCHEMY_DATABASE_URI"))
-        g.db.init_app(app)
-    return g.db
+configure_logging()
+logger = logging.getLogger('quizzy')
+grading_logger = logging.getLogger('quizzy.grading')
 
-db = SQLAlchemy()
-import logging
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
 
-logging.getLogger('sqlalchemy.engine').setLevel(logging.DEBUG)
-logging.getLogger('sqlalchemy.pool').setLevel(logging.DEBUG)
+# Routes and CLI commands are collected here and added to each app built by create_app()
+routes = []
+cli = AppGroup()
 
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI')
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_size': 5,           # Connections per worker
-    'max_overflow': 10,       # Extra connections if needed
-    'pool_timeout': 30,       # Timeout for getting a connection
-    'pool_pre_ping': True     # Check connection health
-}
+def route(rule, **options):
+    """Like app.route; the view keeps its plain endpoint name, which metrics and query budgets are keyed on"""
+    def register(view):
+        routes.append((rule, view, options))
+        return view
+    return register
 
-@app.cli.command("init-db")
+@cli.command("init-db")
 def init_db():
     """Initialize the database and create all tables."""
-    with app.app_context():
-        db.create_all()
+    db.create_all()
     print("Database initialized and tables created.")
 
+def schema_problems():
+    """Ways the database differs from the models and migrations; empty when it is up to date"""
+    problems = []
+    existing = set(sa_inspect(db.engine).get_table_names())
+    missing = sorted(table for table in db.metadata.tables if table not in existing)
+    if missing:
+        problems.append(f"missing tables: {', '.join(missing)}")
+    
+    head = ScriptDirectory.from_config(migrate.get_config()).get_current_head()
+    with db.engine.connect() as conn:
+        current = MigrationContext.configure(conn).get_current_revision()
+    if current != head:
+        problems.append(f"database is at migration {current or 'none'}, the latest is {head}")
+    return problems
+
+@cli.command("prepare-db")
+def prepare_db():
+    """Create the schema on an empty database, or apply pending migrations to an existing one"""
+    if not sa_inspect(db.engine).get_table_names():
+        # The migrations start from the original tables, so a fresh database gets the current models and skips them
+        db.create_all()
+        migrate_stamp()
+        click.echo("✅ Created the database schema")
+    else:
+        migrate_upgrade()
+        click.echo("✅ Database schema is up to date")
+
+@cli.command("check-schema")
+def check_schema():
+    """Exit with an error unless the database schema is up to date (run `flask db upgrade` to fix)"""
+    problems = schema_problems()
+    for problem in problems:
+        click.echo(f"❌ {problem}")
+    if problems:
+        raise SystemExit(1)
+    click.echo("✅ Database schema is up to date")
+
+# Submission retries send the same key and are told when a stored result was replayed
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENT_REPLAY_HEADER = 'Idempotent-Replayed'
+
+# API CORS settings, shared with the async handlers in asgi.py
+API_CORS_ORIGINS = [
+    'https://quizzy-three-orcin.vercel.app',
+    'http://localhost:5173',
+    # 'http://localhost:3000'
+]
+API_CORS_METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+API_CORS_ALLOW_HEADERS = ["Content-Type", "Authorization", IDEMPOTENCY_KEY_HEADER, STICKY_HEADER]
+API_CORS_EXPOSE_HEADERS = [NEXT_CURSOR_HEADER, IDEMPOTENT_REPLAY_HEADER, STICKY_HEADER]
+
 CLIENT_URL = load_dotenv('CLIENT_URL')
-CORS(app, resources={
-    # Health endpoints - allow ANY origin (*)
-    r"/health/*": {
-        "origins": "*",
-        "methods": ["GET", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"]
-    },
-    # All other endpoints - only specific client URLs
-    r"/api/*": {
-        "origins": [
-            'https://quizzy-three-orcin.vercel.app',
-            'http://localhost:5173',
-            # 'http://localhost:3000'
-        ],
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
-        # "supports_credentials": True  # Allow cookies/auth headers
-    },
-})
 
 
 # Models
@@ -98,6 +155,12 @@ class Quiz(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
     questions = db.relationship('Question', backref='quiz', lazy=True, cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        # Public listing and a user's own quizzes, both paginated on (created_at, id)
+        db.Index('ix_quiz_is_public_created_at', 'is_public', 'created_at', 'id'),
+        db.Index('ix_quiz_user_id_created_at', 'user_id', 'created_at', 'id'),
+    )
 
 class Question(db.Model):
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -108,30 +171,202 @@ class Question(db.Model):
     points = db.Column(db.Integer, default=1)
     order = db.Column(db.Integer, default=0)
     quiz_id = db.Column(db.String(36), db.ForeignKey('quiz.id'), nullable=False)
+    
+    __table_args__ = (
+        # Answer keys, question lists and counts are all read per quiz in order
+        db.Index('ix_question_quiz_id_order', 'quiz_id', 'order'),
+    )
 
-class QuizResponse(db.Model):
+class QuizAttempt(db.Model):
+    """One submission of a quiz, with its score computed at grade time"""
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     quiz_id = db.Column(db.String(36), db.ForeignKey('quiz.id'), nullable=False)
-    question_id = db.Column(db.String(36), db.ForeignKey('question.id'), nullable=False)
     user_name = db.Column(db.String(100), nullable=False)
     user_email = db.Column(db.String(120), nullable=False)
     user_phone = db.Column(db.String(20))  # Optional
+    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
+    total_questions = db.Column(db.Integer, nullable=False, default=0)
+    correct_answers = db.Column(db.Integer, nullable=False, default=0)
+    points_earned = db.Column(db.Integer, nullable=False, default=0)
+    total_points = db.Column(db.Integer, nullable=False, default=0)  # Points available for the answered questions
+    percentage = db.Column(db.Integer, nullable=False, default=0)
+    idempotency_key = db.Column(db.String(100))  # Client-supplied key for retried submissions
+    
+    # Relationships
+    quiz = db.relationship('Quiz', backref=db.backref('attempts', cascade='all, delete-orphan'))
+    answers = db.relationship('QuizResponse', backref='attempt', lazy=True, cascade='all, delete-orphan')
+    
+    __table_args__ = (
+        # Owner's responses view: attempts of a quiz, newest first
+        db.Index('ix_quiz_attempt_quiz_id_submitted_at', 'quiz_id', 'submitted_at'),
+        # Attempts made by an email, checked when deleting a user
+        db.Index('ix_quiz_attempt_user_email', 'user_email'),
+        # A retried submission finds the attempt it already created
+        db.Index('uq_quiz_attempt_quiz_id_idempotency_key', 'quiz_id', 'idempotency_key', unique=True),
+    )
+
+class QuizResponse(db.Model):
+    """A single graded answer belonging to a QuizAttempt"""
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    attempt_id = db.Column(db.String(36), db.ForeignKey('quiz_attempt.id'), nullable=False, index=True)
+    quiz_id = db.Column(db.String(36), db.ForeignKey('quiz.id'), nullable=False)
+    question_id = db.Column(db.String(36), db.ForeignKey('question.id'), nullable=False)
     answer = db.Column(db.String(500), nullable=False)
     is_correct = db.Column(db.Boolean, nullable=False)
     points_earned = db.Column(db.Integer, default=0)
-    submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
-    quiz = db.relationship('Quiz', backref='responses')
-    question = db.relationship('Question', backref='responses')
+    quiz = db.relationship('Quiz', backref=db.backref('responses', cascade='all, delete-orphan'))
+    question = db.relationship('Question', backref=db.backref('responses', cascade='all, delete-orphan'))
+    
+    __table_args__ = (
+        # Exports and per-question analysis scan a quiz's answers
+        db.Index('ix_quiz_response_quiz_id_question_id', 'quiz_id', 'question_id'),
+    )
+
+class QuizScoreBucket(db.Model):
+    """How many attempts of a quiz scored a given percentage, updated with every attempt written"""
+    quiz_id = db.Column(db.String(36), db.ForeignKey('quiz.id'), primary_key=True)
+    percentage = db.Column(db.Integer, primary_key=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Relationships
+    quiz = db.relationship('Quiz', backref=db.backref('score_buckets', cascade='all, delete-orphan'))
+
+class ShareCodeCounter(db.Model):
+    """Single-row counter from which share code numbers are reserved in blocks"""
+    id = db.Column(db.Integer, primary_key=True)
+    next_value = db.Column(db.BigInteger, nullable=False, default=0)
+
+# Leaderboard: a quiz's attempts in rank order, so the top N is read straight off the index
+db.Index(
+    'ix_quiz_attempt_leaderboard',
+    QuizAttempt.quiz_id, QuizAttempt.percentage.desc(), QuizAttempt.points_earned.desc(), QuizAttempt.submitted_at
+)
+
+# Normalized answer keys per quiz, shared by every submission in this worker
+answer_key_cache = LRUCache(
+    max_size=int(os.getenv('ANSWER_KEY_CACHE_SIZE', 1024)),
+    ttl=int(os.getenv('ANSWER_KEY_CACHE_TTL', 300))
+)
+
+def load_answer_key(quiz_id):
+    """Load the answer key for a quiz with a single query"""
+    rows = db.session.query(
+        Question.id, Question.correct_answer, Question.points
+    ).filter(Question.quiz_id == quiz_id).all()
+    return build_answer_key(rows)
+
+# Serialized quiz payloads served by get_quiz and get_quiz_by_share_code
+quiz_payload_cache = PayloadCache(
+    LRUCache(
+        max_size=int(os.getenv('QUIZ_PAYLOAD_CACHE_SIZE', 512)),
+        ttl=int(os.getenv('QUIZ_PAYLOAD_CACHE_TTL', 60))
+    ),
+    shared=RedisBackend(os.getenv('QUIZ_PAYLOAD_CACHE_REDIS_URL')) if os.getenv('QUIZ_PAYLOAD_CACHE_REDIS_URL') else None,
+    namespace='quiz-payload'
+)
+
+# Share codes never change, so their quiz id is kept until the quiz is deleted
+share_code_cache = LRUCache(max_size=int(os.getenv('QUIZ_PAYLOAD_CACHE_SIZE', 512)) * 4, ttl=None)
+
+# Per-question analysis, reused until the quiz gets new attempts or is edited
+item_analysis_cache = LRUCache(
+    max_size=int(os.getenv('ITEM_ANALYSIS_CACHE_SIZE', 256)),
+    ttl=int(os.getenv('ITEM_ANALYSIS_CACHE_TTL', 3600))
+)
+
+def invalidate_quiz_caches(quiz_id):
+    """Drop cached data for a quiz after the quiz or its questions change"""
+    answer_key_cache.invalidate(quiz_id)
+    quiz_payload_cache.invalidate(quiz_id)
+    item_analysis_cache.invalidate(quiz_id)
 
-# Helper function to generate share codes
-def generate_share_code():
-    import random
-    import string
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
+def load_quiz_payload(quiz_id):
+    """Serialize a quiz and its questions once, for every reader that follows"""
+    quiz = db.session.execute(select(*QUIZ.columns(Quiz)).where(Quiz.id == quiz_id)).first()
+    if not quiz:
+        return None
+    
+    questions = db.session.execute(
+        select(*PUBLIC_QUESTION.columns(Question)).where(Question.quiz_id == quiz_id).order_by(Question.order)
+    ).all()
+    return quiz_payload(quiz, questions)
+
+def quiz_payload(quiz, questions):
+    """Cacheable payload for a quiz and its questions in order; ORM objects or rows of the schemas' columns"""
+    return make_payload(dumps({**QUIZ.dump(quiz), 'questions': PUBLIC_QUESTION.dump_many(questions)}))
+
+def quiz_payload_response(quiz_id):
+    """Serve a quiz payload from cache, answering If-None-Match with 304"""
+    payload = quiz_payload_cache.get(quiz_id)
+    if payload is None:
+        # Cached until the quiz changes, so never fill it from a replica that may not have the change yet
+        with primary_reads():
+            payload = load_quiz_payload(quiz_id)
+        if payload is None:
+            return jsonify({'error': 'Quiz not found'}), 404
+        quiz_payload_cache.set(quiz_id, payload)
+    
+    response = Response(payload.body, mimetype='application/json')
+    response.set_etag(payload.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+# Fields a client can ask for with ?fields= on the listing endpoints
+USER_LIST_FIELDS = ['id', 'username', 'email', 'created_at']
+QUIZ_LIST_FIELDS = ['id', 'title', 'description', 'is_public', 'share_code', 'user_id', 'created_at', 'question_count']
+
+def reserve_share_code_block(size):
+    """Advance the share code counter by `size` in its own transaction; returns the first reserved value"""
+    counter = ShareCodeCounter.__table__
+    for _ in range(2):
+        with db.engine.begin() as conn:
+            end = conn.execute(
+                update(counter).where(counter.c.id == 1)
+                .values(next_value=counter.c.next_value + size)
+                .returning(counter.c.next_value)
+            ).scalar()
+        if end is not None:
+            return end - size
+        try:
+            # First reservation on a fresh database: create the counter row
+            with db.engine.begin() as conn:
+                conn.execute(insert(counter).values(id=1, next_value=size))
+            return 0
+        except IntegrityError:
+            continue  # Another worker created it first
+    raise RuntimeError('Could not reserve share codes')
+
+# Share codes are unique by construction; no lookup is needed before inserting a quiz
+share_code_allocator = ShareCodeAllocator(
+    reserve_share_code_block,
+    key=os.getenv('SHARE_CODE_KEY', 'quizzy-share-codes'),
+    block_size=int(os.getenv('SHARE_CODE_BLOCK_SIZE', 100))
+)
+SHARE_CODE_ATTEMPTS = 3
+
+def commit_with_share_code(make_quiz, question_rows=()):
+    """Add and commit the quiz built by make_quiz(share_code), with its question rows in the same transaction.
+
+    A code can still collide with one created before the allocator existed;
+    the unique constraint rejects it and the quiz is rebuilt with the next code.
+    """
+    for attempt in range(SHARE_CODE_ATTEMPTS):
+        quiz = make_quiz(share_code_allocator.next_code())
+        db.session.add(quiz)
+        if question_rows:
+            db.session.execute(insert(Question), list(question_rows))
+        try:
+            db.session.commit()
+            return quiz
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == SHARE_CODE_ATTEMPTS - 1:
+                raise
+            logger.warning('Share code collision, retrying', extra={'share_code': quiz.share_code})
 
-@app.route('/api/generate-username', methods=['POST'])
+@route('/api/generate-username', methods=['POST'])
 def generate_username():
     # fake = Faker()
     # username = fake.user_name()
@@ -139,7 +374,7 @@ def generate_username():
     return jsonify({'username': username})
 
 
-@app.route('/api/event', methods=['POST'])
+@route('/api/event', methods=['POST'])
 def update_event_details():
     data = request.get_json()
     
@@ -163,30 +398,23 @@ def update_event_details():
     )
     db.session.add(event)
     db.session.commit()
-    return jsonify({
-        'id': event.id,
-        'user_id': event.user_id,
-        'user_email': event.user_email,
-        'event_details': event.event_details,
-        'status': event.status,
-        'created_at': event.created_at.isoformat()
-    })
+    return jsonify(EVENT.dump(event))
 
 # User CRUD endpoints
-@app.route('/api/users', methods=['GET'])
+@route('/api/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    user_list = []  
-    for user in users:
-        user_list.append({
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'created_at': user.created_at.isoformat()
-        })
-    return jsonify(user_list)
+    try:
+        limit, cursor = parse_page_args(request.args)
+        fields = parse_fields(request.args, USER_LIST_FIELDS)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    schema = USER.only(fields)
+    columns = schema.columns(User) + [c for c in (User.id, User.created_at) if c.key not in fields]
+    users, next_cursor = paginate(db.session.query(*columns), User.created_at, User.id, limit, cursor)
+    return page_response(schema.dump_rows(users), next_cursor)
 
-@app.route('/api/users', methods=['POST'])
+@route('/api/users', methods=['POST'])
 def create_user():
     data = request.get_json()
     
@@ -199,36 +427,25 @@ def create_user():
     #     return jsonify({'error': 'User already exists'}), 400
     
     if User.query.filter_by(email=data['email']).first():
-        response = User.query.filter_by(email=data['email']).first()
-        print(f"response: {response}")
+        logger.debug('User already exists', extra={'user_email': data['email']})
         return jsonify({'error': 'Email already exists'}), 400
     
     user = User(username=data['username'], email=data['email'])
     db.session.add(user)
     db.session.commit()
     
-    return jsonify({
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'created_at': user.created_at.isoformat()
-    }), 201
+    return jsonify(USER.dump(user)), 201
 
-@app.route('/api/users', methods=['GET'])
+@route('/api/users', methods=['GET'])
 def get_user():
     user_email = request.args.get('user_email')
     user = User.query.filter_by(email=user_email).first()
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    return jsonify({
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'created_at': user.created_at.isoformat()
-    })
+    return jsonify(USER.dump(user))
 
-@app.route('/api/users/<user_email>', methods=['PUT'])
+@route('/api/users/<user_email>', methods=['PUT'])
 def update_user(user_email):
     user = User.query.filter_by(email=user_email).first()
     if not user:
@@ -242,14 +459,10 @@ def update_user(user_email):
     
     db.session.commit()
     
-    return jsonify({
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'created_at': user.created_at.isoformat()
-    })
+    return jsonify(USER.dump(user))
 
-@app.route('/api/users', methods=['DELETE'])
+@route('/api/users', methods=['DELETE'])
+@query_budget(10)  # 4 reads, plus one DELETE per table when quizzes are force-deleted
 def delete_user():
     user_email = request.args.get('user_email')
     force = request.args.get('force', 'false').lower() == 'true'
@@ -262,20 +475,20 @@ def delete_user():
         return jsonify({'error': 'User not found'}), 404
     
     # Check if user has associated quizzes
-    user_quizzes = Quiz.query.filter_by(user_id=user.id).all()
-    user_responses = QuizResponse.query.filter_by(user_email=user.email).all()
-
-    quiz_count = len(user_quizzes)
-    response_count = len(user_responses)
-    print(f'user_quizzes: {user_quizzes}')
-    print(f'user_responses: {user_responses}')
-    print(f'quiz_count: {quiz_count}')
-    print(f'response_count: {response_count}')
-    print(f'force: {force}')
+    quiz_count = db.session.query(func.count(Quiz.id)).filter(Quiz.user_id == user.id).scalar()
+    response_count = db.session.query(func.count(QuizAttempt.id)).filter(QuizAttempt.user_email == user.email).scalar()
+    logger.debug('Deleting user', extra={
+        'user_email': user.email,
+        'quiz_count': quiz_count,
+        'response_count': response_count,
+        'force': force
+    })
+    
+    quizzes = db.session.query(Quiz.id, Quiz.title, Quiz.share_code).filter(Quiz.user_id == user.id).all() if quiz_count else []
+    quiz_titles = [quiz.title for quiz in quizzes]
     
     if quiz_count > 0 and not force:
         # Return warning with details about what will be deleted
-        quiz_titles = [quiz.title for quiz in user_quizzes]
         return jsonify({
             'warning': f'User has {quiz_count} associated quiz(es) that will be deleted',
             'user_email': user.email,
@@ -287,24 +500,33 @@ def delete_user():
 
 
     try:
-        # Delete user (this will cascade to quizzes due to the relationship)
-        db.session.delete(user)
+        if quizzes:
+            # One DELETE per table for all of the user's quizzes, as delete_quiz does for one
+            owned = select(Quiz.id).where(Quiz.user_id == user.id)
+            for model in (QuizResponse, QuizAttempt, QuizScoreBucket, Question):
+                db.session.execute(delete(model).where(model.quiz_id.in_(owned)))
+            db.session.execute(delete(Quiz).where(Quiz.user_id == user.id))
+        db.session.execute(delete(User).where(User.id == user.id))
         db.session.commit()
+        for quiz in quizzes:
+            invalidate_quiz_caches(quiz.id)
+            share_code_cache.invalidate(quiz.share_code)
         
         return jsonify({
             'message': 'User deleted successfully',
             'cascaded_deletions': {
                 'quizzes_deleted': quiz_count,
-                'quiz_titles': [quiz.title for quiz in user_quizzes] if user_quizzes else []
+                'quiz_titles': quiz_titles
             }
         })
         
     except Exception as e:
         db.session.rollback()
+        logger.exception('Failed to delete user', extra={'user_email': user_email})
         return jsonify({'error': f'Failed to delete user: {str(e)}'}), 500
 
 # Quiz CRUD endpoints
-@app.route('/api/quizzes', methods=['POST'])
+@route('/api/quizzes', methods=['POST'])
 def create_quiz():
     data = request.get_json()
 
@@ -317,81 +539,56 @@ def create_quiz():
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    # Generate unique share code
-    share_code = generate_share_code()
-    while Quiz.query.filter_by(share_code=share_code).first():
-        share_code = generate_share_code()
-    
-    quiz = Quiz(
+    user_id = user.id
+    quiz = commit_with_share_code(lambda share_code: Quiz(
         title=data['title'],
         description=data.get('description', ''),
         is_public=data.get('is_public', True),
         share_code=share_code,
-        user_id=user.id
-    )
-    
-    db.session.add(quiz)
-    db.session.commit()
+        user_id=user_id
+    ))
     
-    return jsonify({
-        'id': quiz.id,
-        'title': quiz.title,
-        'description': quiz.description,
-        'is_public': quiz.is_public,
-        'share_code': quiz.share_code,
-        'user_id': quiz.user_id,
-        'created_at': quiz.created_at.isoformat()
-    }), 201
-
-@app.route('/api/quizzes', methods=['GET'])
+    return jsonify(QUIZ.dump(quiz)), 201
+
+@route('/api/quizzes', methods=['GET'])
+@query_budget(1)
+@read_replica
 def get_quizzes():
     user_id = request.args.get('user_id')
-    if user_id:
-        user_id='a3fa7534-e072-4c81-a9ec-75ec9f6d36a7'
-        quizzes = Quiz.query.filter_by(user_id=user_id).all()
-    else:
-        quizzes = Quiz.query.filter_by(is_public=True).all()
-    
-    return jsonify([{
-        'id': quiz.id,
-        'title': quiz.title,
-        'description': quiz.description,
-        'is_public': quiz.is_public,
-        'share_code': quiz.share_code,
-        'user_id': quiz.user_id,
-        'created_at': quiz.created_at.isoformat(),
-        'question_count': len(quiz.questions)
-    } for quiz in quizzes])
-
-@app.route('/api/quizzes/<quiz_id>', methods=['GET'])
-def get_quiz(quiz_id):
-    quiz = Quiz.query.get(quiz_id)
-    if not quiz:
-        return jsonify({'error': 'Quiz not found'}), 404
-    
-    quiz_responses = QuizResponse.query.filter_by(quiz_id=quiz_id).group_by(QuizResponse.user_email).all()
-    print(f"quiz_responses: {[quiz_response.user_email for quiz_response in quiz_responses]}")
+    try:
+        limit, cursor = parse_page_args(request.args)
+        fields = parse_fields(request.args, QUIZ_LIST_FIELDS)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify({
-        'id': quiz.id,
-        'title': quiz.title,
-        'description': quiz.description,
-        'is_public': quiz.is_public,
-        'share_code': quiz.share_code,
-        'user_id': quiz.user_id,
-        'created_at': quiz.created_at.isoformat(),
-        'questions': [{
-            'id': q.id,
-            'text': q.text,
-            'question_type': q.question_type,
-            'options': q.options,
-            'points': q.points,
-            'order': q.order
-        } for q in quiz.questions]
+    query = db.session.query(*quiz_list_columns(fields)).filter(quiz_list_filter(user_id))
+    quizzes, next_cursor = paginate(query, Quiz.created_at, Quiz.id, limit, cursor)
+    return page_response(QUIZ_LISTING.only(fields).dump_rows(quizzes), next_cursor)
 
-    })
+def quiz_list_columns(fields):
+    """The requested columns in order, so QUIZ_LISTING.only(fields).dump_rows() can serialize the rows,
+    then id and created_at if not requested, as the cursor needs them"""
+    columns = [
+        # Correlated count, evaluated only for the quizzes on this page
+        select(func.count(Question.id)).where(Question.quiz_id == Quiz.id).scalar_subquery().label(f)
+        if f == 'question_count' else getattr(Quiz, f)
+        for f in fields
+    ]
+    return columns + [c for c in (Quiz.id, Quiz.created_at) if c.key not in fields]
+
+def quiz_list_filter(user_id):
+    """A user's own quizzes, or all public ones"""
+    if user_id:
+        return Quiz.user_id == user_id
+    return Quiz.is_public == True
 
-@app.route('/api/quizzes/<quiz_id>', methods=['PUT'])
+@route('/api/quizzes/<quiz_id>', methods=['GET'])
+@query_budget(2)
+@read_replica
+def get_quiz(quiz_id):
+    return quiz_payload_response(quiz_id)
+
+@route('/api/quizzes/<quiz_id>', methods=['PUT'])
 def update_quiz(quiz_id):
     quiz = Quiz.query.get(quiz_id)
     if not quiz:
@@ -406,55 +603,373 @@ def update_quiz(quiz_id):
         quiz.is_public = data['is_public']
     
     db.session.commit()
+    invalidate_quiz_caches(quiz_id)
     
-    return jsonify({
-        'id': quiz.id,
-        'title': quiz.title,
-        'description': quiz.description,
-        'is_public': quiz.is_public,
-        'share_code': quiz.share_code,
-        'user_id': quiz.user_id,
-        'created_at': quiz.created_at.isoformat()
-    })
+    return jsonify(QUIZ.dump(quiz))
 
-@app.route('/api/quizzes/<quiz_id>', methods=['DELETE'])
+@route('/api/quizzes/<quiz_id>', methods=['DELETE'])
+@query_budget(6)
 def delete_quiz(quiz_id):
     quiz = Quiz.query.get(quiz_id)
     if not quiz:
         return jsonify({'error': 'Quiz not found'}), 404
     
-    db.session.delete(quiz)
+    share_code = quiz.share_code
+    # One DELETE per table instead of loading every attempt's answers to cascade row by row
+    for model in (QuizResponse, QuizAttempt, QuizScoreBucket, Question):
+        db.session.execute(delete(model).where(model.quiz_id == quiz_id))
+    db.session.execute(delete(Quiz).where(Quiz.id == quiz_id))
     db.session.commit()
+    invalidate_quiz_caches(quiz_id)
+    share_code_cache.invalidate(share_code)
     
     return jsonify({'message': 'Quiz deleted successfully'})
 
 # Get quiz by share code
-@app.route('/api/quizzes/share/<share_code>', methods=['GET'])
+@route('/api/quizzes/share/<share_code>', methods=['GET'])
+@query_budget(4)  # 3, plus the lookup that missed when a replica has not caught up yet
+@read_replica
 def get_quiz_by_share_code(share_code):
-    quiz = Quiz.query.filter_by(share_code=share_code).first()
-    if not quiz:
+    quiz_id = share_code_cache.get(share_code)
+    if quiz_id is None:
+        quiz_id = db.session.query(Quiz.id).filter_by(share_code=share_code).scalar()
+        if not quiz_id:
+            return jsonify({'error': 'Quiz not found'}), 404
+        share_code_cache.set(share_code, quiz_id)
+    
+    return quiz_payload_response(quiz_id)
+
+# Bulk authoring: a whole quiz, or a batch of question changes, in one request and one commit
+QUESTION_TYPES = ('multiple_choice', 'true_false', 'text')
+MAX_BULK_QUESTIONS = int(os.getenv('MAX_BULK_QUESTIONS', 500))
+
+def question_error(data, partial=False):
+    """Why a question payload is invalid, or None. With partial=True every field is optional."""
+    if not isinstance(data, dict):
+        return 'must be an object'
+    if not partial and (not data.get('text') or not data.get('correct_answer')):
+        return 'text and correct_answer are required'
+    for field in ('text', 'correct_answer'):
+        if field in data and (not isinstance(data[field], str) or not data[field]):
+            return f'{field} must be a non-empty string'
+    if 'question_type' in data and data['question_type'] not in QUESTION_TYPES:
+        return f"question_type must be one of: {', '.join(QUESTION_TYPES)}"
+    if 'options' in data and not isinstance(data['options'], list):
+        return 'options must be a list'
+    for field in ('points', 'order'):
+        value = data.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 0):
+            return f'{field} must be a non-negative integer'
+    return None
+
+def question_list_errors(questions, partial=False):
+    """Validation errors for a list of question payloads, by position"""
+    if not isinstance(questions, list):
+        return [{'error': 'must be a list'}]
+    errors = []
+    for index, data in enumerate(questions):
+        error = question_error(data, partial)
+        if error:
+            errors.append({'index': index, 'error': error})
+    return errors
+
+def new_question_rows(quiz_id, questions, first_order=1, keep_ids=False):
+    """Rows for a multi-row insert of new questions; order defaults to their position"""
+    return [{
+        'id': (keep_ids and data.get('id')) or str(uuid.uuid4()),
+        'quiz_id': quiz_id,
+        'text': data['text'],
+        'question_type': data.get('question_type', 'multiple_choice'),
+        'options': data.get('options', []),
+        'correct_answer': data['correct_answer'],
+        'points': data['points'] if data.get('points') is not None else 1,
+        'order': data['order'] if data.get('order') is not None else first_order + index
+    } for index, data in enumerate(questions)]
+
+@route('/api/quizzes/bulk', methods=['POST'])
+@query_budget(8)
+def create_quiz_bulk():
+    """Create a quiz together with all of its questions"""
+    data = request.get_json()
+    if not data or not data.get('title') or not data.get('user_email'):
+        return jsonify({'error': 'Title and user_email are required'}), 400
+    
+    questions = data.get('questions', [])
+    errors = question_list_errors(questions)
+    if errors:
+        return jsonify({'error': 'Invalid questions', 'errors': errors}), 400
+    if len(questions) > MAX_BULK_QUESTIONS:
+        return jsonify({'error': f'At most {MAX_BULK_QUESTIONS} questions can be created at once'}), 400
+    
+    user_id = db.session.query(User.id).filter_by(email=data['user_email']).scalar()
+    if not user_id:
+        return jsonify({'error': 'User not found'}), 404
+    
+    quiz_id = str(uuid.uuid4())
+    question_rows = new_question_rows(quiz_id, questions)
+    quiz = commit_with_share_code(lambda share_code: Quiz(
+        id=quiz_id,
+        title=data['title'],
+        description=data.get('description', ''),
+        is_public=data.get('is_public', True),
+        share_code=share_code,
+        user_id=user_id
+    ), question_rows)
+    
+    return jsonify({**QUIZ.dump(quiz), 'questions': sorted(question_rows, key=lambda row: row['order'])}), 201
+
+@route('/api/quizzes/<quiz_id>/questions/batch', methods=['POST'])
+@query_budget(6)
+def batch_update_questions(quiz_id):
+    """Add, update and reorder a quiz's questions in one transaction.
+
+    Body: {"add": [question, ...], "update": [{"id": ..., <fields>}, ...], "order": [question_id, ...]}.
+    "order" lists existing questions in their new order; questions it leaves out keep their relative
+    order after the listed ones, and added questions go after all of them.
+    """
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({'error': 'A JSON object is required'}), 400
+    
+    additions = data.get('add', [])
+    updates = data.get('update', [])
+    new_order = data.get('order')
+    errors = [{'field': 'add', **e} for e in question_list_errors(additions)]
+    errors += [{'field': 'update', **e} for e in question_list_errors(updates, partial=True)]
+    if isinstance(updates, list):
+        errors += [
+            {'field': 'update', 'index': index, 'error': 'id is required'}
+            for index, update_data in enumerate(updates)
+            if isinstance(update_data, dict) and not isinstance(update_data.get('id'), str)
+        ]
+    if new_order is not None and (
+        not isinstance(new_order, list)
+        or not all(isinstance(question_id, str) for question_id in new_order)
+        or len(set(new_order)) != len(new_order)
+    ):
+        errors.append({'field': 'order', 'error': 'must be a list of distinct question ids'})
+    if errors:
+        return jsonify({'error': 'Invalid questions', 'errors': errors}), 400
+    if len(additions) + len(updates) > MAX_BULK_QUESTIONS:
+        return jsonify({'error': f'At most {MAX_BULK_QUESTIONS} questions can be changed at once'}), 400
+    
+    if not db.session.query(Quiz.id).filter_by(id=quiz_id).scalar():
         return jsonify({'error': 'Quiz not found'}), 404
+    existing = dict(db.session.query(Question.id, Question.order).filter(Question.quiz_id == quiz_id).all())
+    
+    unknown = [u.get('id') for u in updates if u.get('id') not in existing]
+    unknown += [question_id for question_id in (new_order or []) if question_id not in existing]
+    if unknown:
+        return jsonify({'error': 'Questions not found in this quiz', 'question_ids': unknown}), 400
+    
+    # Merge field updates and new positions into one row per question, for a bulk UPDATE by primary key
+    changes = {}
+    for update_data in updates:
+        fields = {k: update_data[k] for k in ('text', 'question_type', 'options', 'correct_answer', 'points', 'order') if k in update_data}
+        changes.setdefault(update_data['id'], {}).update(fields)
+    if new_order:
+        listed = set(new_order)
+        unlisted = sorted((qid for qid in existing if qid not in listed), key=lambda qid: (existing[qid] or 0, qid))
+        for position, question_id in enumerate(new_order + unlisted, start=1):
+            if existing[question_id] != position or question_id in changes:
+                changes.setdefault(question_id, {})['order'] = position
     
+    update_rows = [{'id': question_id, **fields} for question_id, fields in changes.items() if fields]
+    final_orders = [changes.get(question_id, {}).get('order', order) for question_id, order in existing.items()]
+    last_order = max([o or 0 for o in final_orders], default=0)
+    try:
+        if update_rows:
+            db.session.execute(update(Question), update_rows)
+        if additions:
+            db.session.execute(insert(Question), new_question_rows(quiz_id, additions, last_order + 1))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.exception('Failed to update questions', extra={'quiz_id': quiz_id})
+        return jsonify({'error': f'Failed to update questions: {str(e)}'}), 500
+    invalidate_quiz_caches(quiz_id)
+    
+    questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order).all()
     return jsonify({
-        'id': quiz.id,
-        'title': quiz.title,
-        'description': quiz.description,
-        'is_public': quiz.is_public,
-        'share_code': quiz.share_code,
-        'user_id': quiz.user_id,
-        'created_at': quiz.created_at.isoformat(),
-        'questions': [{
-            'id': q.id,
-            'text': q.text,
-            'question_type': q.question_type,
-            'options': q.options,
-            'points': q.points,
-            'order': q.order
-        } for q in quiz.questions]
+        'quiz_id': quiz_id,
+        'added': len(additions),
+        'updated': len(update_rows),
+        'questions': QUESTION.dump_many(questions)
     })
 
+# Quiz bank import/export in the portable format described in quiz_transfer.py
+QUIZ_UPSERT_COLUMNS = ['title', 'description', 'is_public', 'user_id', 'updated_at']
+QUESTION_UPSERT_COLUMNS = ['quiz_id', 'text', 'question_type', 'options', 'correct_answer', 'points', 'order']
+MAX_REPORTED_IMPORT_ERRORS = 100
+
+def quiz_export_rows(user_email=None):
+    """Every quiz joined to its questions, in quiz order, from a server-side cursor"""
+    stmt = select(
+        Quiz.id.label('quiz_id'),
+        Quiz.title.label('quiz_title'),
+        Quiz.description.label('quiz_description'),
+        Quiz.is_public.label('quiz_is_public'),
+        Quiz.share_code.label('quiz_share_code'),
+        User.email.label('quiz_user_email'),
+        Quiz.created_at.label('quiz_created_at'),
+        Question.id.label('question_id'),
+        Question.text.label('question_text'),
+        Question.question_type.label('question_question_type'),
+        Question.options.label('question_options'),
+        Question.correct_answer.label('question_correct_answer'),
+        Question.points.label('question_points'),
+        Question.order.label('question_order')
+    ).join(User, Quiz.user_id == User.id) \
+        .outerjoin(Question, Question.quiz_id == Quiz.id) \
+        .order_by(Quiz.id, Question.order, Question.id) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    if user_email:
+        stmt = stmt.where(User.email == user_email)
+    return db.session.execute(stmt)
+
+def upsert_rows(model, rows, update_columns):
+    """Insert rows, updating update_columns of those whose id already exists"""
+    if not rows:
+        return
+    stmt = upsert_statement(model)
+    if stmt is not None:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['id'],
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+        db.session.execute(stmt, rows)
+        return
+    
+    existing = set(db.session.scalars(select(model.id).where(model.id.in_([row['id'] for row in rows]))))
+    new_rows = [row for row in rows if row['id'] not in existing]
+    changed_rows = [{'id': row['id'], **{c: row[c] for c in update_columns}} for row in rows if row['id'] in existing]
+    if new_rows:
+        db.session.execute(insert(model), new_rows)
+    if changed_rows:
+        db.session.execute(update(model), changed_rows)
+
+def import_record_error(record):
+    """Why an imported quiz record or any of its questions is invalid, or None"""
+    error = quiz_record_error(record)
+    if error:
+        return error
+    for index, question in enumerate(record.get('questions', [])):
+        error = question_error(question)
+        if error is None and question.get('id') is not None and not isinstance(question['id'], str):
+            error = 'id must be a string'
+        if error:
+            return f'question {index}: {error}'
+    return None
+
+def import_quiz_batch(batch, owner_id=None):
+    """Validate one batch of (line number, quiz record) pairs and upsert the valid ones in one transaction.
+
+    Returns (quizzes written, questions written, errors).
+    """
+    errors = []
+    valid = []
+    for line_number, record in batch:
+        error = import_record_error(record)
+        if error:
+            errors.append({'line': line_number, 'error': error})
+        else:
+            valid.append((line_number, record))
+    
+    owners = {}
+    if owner_id is None:
+        emails = {record.get('user_email') for _, record in valid if record.get('user_email')}
+        owners = dict(db.session.query(User.email, User.id).filter(User.email.in_(emails)).all()) if emails else {}
+    codes = {record['share_code'] for _, record in valid if record.get('share_code')}
+    code_owners = dict(db.session.query(Quiz.share_code, Quiz.id).filter(Quiz.share_code.in_(codes)).all()) if codes else {}
+    
+    # Keyed by id so a record repeated within the batch is written once, last one wins
+    quiz_rows = {}
+    question_rows = {}
+    now = datetime.utcnow()
+    for line_number, record in valid:
+        user_id = owner_id or owners.get(record.get('user_email'))
+        if not user_id:
+            errors.append({'line': line_number, 'error': f"unknown user_email {record.get('user_email')!r}"})
+            continue
+        quiz_id = record.get('id') or str(uuid.uuid4())
+        # Keep the exported share code so links survive the move, unless another quiz here already has it
+        share_code = record.get('share_code')
+        if not share_code or code_owners.setdefault(share_code, quiz_id) != quiz_id:
+            share_code = share_code_allocator.next_code()
+        quiz_rows[quiz_id] = {
+            'id': quiz_id,
+            'title': record['title'],
+            'description': record.get('description') or '',
+            'is_public': record.get('is_public', True) is not False,
+            'share_code': share_code,
+            'user_id': user_id,
+            'created_at': datetime.fromisoformat(record['created_at']) if record.get('created_at') else now,
+            'updated_at': now
+        }
+        for row in new_question_rows(quiz_id, record.get('questions', []), keep_ids=True):
+            question_rows[row['id']] = row
+    
+    try:
+        upsert_rows(Quiz, list(quiz_rows.values()), QUIZ_UPSERT_COLUMNS)
+        upsert_rows(Question, list(question_rows.values()), QUESTION_UPSERT_COLUMNS)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    for quiz_id in quiz_rows:
+        invalidate_quiz_caches(quiz_id)
+    return len(quiz_rows), len(question_rows), errors
+
+def import_quizzes(lines, import_format, owner_email=None, batch_size=IMPORT_BATCH_SIZE):
+    """Import a quiz bank batch by batch; memory use is bounded by the batch size"""
+    owner_id = None
+    if owner_email:
+        owner_id = db.session.query(User.id).filter_by(email=owner_email).scalar()
+        if not owner_id:
+            raise LookupError(f'User {owner_email} not found')
+    
+    summary = {'quizzes': 0, 'questions': 0, 'error_count': 0, 'errors': []}
+    for batch in batched_records(read_quizzes(lines, import_format), batch_size):
+        quizzes, questions, errors = import_quiz_batch(batch, owner_id)
+        summary['quizzes'] += quizzes
+        summary['questions'] += questions
+        summary['error_count'] += len(errors)
+        summary['errors'].extend(errors[:MAX_REPORTED_IMPORT_ERRORS - len(summary['errors'])])
+    return summary
+
+@route('/api/quizzes/export', methods=['GET'])
+def export_quizzes_endpoint():
+    """Stream every quiz (or one owner's quizzes) with its questions as NDJSON or CSV"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    records = iter_quiz_records(quiz_export_rows(request.args.get('user_email')))
+    return Response(
+        stream_with_context(encode_quizzes(records, export_format)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename=quizzes.{export_format}'}
+    )
+
+@route('/api/quizzes/import', methods=['POST'])
+def import_quizzes_endpoint():
+    """Import a quiz bank from the request body, upserting quizzes and questions on id"""
+    import_format = request.args.get('format', 'ndjson')
+    if import_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    lines = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    try:
+        summary = import_quizzes(lines, import_format, owner_email=request.args.get('owner_email'))
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.exception('Failed to import quizzes')
+        return jsonify({'error': f'Failed to import quizzes: {str(e)}'}), 500
+    return jsonify(summary)
+
 # Question CRUD endpoints
-@app.route('/api/quizzes/<quiz_id>/questions', methods=['POST'])
+@route('/api/quizzes/<quiz_id>/questions', methods=['POST'])
 def create_question(quiz_id):
     quiz = Quiz.query.get(quiz_id)
     if not quiz:
@@ -476,38 +991,23 @@ def create_question(quiz_id):
     
     db.session.add(question)
     db.session.commit()
+    invalidate_quiz_caches(quiz_id)
     
-    return jsonify({
-        'id': question.id,
-        'text': question.text,
-        'question_type': question.question_type,
-        'options': question.options,
-        'correct_answer': question.correct_answer,
-        'points': question.points,
-        'order': question.order,
-        'quiz_id': question.quiz_id
-    }), 201
+    return jsonify(QUESTION.dump(question)), 201
 
-@app.route('/api/quizzes/<quiz_id>/questions', methods=['GET'])
+@route('/api/quizzes/<quiz_id>/questions', methods=['GET'])
+@read_replica
 def get_questions(quiz_id):
     quiz = Quiz.query.get(quiz_id)
     if not quiz:
         return jsonify({'error': 'Quiz not found'}), 404
     
-    questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order).all()
-    
-    return jsonify([{
-        'id': q.id,
-        'text': q.text,
-        'question_type': q.question_type,
-        'options': q.options,
-        'correct_answer': q.correct_answer,
-        'points': q.points,
-        'order': q.order,
-        'quiz_id': q.quiz_id
-    } for q in questions])
-
-@app.route('/api/questions/<question_id>', methods=['PUT'])
+    questions = db.session.execute(
+        select(*QUESTION.columns(Question)).where(Question.quiz_id == quiz_id).order_by(Question.order)
+    )
+    return jsonify(QUESTION.dump_rows(questions))
+
+@route('/api/questions/<question_id>', methods=['PUT'])
 def update_question(question_id):
     question = Question.query.get(question_id)
     if not question:
@@ -528,516 +1028,968 @@ def update_question(question_id):
         question.order = data['order']
     
     db.session.commit()
+    invalidate_quiz_caches(question.quiz_id)
     
-    return jsonify({
-        'id': question.id,
-        'text': question.text,
-        'question_type': question.question_type,
-        'options': question.options,
-        'correct_answer': question.correct_answer,
-        'points': question.points,
-        'order': question.order,
-        'quiz_id': question.quiz_id
-    })
+    return jsonify(QUESTION.dump(question))
 
-@app.route('/api/questions/<question_id>', methods=['DELETE'])
+@route('/api/questions/<question_id>', methods=['DELETE'])
 def delete_question(question_id):
     question = Question.query.get(question_id)
     if not question:
         return jsonify({'error': 'Question not found'}), 404
     
+    quiz_id = question.quiz_id
     db.session.delete(question)
     db.session.commit()
+    invalidate_quiz_caches(quiz_id)
     
     return jsonify({'message': 'Question deleted successfully'})
 
+# Recently seen idempotency keys and the result returned for them, so retries skip the database
+SUBMISSION_ID_NAMESPACE = uuid.UUID('6f1c0c8e-3a52-4d0b-9a57-2f3c1e6b8d41')
+idempotency_cache = LRUCache(
+    max_size=int(os.getenv('IDEMPOTENCY_CACHE_SIZE', 10000)),
+    ttl=int(os.getenv('IDEMPOTENCY_CACHE_TTL', 600))
+)
+
+def submission_attempt_id(quiz_id, idempotency_key):
+    """Attempt id for a submission; derived from the idempotency key when there is one"""
+    if idempotency_key is None:
+        return str(uuid.uuid4())
+    return str(uuid.uuid5(SUBMISSION_ID_NAMESPACE, f'{quiz_id}:{idempotency_key}'))
+
+def remember_submission(quiz_id, idempotency_key, score):
+    if idempotency_key is not None:
+        idempotency_cache.set((quiz_id, idempotency_key), score)
+
+def find_submission(quiz_id, idempotency_key):
+    """The stored result for an idempotency key, or None if it has not been submitted"""
+    score = idempotency_cache.get((quiz_id, idempotency_key))
+    if score is not None:
+        return score
+    
+    attempt = QuizAttempt.query.filter_by(quiz_id=quiz_id, idempotency_key=idempotency_key).first()
+    if attempt is None:
+        return None
+    score = attempt_score(attempt, QuizResponse.query.filter_by(attempt_id=attempt.id).count())
+    remember_submission(quiz_id, idempotency_key, score)
+    return score
+
+def attempt_score(attempt, responses_stored):
+    """The result returned for a stored attempt"""
+    return {
+        'attempt_id': attempt.id,
+        'total_questions': attempt.total_questions,
+        'correct_answers': attempt.correct_answers,
+        'total_points': attempt.points_earned,
+        'percentage': attempt.percentage,
+        'responses_stored': responses_stored
+    }
+
+def replayed_submission_response(score):
+    response = jsonify({'message': 'Quiz responses already submitted', **score})
+    response.headers[IDEMPOTENT_REPLAY_HEADER] = 'true'
+    return response, 200
+
+def upsert_statement(model, dialect=None):
+    """INSERT supporting ON CONFLICT for the database (the app's by default), or None if it has no such clause"""
+    dialect = dialect or db.engine.dialect.name
+    if dialect == 'postgresql':
+        return postgresql_insert(model)
+    if dialect == 'sqlite':
+        return sqlite_insert(model)
+    return None
+
+def insert_ignoring_existing(model, rows):
+    """Insert rows, skipping any whose primary key is already stored; returns the ids inserted"""
+    stmt = upsert_statement(model)
+    if stmt is not None:
+        if not rows:
+            return set()
+        result = db.session.execute(stmt.on_conflict_do_nothing(index_elements=['id']).returning(model.id), rows)
+        return set(result.scalars())
+    
+    existing = set(db.session.scalars(select(model.id).where(model.id.in_([row['id'] for row in rows]))))
+    rows = [row for row in rows if row['id'] not in existing]
+    if rows:
+        db.session.execute(insert(model), rows)
+    return {row['id'] for row in rows}
+
+def score_bucket_rows(attempt_rows):
+    """Bucket increments for newly written attempts"""
+    # Sorted so concurrent batches lock bucket rows in the same order
+    return [
+        {'quiz_id': quiz_id, 'percentage': percentage, 'attempts': attempts}
+        for (quiz_id, percentage), attempts in sorted(count_percentages(attempt_rows).items())
+    ]
+
+def score_bucket_upsert(stmt):
+    """Turn an upsert_statement(QuizScoreBucket) into one adding to existing buckets"""
+    return stmt.on_conflict_do_update(
+        index_elements=['quiz_id', 'percentage'],
+        set_={'attempts': QuizScoreBucket.attempts + stmt.excluded.attempts}
+    )
+
+def record_scores(attempt_rows):
+    """Add newly written attempts to their quizzes' score buckets, in the same transaction"""
+    rows = score_bucket_rows(attempt_rows)
+    if not rows:
+        return
+    
+    stmt = upsert_statement(QuizScoreBucket)
+    if stmt is not None:
+        db.session.execute(score_bucket_upsert(stmt), rows)
+        return
+    
+    for row in rows:
+        updated = QuizScoreBucket.query.filter_by(quiz_id=row['quiz_id'], percentage=row['percentage']) \
+            .update({'attempts': QuizScoreBucket.attempts + row['attempts']})
+        if not updated:
+            db.session.execute(insert(QuizScoreBucket), [row])
+
+def write_queued_attempts(flask_app, batch):
+    """Write a batch of queued submissions to `flask_app`'s database in one transaction; replays are no-ops"""
+    with flask_app.app_context():
+        attempt_rows = []
+        answer_rows = []
+        for submission in batch:
+            attempt_rows.append({
+                **submission['attempt'],
+                'submitted_at': datetime.fromisoformat(submission['attempt']['submitted_at'])
+            })
+            answer_rows.extend(submission['answers'])
+        try:
+            inserted = insert_ignoring_existing(QuizAttempt, attempt_rows)
+            record_scores([row for row in attempt_rows if row['id'] in inserted])
+            if answer_rows:
+                insert_ignoring_existing(QuizResponse, answer_rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        logger.debug('Flushed queued submissions', extra={'attempts': len(attempt_rows), 'answers': len(answer_rows)})
+
+# Write-behind ingestion: submissions are queued locally and flushed in batches (see ingestion.py)
+SUBMISSION_INGESTION_MODE = os.getenv('SUBMISSION_INGESTION_MODE', 'sync')
+submission_queue = None
+submission_flusher = None
+if SUBMISSION_INGESTION_MODE == 'queue':
+    submission_queue = SubmissionQueue(
+        os.getenv('SUBMISSION_QUEUE_PATH', os.path.join(INSTANCE_PATH, 'submission-queue.db')),
+        max_pending=int(os.getenv('SUBMISSION_QUEUE_MAX_PENDING', 100000)),
+        synchronous=os.getenv('SUBMISSION_QUEUE_SYNC', 'NORMAL').upper()
+    )
+    # Its writer is bound to an app by create_app()
+    submission_flusher = Flusher(
+        submission_queue, None,
+        batch_size=int(os.getenv('SUBMISSION_FLUSH_SIZE', 500)),
+        interval=float(os.getenv('SUBMISSION_FLUSH_INTERVAL', 1.0)),
+        max_failures=int(os.getenv('SUBMISSION_MAX_FAILURES', 5)),
+        # The database being unreachable says nothing about the submissions; retry the whole batch
+        transient_errors=(OperationalError, InterfaceError, PoolTimeoutError)
+    )
+    # Whatever is still queued when the process exits is written before it goes
+    atexit.register(submission_flusher.stop)
+
+def submission_error(data):
+    """Why a submission body is invalid, or None"""
+    if not data or not data.get('quiz_id') or not data.get('user_name') or not data.get('user_email') or not data.get('responses'):
+        return 'Quiz ID, user name, email, and responses are required'
+    return None
+
+def submission_idempotency_key(data, header_value):
+    """The Idempotency-Key header, or the client-generated attempt_id, as a string"""
+    key = header_value or data.get('attempt_id')
+    return None if key is None else str(key)
+
+def graded_submission(data, idempotency_key, answer_key):
+    """Grade a valid submission; returns its attempt row, answer rows and the score to return"""
+    quiz_id = data['quiz_id']
+    # Grade the whole submission in memory against the quiz's answer key
+    result = grade_responses(answer_key, data['responses'])
+    if grading_logger.isEnabledFor(logging.DEBUG):
+        for graded in result.answers:
+            grading_logger.debug('Graded answer', extra={
+                'quiz_id': quiz_id,
+                'question_id': graded.question_id,
+                'is_correct': graded.is_correct,
+                'points_earned': graded.points_earned
+            })
+    
+    # Ids are fixed here so a queued or retried attempt is written with the same ids however often it is replayed
+    attempt_id = submission_attempt_id(quiz_id, idempotency_key)
+    attempt_row = {
+        'id': attempt_id,
+        'quiz_id': quiz_id,
+        'user_name': data['user_name'],
+        'user_email': data['user_email'],
+        'user_phone': data.get('user_phone', ''),
+        'submitted_at': datetime.utcnow(),
+        'total_questions': result.total_questions,
+        'correct_answers': result.correct_answers,
+        'points_earned': result.total_points,
+        'total_points': result.max_points,
+        'percentage': result.percentage,
+        'idempotency_key': idempotency_key
+    }
+    answer_rows = [{
+        'id': str(uuid.uuid5(uuid.UUID(attempt_id), str(position))),
+        'attempt_id': attempt_id,
+        'quiz_id': quiz_id,
+        'question_id': graded.question_id,
+        'answer': graded.answer,
+        'is_correct': graded.is_correct,
+        'points_earned': graded.points_earned
+    } for position, graded in enumerate(result.answers)]
+    score = {
+        'attempt_id': attempt_id,
+        'total_questions': result.total_questions,
+        'correct_answers': result.correct_answers,
+        'total_points': result.total_points,
+        'percentage': result.percentage,
+        'responses_stored': len(result.answers)
+    }
+    return attempt_row, answer_rows, score
+
+def queue_submission(attempt_row, answer_rows):
+    """Durably queue a graded submission for the background flusher"""
+    pending = submission_queue.enqueue(attempt_row['id'], {
+        'attempt': {**attempt_row, 'submitted_at': attempt_row['submitted_at'].isoformat()},
+        'answers': answer_rows
+    })
+    if pending >= submission_flusher.batch_size:
+        submission_flusher.notify()
+
 # Quiz Response endpoints
-@app.route('/api/quiz-responses', methods=['POST'])
+@route('/api/quiz-responses', methods=['POST'])
+@query_budget(7)
 def submit_quiz_responses():
     data = request.get_json()
     
-    if not data or not data.get('quiz_id') or not data.get('user_name') or not data.get('user_email') or not data.get('responses'):
-        return jsonify({'error': 'Quiz ID, user name, email, and responses are required'}), 400
+    error = submission_error(data)
+    if error:
+        return jsonify({'error': error}), 400
     
     quiz_id = data['quiz_id']
-    user_name = data['user_name']
-    user_email = data['user_email']
-    user_phone = data.get('user_phone', '')
     responses = data['responses']
     
-    # Check if quiz exists
-    quiz = Quiz.query.get(quiz_id)
-    if not quiz:
-        return jsonify({'error': 'Quiz not found'}), 404
+    # Retries carry the same Idempotency-Key (or client-generated attempt_id) and get the stored result back
+    idempotency_key = submission_idempotency_key(data, request.headers.get(IDEMPOTENCY_KEY_HEADER))
+    if idempotency_key is not None:
+        if len(idempotency_key) > 100:
+            return jsonify({'error': f'{IDEMPOTENCY_KEY_HEADER} must be at most 100 characters'}), 400
+        stored = find_submission(quiz_id, idempotency_key)
+        if stored is not None:
+            return replayed_submission_response(stored)
+    
+    # A cached answer key means the quiz exists, so a hot quiz costs no reads
+    answer_key = answer_key_cache.get(quiz_id)
+    if answer_key is None:
+        quiz = Quiz.query.get(quiz_id)
+        if not quiz:
+            return jsonify({'error': 'Quiz not found'}), 404
+        answer_key = load_answer_key(quiz_id)
+        answer_key_cache.set(quiz_id, answer_key)
     
     # Check if responses array is not empty
     if not responses or len(responses) == 0:
         return jsonify({'error': 'At least one response is required'}), 400
     
     try:
-        # Store each response
-        stored_responses = []
-        total_points = 0
-        correct_answers = 0
+        attempt_row, answer_rows, score = graded_submission(data, idempotency_key, answer_key)
         
-        for response_data in responses:
-            question_id = response_data.get('question_id')
-            answer = response_data.get('answer')
-            
-            if not question_id or answer is None:
-                continue
-            
-            # Get the question to check if answer is correct
-            question = Question.query.get(question_id)
-            if not question:
-                continue
-            
-            is_correct = answer.lower().strip() == question.correct_answer.lower().strip()
-            points_earned = question.points if is_correct else 0
-            print(f"question: {question}, answer: {answer}, correct_answer: {question.correct_answer}, is_correct: {is_correct}, points_earned: {points_earned}")
-            if is_correct:
-                correct_answers += 1
-                total_points += points_earned
-            
-            # Create and store the response
-            quiz_response = QuizResponse(
-                quiz_id=quiz_id,
-                question_id=question_id,
-                user_name=user_name,
-                user_email=user_email,
-                user_phone=user_phone,
-                answer=answer,
-                is_correct=is_correct,
-                points_earned=question.points
-            )
-            
-            db.session.add(quiz_response)
-            stored_responses.append(quiz_response)
+        if submission_queue is not None:
+            try:
+                queue_submission(attempt_row, answer_rows)
+                remember_submission(quiz_id, idempotency_key, score)
+                return jsonify({'message': 'Quiz responses accepted', **score}), 202
+            except QueueFull:
+                # Backpressure: once the queue is full, write synchronously instead of dropping the submission
+                logger.warning('Submission queue full, writing synchronously', extra={'quiz_id': quiz_id})
         
-        db.session.commit()
+        # One attempt row holding the score, plus one bulk insert for the answers
+        db.session.execute(insert(QuizAttempt), [attempt_row])
+        if answer_rows:
+            db.session.execute(insert(QuizResponse), answer_rows)
+        record_scores([attempt_row])
         
-        # Calculate percentage
-        total_questions = len(responses)
-        percentage = round((correct_answers / total_questions) * 100) if total_questions > 0 else 0
+        db.session.commit()
+        remember_submission(quiz_id, idempotency_key, score)
         
-        return jsonify({
-            'message': 'Quiz responses submitted successfully',
-            'total_questions': total_questions,
-            'correct_answers': correct_answers,
-            'total_points': total_points,
-            'percentage': percentage,
-            'responses_stored': len(stored_responses)
-        }), 201
+        return jsonify({'message': 'Quiz responses submitted successfully', **score}), 201
         
+    except IntegrityError:
+        # A concurrent retry with the same key committed first; answer with its result
+        db.session.rollback()
+        stored = find_submission(quiz_id, idempotency_key) if idempotency_key is not None else None
+        if stored is None:
+            logger.exception('Failed to store quiz responses', extra={'quiz_id': quiz_id})
+            return jsonify({'error': 'Failed to store quiz responses'}), 500
+        return replayed_submission_response(stored)
     except Exception as e:
         db.session.rollback()
+        logger.exception('Failed to store quiz responses', extra={'quiz_id': quiz_id})
         return jsonify({'error': f'Failed to store quiz responses: {str(e)}'}), 500
 
-@app.route('/api/quizzes/<quiz_id>/responses', methods=['GET'])
+@route('/api/quizzes/<quiz_id>/responses', methods=['GET'])
+@query_budget(3)
 def get_quiz_responses(quiz_id):
     """Get all responses for a specific quiz"""
     quiz = Quiz.query.get(quiz_id)
     if not quiz:
         return jsonify({'error': 'Quiz not found'}), 404
     
-    unique_users_query = """
-    select user_name, user_email, user_phone, quiz_response.quiz_id, quiz.title,
-SUM(quiz_response.points_earned) as points_earned,
-SUM(quiz_response.is_correct) as correct_answers,
-SUM(question.points) as total_points,
-COUNT(quiz_response.question_id) as total_questions
-from quiz_response 
-join question on quiz_response.question_id = question.id 
-join quiz on quiz_response.quiz_id = quiz.id
-where quiz_response.quiz_id = :quiz_id
-group by user_email, user_name, user_phone, quiz_response.quiz_id, quiz.title
-    """
+    try:
+        limit, cursor = parse_page_args(request.args)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Attempts carry their own score, so this is an indexed range read on (quiz_id, submitted_at)
+    total_attempts = db.session.query(func.count(QuizAttempt.id)).filter(QuizAttempt.quiz_id == quiz_id).scalar()
+    attempts, next_cursor = paginate(
+        db.session.query(*quiz_attempt_columns()).filter(QuizAttempt.quiz_id == quiz_id),
+        QuizAttempt.submitted_at, QuizAttempt.id, limit, cursor
+    )
+    
+    return page_response(quiz_responses_page(quiz, total_attempts, attempts, next_cursor), next_cursor)
 
+def quiz_attempt_columns():
+    """Columns of the QUIZ_ATTEMPT schema, then the id the cursor is built from"""
+    return QUIZ_ATTEMPT.columns(QuizAttempt) + [QuizAttempt.id]
 
-    unique_users = db.session.execute(text(unique_users_query), {'quiz_id': quiz_id}).fetchall()
-    
-    user_responses = {}
-    for user in unique_users:
-        user_key = f"{user.user_email}_{datetime.now().isoformat()}"
-        user_responses[user_key] = {
-            'user_name': user.user_name,
-            'user_email': user.user_email,
-            'user_phone': user.user_phone,
-            'submitted_at': datetime.now().isoformat(),
-            'responses': [],
-            'total_points': user.total_points,
-            'points_earned': user.points_earned,
-            'correct_answers': user.correct_answers,
-            'total_questions': user.total_questions,
-            'percentage': round((user.correct_answers / user.total_questions) * 100) if user.total_questions > 0 else 0
-        }
+def quiz_responses_page(quiz, total_attempts, attempts, next_cursor):
+    """Body of one page of a quiz's attempts, read as rows of quiz_attempt_columns()"""
+    return {
+        'quiz_id': quiz.id,
+        'quiz_title': quiz.title,
+        'total_attempts': total_attempts,
+        'user_responses': [{**attempt, 'responses': []} for attempt in QUIZ_ATTEMPT.dump_rows(attempts)],
+        'next_cursor': next_cursor
+    }
+
+@route('/api/quizzes/<quiz_id>/stats', methods=['GET'])
+@query_budget(2)
+def get_quiz_stats(quiz_id):
+    """Score distribution for a quiz, read from its percentage buckets"""
+    quiz = Quiz.query.get(quiz_id)
+    if not quiz:
+        return jsonify({'error': 'Quiz not found'}), 404
+    
+    buckets = db.session.query(QuizScoreBucket.percentage, QuizScoreBucket.attempts) \
+        .filter(QuizScoreBucket.quiz_id == quiz_id) \
+        .order_by(QuizScoreBucket.percentage).all()
+    
+    return jsonify({'quiz_id': quiz_id, 'quiz_title': quiz.title, **score_summary(buckets)})
+
+@route('/api/quizzes/<quiz_id>/leaderboard', methods=['GET'])
+@query_budget(2)
+def get_quiz_leaderboard(quiz_id):
+    """Top attempts for a quiz: highest percentage, then points, then earliest submission"""
+    quiz = Quiz.query.get(quiz_id)
+    if not quiz:
+        return jsonify({'error': 'Quiz not found'}), 404
+    
+    try:
+        limit = parse_leaderboard_size(request.args)
+    except PaginationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    attempts = db.session.query(*LEADERBOARD_ENTRY.columns(QuizAttempt)).filter(QuizAttempt.quiz_id == quiz_id) \
+        .order_by(QuizAttempt.percentage.desc(), QuizAttempt.points_earned.desc(), QuizAttempt.submitted_at) \
+        .limit(limit).all()
+    
+    return jsonify({
+        'quiz_id': quiz_id,
+        'quiz_title': quiz.title,
+        'leaderboard': [
+            {'rank': rank, **entry} for rank, entry in enumerate(LEADERBOARD_ENTRY.dump_rows(attempts), start=1)
+        ]
+    })
+
+def quiz_attempt_count(quiz_id):
+    """Number of stored attempts for a quiz, summed from its score buckets"""
+    return db.session.query(func.coalesce(func.sum(QuizScoreBucket.attempts), 0)) \
+        .filter(QuizScoreBucket.quiz_id == quiz_id).scalar()
+
+def load_item_analysis(quiz_id):
+    """Analyse every question of a quiz, reading its answers in batches from a server-side cursor"""
+    questions = db.session.query(Question.id, Question.text, Question.order) \
+        .filter(Question.quiz_id == quiz_id).order_by(Question.order).all()
+    stmt = select(
+        QuizResponse.attempt_id,
+        QuizAttempt.percentage,
+        QuizResponse.question_id,
+        QuizResponse.answer,
+        QuizResponse.is_correct
+    ).join(QuizAttempt, QuizResponse.attempt_id == QuizAttempt.id) \
+        .where(QuizResponse.quiz_id == quiz_id) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    columns = columns_from_batches(db.session.execute(stmt).partitions())
+    stats = item_analysis(columns, [question.id for question in questions])
+    return [{
+        'question_id': question.id,
+        'text': question.text,
+        'order': question.order,
+        **{key: value for key, value in question_stats.items() if key != 'question_id'}
+    } for question, question_stats in zip(questions, stats)]
+
+def quiz_item_analysis(quiz_id):
+    """Item analysis for a quiz, recomputed only when its attempt count has changed"""
+    attempts = quiz_attempt_count(quiz_id)
+    cached = item_analysis_cache.get(quiz_id)
+    if cached is not None and cached[0] == attempts:
+        return attempts, cached[1]
     
+    questions = load_item_analysis(quiz_id)
+    item_analysis_cache.set(quiz_id, (attempts, questions))
+    return attempts, questions
+
+@route('/api/quizzes/<quiz_id>/questions/stats', methods=['GET'])
+@query_budget(4)
+def get_question_stats(quiz_id):
+    """Percent correct, answer distribution and discrimination index for each question"""
+    quiz = Quiz.query.get(quiz_id)
+    if not quiz:
+        return jsonify({'error': 'Quiz not found'}), 404
+    
+    attempts, questions = quiz_item_analysis(quiz_id)
     return jsonify({
         'quiz_id': quiz_id,
         'quiz_title': quiz.title,
-        'total_attempts': len(unique_users),
-        'user_responses': list(user_responses.values())
+        'attempts': attempts,
+        'questions': questions
+    })
+
+def response_export_rows(quiz_id):
+    """Stream a quiz's responses from a server-side cursor, one batch at a time"""
+    stmt = select(
+        QuizResponse.id.label('response_id'),
+        QuizResponse.attempt_id,
+        QuizAttempt.submitted_at,
+        QuizAttempt.user_name,
+        QuizAttempt.user_email,
+        QuizAttempt.user_phone,
+        QuizResponse.question_id,
+        Question.text.label('question_text'),
+        QuizResponse.answer,
+        QuizResponse.is_correct,
+        QuizResponse.points_earned
+    ).join(QuizAttempt, QuizResponse.attempt_id == QuizAttempt.id) \
+        .join(Question, QuizResponse.question_id == Question.id) \
+        .where(QuizResponse.quiz_id == quiz_id) \
+        .order_by(QuizAttempt.submitted_at, QuizAttempt.id, QuizResponse.id) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    return db.session.execute(stmt)
+
+@route('/api/quizzes/<quiz_id>/responses/export', methods=['GET'])
+def export_quiz_responses(quiz_id):
+    """Stream every response for a quiz as NDJSON or CSV"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    
+    quiz = Quiz.query.get(quiz_id)
+    if not quiz:
+        return jsonify({'error': 'Quiz not found'}), 404
+    
+    rows = response_export_rows(quiz_id)
+    return Response(
+        stream_with_context(iter_export(rows, RESPONSE_EXPORT_FIELDS, export_format)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename=quiz-{quiz_id}-responses.{export_format}'}
+    )
+
+# Admin pool stats endpoint
+@route('/api/admin/pool', methods=['GET'])
+@query_budget(0)
+def get_pool_stats():
+    """Connection pool usage in the worker that serves the request; needs ADMIN_TOKEN"""
+    token = current_app.config.get('ADMIN_TOKEN')
+    if not token:
+        return jsonify({'error': 'Not found'}), 404
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({
+        'default' if bind is None else bind: pool_stats(engine, pool_profile(engine.url)) for bind, engine in db.engines.items()
     })
 
 # Health check endpoint
-@app.route('/health', methods=['GET'])
+@route('/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'message': 'Quizzy server is running'})
 
 # Flask CLI Commands
-@app.cli.command("create-dummy-data")
+@cli.command("create-dummy-data")
 @click.option('--users', default=3, help='Number of dummy users to create')
 @click.option('--quizzes', default=5, help='Number of dummy quizzes to create')
 @click.option('--questions-per-quiz', default=4, help='Number of questions per quiz')
 def create_dummy_data(users, quizzes, questions_per_quiz):
     """Create dummy data for testing the quiz app"""
-    with app.app_context():
-        # Create dummy users
-        dummy_users = []
-        for i in range(users):
-            user = User(
-                username=f"user{i+1}",
-                email=f"user{i+1}@example.com"
-            )
-            db.session.add(user)
-            dummy_users.append(user)
-        
-        db.session.commit()
-        click.echo(f"✅ Created {users} dummy users")
-        
-        # Create dummy quizzes
-        quiz_titles = [
-            "General Knowledge Quiz",
-            "Science Quiz", 
-            "History Quiz",
-            "Geography Quiz",
-            "Math Quiz",
-            "Literature Quiz",
-            "Sports Quiz",
-            "Music Quiz",
-            "Technology Quiz",
-            "Art Quiz"
-        ]
-        
-        quiz_descriptions = [
-            "Test your general knowledge with these interesting questions",
-            "Explore the world of science with this comprehensive quiz",
-            "Travel through time with these historical questions",
-            "Discover the world with geography questions",
-            "Challenge your mathematical skills",
-            "Test your knowledge of classic literature",
-            "Sports enthusiasts, this quiz is for you!",
-            "How well do you know music? Find out here!",
-            "Stay updated with technology questions",
-            "Appreciate art through these creative questions"
-        ]
-        
-        dummy_quizzes = []
-        for i in range(quizzes):
-            user = dummy_users[i % len(dummy_users)]
-            quiz = Quiz(
-                title=quiz_titles[i],
-                description=quiz_descriptions[i],
-                is_public=True,
-                share_code=generate_share_code(),
-                user_id=user.id
+    # Create dummy users
+    dummy_users = []
+    for i in range(users):
+        user = User(
+            username=f"user{i+1}",
+            email=f"user{i+1}@example.com"
+        )
+        db.session.add(user)
+        dummy_users.append(user)
+    
+    db.session.commit()
+    click.echo(f"✅ Created {users} dummy users")
+    
+    # Create dummy quizzes
+    quiz_titles = [
+        "General Knowledge Quiz",
+        "Science Quiz", 
+        "History Quiz",
+        "Geography Quiz",
+        "Math Quiz",
+        "Literature Quiz",
+        "Sports Quiz",
+        "Music Quiz",
+        "Technology Quiz",
+        "Art Quiz"
+    ]
+    
+    quiz_descriptions = [
+        "Test your general knowledge with these interesting questions",
+        "Explore the world of science with this comprehensive quiz",
+        "Travel through time with these historical questions",
+        "Discover the world with geography questions",
+        "Challenge your mathematical skills",
+        "Test your knowledge of classic literature",
+        "Sports enthusiasts, this quiz is for you!",
+        "How well do you know music? Find out here!",
+        "Stay updated with technology questions",
+        "Appreciate art through these creative questions"
+    ]
+    
+    dummy_quizzes = []
+    for i in range(quizzes):
+        user = dummy_users[i % len(dummy_users)]
+        quiz = Quiz(
+            title=quiz_titles[i % len(quiz_titles)],
+            description=quiz_descriptions[i % len(quiz_descriptions)],
+            is_public=True,
+            share_code=share_code_allocator.next_code(),
+            user_id=user.id
+        )
+        db.session.add(quiz)
+        dummy_quizzes.append(quiz)
+    
+    db.session.commit()
+    click.echo(f"✅ Created {quizzes} dummy quizzes")
+    
+    # Create dummy questions
+    question_data = [
+        # General Knowledge
+        {
+            "text": "What is the capital of France?",
+            "type": "multiple_choice",
+            "options": ["London", "Paris", "Berlin", "Madrid"],
+            "answer": "Paris"
+        },
+        {
+            "text": "Which planet is known as the Red Planet?",
+            "type": "multiple_choice", 
+            "options": ["Earth", "Mars", "Jupiter", "Venus"],
+            "answer": "Mars"
+        },
+        {
+            "text": "What is the largest ocean on Earth?",
+            "type": "multiple_choice",
+            "options": ["Atlantic", "Indian", "Arctic", "Pacific"],
+            "answer": "Pacific"
+        },
+        {
+            "text": "Who painted the Mona Lisa?",
+            "type": "multiple_choice",
+            "options": ["Van Gogh", "Da Vinci", "Picasso", "Monet"],
+            "answer": "Da Vinci"
+        },
+        # Science
+        {
+            "text": "What is the chemical symbol for gold?",
+            "type": "multiple_choice",
+            "options": ["Au", "Ag", "Fe", "Cu"],
+            "answer": "Au"
+        },
+        {
+            "text": "What is the hardest natural substance on Earth?",
+            "type": "multiple_choice",
+            "options": ["Iron", "Diamond", "Granite", "Steel"],
+            "answer": "Diamond"
+        },
+        {
+            "text": "What is the largest organ in the human body?",
+            "type": "multiple_choice",
+            "options": ["Heart", "Brain", "Liver", "Skin"],
+            "answer": "Skin"
+        },
+        {
+            "text": "What is the speed of light?",
+            "type": "multiple_choice",
+            "options": ["300,000 km/s", "150,000 km/s", "450,000 km/s", "600,000 km/s"],
+            "answer": "300,000 km/s"
+        },
+        # History
+        {
+            "text": "In which year did World War II end?",
+            "type": "multiple_choice",
+            "options": ["1943", "1944", "1945", "1946"],
+            "answer": "1945"
+        },
+        {
+            "text": "Who was the first President of the United States?",
+            "type": "multiple_choice",
+            "options": ["John Adams", "Thomas Jefferson", "George Washington", "Benjamin Franklin"],
+            "answer": "George Washington"
+        },
+        {
+            "text": "Which ancient wonder was located in Alexandria?",
+            "type": "multiple_choice",
+            "options": ["Colossus", "Lighthouse", "Pyramids", "Gardens"],
+            "answer": "Lighthouse"
+        },
+        {
+            "text": "What year did Columbus discover America?",
+            "type": "multiple_choice",
+            "options": ["1492", "1498", "1500", "1502"],
+            "answer": "1492"
+        },
+        # Geography
+        {
+            "text": "What is the largest country in the world?",
+            "type": "multiple_choice",
+            "options": ["China", "USA", "Canada", "Russia"],
+            "answer": "Russia"
+        },
+        {
+            "text": "Which river is the longest in the world?",
+            "type": "multiple_choice",
+            "options": ["Amazon", "Nile", "Yangtze", "Mississippi"],
+            "answer": "Nile"
+        },
+        {
+            "text": "What is the smallest continent?",
+            "type": "multiple_choice",
+            "options": ["Europe", "Asia", "Australia", "Antarctica"],
+            "answer": "Australia"
+        },
+        {
+            "text": "Which mountain range is the longest in the world?",
+            "type": "multiple_choice",
+            "options": ["Rocky Mountains", "Himalayas", "Andes", "Alps"],
+            "answer": "Andes"
+        },
+        # Math
+        {
+            "text": "What is 15 × 7?",
+            "type": "multiple_choice",
+            "options": ["95", "100", "105", "110"],
+            "answer": "105"
+        },
+        {
+            "text": "What is the square root of 144?",
+            "type": "multiple_choice",
+            "options": ["10", "11", "12", "13"],
+            "answer": "12"
+        },
+        {
+            "text": "What is 25% of 80?",
+            "type": "multiple_choice",
+            "options": ["15", "20", "25", "30"],
+            "answer": "20"
+        },
+        {
+            "text": "What is the next number in the sequence: 2, 4, 8, 16, __?",
+            "type": "multiple_choice",
+            "options": ["24", "32", "30", "28"],
+            "answer": "32"
+        }
+    ]
+    
+    questions_created = 0
+    for i, quiz in enumerate(dummy_quizzes):
+        for j in range(questions_per_quiz):
+            question_index = (i * questions_per_quiz + j) % len(question_data)
+            q_data = question_data[question_index]
+            
+            question = Question(
+                text=q_data["text"],
+                question_type=q_data["type"],
+                options=q_data["options"],
+                correct_answer=q_data["answer"],
+                points=1 + (j % 3),  # 1, 2, or 3 points
+                order=j + 1,
+                quiz_id=quiz.id
             )
-            db.session.add(quiz)
-            dummy_quizzes.append(quiz)
-        
-        db.session.commit()
-        click.echo(f"✅ Created {quizzes} dummy quizzes")
-        
-        # Create dummy questions
-        question_data = [
-            # General Knowledge
-            {
-                "text": "What is the capital of France?",
-                "type": "multiple_choice",
-                "options": ["London", "Paris", "Berlin", "Madrid"],
-                "answer": "Paris"
-            },
-            {
-                "text": "Which planet is known as the Red Planet?",
-                "type": "multiple_choice", 
-                "options": ["Earth", "Mars", "Jupiter", "Venus"],
-                "answer": "Mars"
-            },
-            {
-                "text": "What is the largest ocean on Earth?",
-                "type": "multiple_choice",
-                "options": ["Atlantic", "Indian", "Arctic", "Pacific"],
-                "answer": "Pacific"
-            },
-            {
-                "text": "Who painted the Mona Lisa?",
-                "type": "multiple_choice",
-                "options": ["Van Gogh", "Da Vinci", "Picasso", "Monet"],
-                "answer": "Da Vinci"
-            },
-            # Science
-            {
-                "text": "What is the chemical symbol for gold?",
-                "type": "multiple_choice",
-                "options": ["Au", "Ag", "Fe", "Cu"],
-                "answer": "Au"
-            },
-            {
-                "text": "What is the hardest natural substance on Earth?",
-                "type": "multiple_choice",
-                "options": ["Iron", "Diamond", "Granite", "Steel"],
-                "answer": "Diamond"
-            },
-            {
-                "text": "What is the largest organ in the human body?",
-                "type": "multiple_choice",
-                "options": ["Heart", "Brain", "Liver", "Skin"],
-                "answer": "Skin"
-            },
-            {
-                "text": "What is the speed of light?",
-                "type": "multiple_choice",
-                "options": ["300,000 km/s", "150,000 km/s", "450,000 km/s", "600,000 km/s"],
-                "answer": "300,000 km/s"
-            },
-            # History
-            {
-                "text": "In which year did World War II end?",
-                "type": "multiple_choice",
-                "options": ["1943", "1944", "1945", "1946"],
-                "answer": "1945"
-            },
-            {
-                "text": "Who was the first President of the United States?",
-                "type": "multiple_choice",
-                "options": ["John Adams", "Thomas Jefferson", "George Washington", "Benjamin Franklin"],
-                "answer": "George Washington"
-            },
-            {
-                "text": "Which ancient wonder was located in Alexandria?",
-                "type": "multiple_choice",
-                "options": ["Colossus", "Lighthouse", "Pyramids", "Gardens"],
-                "answer": "Lighthouse"
-            },
-            {
-                "text": "What year did Columbus discover America?",
-                "type": "multiple_choice",
-                "options": ["1492", "1498", "1500", "1502"],
-                "answer": "1492"
-            },
-            # Geography
-            {
-                "text": "What is the largest country in the world?",
-                "type": "multiple_choice",
-                "options": ["China", "USA", "Canada", "Russia"],
-                "answer": "Russia"
-            },
-            {
-                "text": "Which river is the longest in the world?",
-                "type": "multiple_choice",
-                "options": ["Amazon", "Nile", "Yangtze", "Mississippi"],
-                "answer": "Nile"
-            },
-            {
-                "text": "What is the smallest continent?",
-                "type": "multiple_choice",
-                "options": ["Europe", "Asia", "Australia", "Antarctica"],
-                "answer": "Australia"
-            },
-            {
-                "text": "Which mountain range is the longest in the world?",
-                "type": "multiple_choice",
-                "options": ["Rocky Mountains", "Himalayas", "Andes", "Alps"],
-                "answer": "Andes"
-            },
-            # Math
-            {
-                "text": "What is 15 × 7?",
-                "type": "multiple_choice",
-                "options": ["95", "100", "105", "110"],
-                "answer": "105"
-            },
-            {
-                "text": "What is the square root of 144?",
-                "type": "multiple_choice",
-                "options": ["10", "11", "12", "13"],
-                "answer": "12"
-            },
-            {
-                "text": "What is 25% of 80?",
-                "type": "multiple_choice",
-                "options": ["15", "20", "25", "30"],
-                "answer": "20"
-            },
-            {
-                "text": "What is the next number in the sequence: 2, 4, 8, 16, __?",
-                "type": "multiple_choice",
-                "options": ["24", "32", "30", "28"],
-                "answer": "32"
-            }
-        ]
-        
-        questions_created = 0
-        for i, quiz in enumerate(dummy_quizzes):
-            for j in range(questions_per_quiz):
-                question_index = (i * questions_per_quiz + j) % len(question_data)
-                q_data = question_data[question_index]
-                
-                question = Question(
-                    text=q_data["text"],
-                    question_type=q_data["type"],
-                    options=q_data["options"],
-                    correct_answer=q_data["answer"],
-                    points=1 + (j % 3),  # 1, 2, or 3 points
-                    order=j + 1,
-                    quiz_id=quiz.id
-                )
-                db.session.add(question)
-                questions_created += 1
-        
+            db.session.add(question)
+            questions_created += 1
+    
+    db.session.commit()
+    click.echo(f"✅ Created {questions_created} dummy questions")
+    
+    # Display summary
+    click.echo("\n" + "="*50)
+    click.echo("🎉 DUMMY DATA CREATION COMPLETE!")
+    click.echo("="*50)
+    click.echo(f"👥 Users created: {users}")
+    click.echo(f"📝 Quizzes created: {quizzes}")
+    click.echo(f"❓ Questions created: {questions_created}")
+    click.echo(f"🔗 Total questions: {questions_created}")
+    click.echo("\n💡 You can now test the API with this data!")
+    click.echo("🌐 Start the server with: python app.py")
+    click.echo("🧪 Test with: python test_api.py")
+
+@cli.command("seed-data")
+@click.option('--users', default=1000, help='Number of users to create')
+@click.option('--quizzes', default=1000, help='Number of quizzes to create')
+@click.option('--questions-per-quiz', default=10, help='Average number of questions per quiz')
+@click.option('--attempts', default=100000, help='Number of quiz attempts to create, each answering every question')
+@click.option('--seed', default=0, help='Random seed; the same seed and sizes give the same data')
+@click.option('--batch-size', default=SEED_BATCH_SIZE, help='Rows per multi-row insert')
+def seed_data(users, quizzes, questions_per_quiz, attempts, seed, batch_size):
+    """Generate a large, realistically skewed data set with bulk inserts (see seeding.py)"""
+    try:
+        plan = SeedPlan(users, quizzes, questions_per_quiz, attempts, seed=seed, batch_size=batch_size)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    
+    # Reserve share codes a quiz chunk at a time rather than per SHARE_CODE_BLOCK_SIZE
+    allocator = ShareCodeAllocator(reserve_share_code_block, key=share_code_allocator.key, block_size=plan.chunk_size)
+    models = {
+        'user': User,
+        'quiz': Quiz,
+        'question': Question,
+        'quiz_attempt': QuizAttempt,
+        'quiz_response': QuizResponse
+    }
+    counts = dict.fromkeys(models, 0)
+    started = time.perf_counter()
+    for table, rows in generate(plan, allocator.next_code):
+        db.session.execute(insert(models[table]), rows)
+        if table == 'quiz_attempt':
+            record_scores(rows)
         db.session.commit()
-        click.echo(f"✅ Created {questions_created} dummy questions")
-        
-        # Display summary
-        click.echo("\n" + "="*50)
-        click.echo("🎉 DUMMY DATA CREATION COMPLETE!")
-        click.echo("="*50)
-        click.echo(f"👥 Users created: {users}")
-        click.echo(f"📝 Quizzes created: {quizzes}")
-        click.echo(f"❓ Questions created: {questions_created}")
-        click.echo(f"🔗 Total questions: {questions_created}")
-        click.echo("\n💡 You can now test the API with this data!")
-        click.echo("🌐 Start the server with: python app.py")
-        click.echo("🧪 Test with: python test_api.py")
-
-@app.cli.command("clear-data")
+        counts[table] += len(rows)
+        if table == 'quiz':
+            click.echo(f"⏳ {counts['quiz']}/{quizzes} quizzes, {counts['quiz_attempt']} attempts so far")
+    
+    elapsed = time.perf_counter() - started
+    total_rows = sum(counts.values())
+    click.echo(f"👥 Users created: {counts['user']}")
+    click.echo(f"📝 Quizzes created: {counts['quiz']}")
+    click.echo(f"❓ Questions created: {counts['question']}")
+    click.echo(f"🧾 Attempts created: {counts['quiz_attempt']}")
+    click.echo(f"✏️  Answers created: {counts['quiz_response']}")
+    click.echo(f"✅ Inserted {total_rows} rows in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):.0f} rows/s)")
+
+@cli.command("clear-data")
 @click.confirmation_option(prompt='Are you sure you want to delete all data? This cannot be undone!')
 def clear_data():
     """Clear all data from the database"""
-    with app.app_context():
-        db.drop_all()
-        db.create_all()
-        click.echo("🗑️  All data cleared! Database tables recreated.")
+    db.drop_all()
+    db.create_all()
+    click.echo("🗑️  All data cleared! Database tables recreated.")
 
-@app.cli.command("list-data")
+@cli.command("list-data")
 def list_data():
     """List all data in the database"""
-    with app.app_context():
-        users = User.query.all()
-        quizzes = Quiz.query.all()
-        questions = Question.query.all()
-        quiz_responses = QuizResponse.query.all()
-        
-        click.echo("📊 DATABASE CONTENTS")
-        click.echo("="*30)
+    users = User.query.all()
+    quizzes = Quiz.query.all()
+    questions = Question.query.all()
+    quiz_attempts = QuizAttempt.query.all()
+    # Creators and quiz titles are looked up in memory instead of one query per row
+    users_by_id = {user.id: user for user in users}
+    quizzes_by_id = {quiz.id: quiz for quiz in quizzes}
+    
+    click.echo("📊 DATABASE CONTENTS")
+    click.echo("="*30)
+    
+    click.echo(f"\n👥 USERS ({len(users)}):")
+    for user in users:
+        click.echo(f"  - {user.username} ({user.email}) - ID: {user.id}")
+    
+    click.echo(f"\n📝 QUIZZES ({len(quizzes)}):")
+    for quiz in quizzes:
+        creator = users_by_id.get(quiz.user_id)
+        creator_name = creator.username if creator else "Unknown"
+        click.echo(f"  - {quiz.title} by {creator_name} - Share: {quiz.share_code}")
+    
+    click.echo(f"\n❓ QUESTIONS ({len(questions)}):")
+    for question in questions:
+        quiz = quizzes_by_id.get(question.quiz_id)
+        quiz_title = quiz.title if quiz else "Unknown Quiz"
+        click.echo(f"  - {question.text[:50]}... ({quiz_title})")
+    
+    click.echo(f"\n📊 QUIZ ATTEMPTS ({len(quiz_attempts)}):")
+    for attempt in quiz_attempts[:10]:  # Show first 10 attempts
+        quiz = quizzes_by_id.get(attempt.quiz_id)
+        quiz_title = quiz.title if quiz else "Unknown Quiz"
+        click.echo(f"  - {attempt.user_name} ({attempt.user_email}) - {quiz_title} - {attempt.correct_answers}/{attempt.total_questions}")
+    if len(quiz_attempts) > 10:
+        click.echo(f"  ... and {len(quiz_attempts) - 10} more attempts")
+
+@cli.command("view-responses")
+@click.option('--quiz-id', help='Quiz ID to view responses for')
+def view_responses(quiz_id):
+    """View quiz responses for a specific quiz or all quizzes"""
+    if quiz_id:
+        # View responses for specific quiz
+        quiz = Quiz.query.get(quiz_id)
+        if not quiz:
+            click.echo(f"❌ Quiz with ID {quiz_id} not found")
+            return
         
-        click.echo(f"\n👥 USERS ({len(users)}):")
-        for user in users:
-            click.echo(f"  - {user.username} ({user.email}) - ID: {user.id}")
+        attempts = QuizAttempt.query.filter_by(quiz_id=quiz_id).order_by(QuizAttempt.submitted_at).all()
+        click.echo(f"\n📊 RESPONSES FOR QUIZ: {quiz.title}")
+        click.echo("="*50)
         
-        click.echo(f"\n📝 QUIZZES ({len(quizzes)}):")
-        for quiz in quizzes:
-            creator = User.query.get(quiz.user_id)
-            creator_name = creator.username if creator else "Unknown"
-            click.echo(f"  - {quiz.title} by {creator_name} - Share: {quiz.share_code}")
+        if not attempts:
+            click.echo("No responses found for this quiz.")
+            return
         
-        click.echo(f"\n❓ QUESTIONS ({len(questions)}):")
-        for question in questions:
-            quiz = Quiz.query.get(question.quiz_id)
-            quiz_title = quiz.title if quiz else "Unknown Quiz"
-            click.echo(f"  - {question.text[:50]}... ({quiz_title})")
+        # Load every answer and question text for the quiz up front
+        answers_by_attempt = {}
+        for response in QuizResponse.query.filter_by(quiz_id=quiz_id).all():
+            answers_by_attempt.setdefault(response.attempt_id, []).append(response)
+        question_texts = dict(
+            db.session.query(Question.id, Question.text).filter(Question.quiz_id == quiz_id).all()
+        )
         
-        click.echo(f"\n📊 QUIZ RESPONSES ({len(quiz_responses)}):")
-        for response in quiz_responses[:10]:  # Show first 10 responses
-            quiz = Quiz.query.get(response.quiz_id)
-            quiz_title = quiz.title if quiz else "Unknown Quiz"
-            click.echo(f"  - {response.user_name} ({response.user_email}) - {quiz_title} - {'✓' if response.is_correct else '✗'}")
-        if len(quiz_responses) > 10:
-            click.echo(f"  ... and {len(quiz_responses) - 10} more responses")
-
-@app.cli.command("view-responses")
-@click.option('--quiz-id', help='Quiz ID to view responses for')
-def view_responses(quiz_id):
-    """View quiz responses for a specific quiz or all quizzes"""
-    with app.app_context():
-        if quiz_id:
-            # View responses for specific quiz
-            quiz = Quiz.query.get(quiz_id)
-            if not quiz:
-                click.echo(f"❌ Quiz with ID {quiz_id} not found")
-                return
-            
-            responses = QuizResponse.query.filter_by(quiz_id=quiz_id).all()
-            click.echo(f"\n📊 RESPONSES FOR QUIZ: {quiz.title}")
-            click.echo("="*50)
-            
-            if not responses:
-                click.echo("No responses found for this quiz.")
-                return
+        for attempt in attempts:
+            click.echo(f"\n👤 {attempt.user_name} ({attempt.user_email})")
+            if attempt.user_phone:
+                click.echo(f"   📱 Phone: {attempt.user_phone}")
             
-            # Group by user
-            user_responses = {}
-            for response in responses:
-                user_key = response.user_email
-                if user_key not in user_responses:
-                    user_responses[user_key] = {
-                        'name': response.user_name,
-                        'email': response.user_email,
-                        'phone': response.user_phone,
-                        'responses': [],
-                        'total_points': 0,
-                        'correct_answers': 0
-                    }
-                
-                user_responses[user_key]['responses'].append({
-                    'question_id': response.question_id,
-                    'answer': response.answer,
-                    'is_correct': response.is_correct,
-                    'points': response.points_earned
-                })
-                
-                if response.is_correct:
-                    user_responses[user_key]['correct_answers'] += 1
-                user_responses[user_key]['total_points'] += response.points_earned
+            click.echo(f"   📊 Score: {attempt.points_earned} points")
+            click.echo(f"   ✅ Correct: {attempt.correct_answers}/{attempt.total_questions} ({attempt.percentage}%)")
             
-            for user_email, user_data in user_responses.items():
-                click.echo(f"\n👤 {user_data['name']} ({user_data['email']})")
-                if user_data['phone']:
-                    click.echo(f"   📱 Phone: {user_data['phone']}")
-                
-                total_questions = len(user_data['responses'])
-                percentage = round((user_data['correct_answers'] / total_questions) * 100) if total_questions > 0 else 0
-                
-                click.echo(f"   📊 Score: {user_data['total_points']} points")
-                click.echo(f"   ✅ Correct: {user_data['correct_answers']}/{total_questions} ({percentage}%)")
-                
-                for i, resp in enumerate(user_data['responses'], 1):
-                    question = Question.query.get(resp['question_id'])
-                    question_text = question.text[:60] + "..." if question and len(question.text) > 60 else (question.text if question else "Unknown question")
-                    status = "✓" if resp['is_correct'] else "✗"
-                    click.echo(f"   {i}. {status} {question_text}")
-                    click.echo(f"      Answer: {resp['answer']}")
-        else:
-            # View all quiz responses summary
-            quizzes = Quiz.query.all()
-            click.echo("\n📊 QUIZ RESPONSES SUMMARY")
-            click.echo("="*40)
-            
-            for quiz in quizzes:
-                responses = QuizResponse.query.filter_by(quiz_id=quiz.id).all()
-                if responses:
-                    unique_users = len(set([r.user_email for r in responses]))
-                    total_responses = len(responses)
-                    correct_responses = len([r for r in responses if r.is_correct])
-                    
-                    click.echo(f"\n📝 {quiz.title}")
-                    click.echo(f"   👥 Users: {unique_users}")
-                    click.echo(f"   📊 Responses: {total_responses}")
-                    click.echo(f"   ✅ Correct: {correct_responses}")
-                    click.echo(f"   🔗 Share Code: {quiz.share_code}")
+            for i, resp in enumerate(answers_by_attempt.get(attempt.id, []), 1):
+                question_text = question_texts.get(resp.question_id, "Unknown question")
+                if len(question_text) > 60:
+                    question_text = question_text[:60] + "..."
+                status = "✓" if resp.is_correct else "✗"
+                click.echo(f"   {i}. {status} {question_text}")
+                click.echo(f"      Answer: {resp.answer}")
+    else:
+        # View all quiz responses summary, aggregated per quiz in the database
+        summary = db.session.query(
+            Quiz.title,
+            Quiz.share_code,
+            func.count(func.distinct(QuizAttempt.user_email)).label('unique_users'),
+            func.count(QuizAttempt.id).label('attempts'),
+            func.sum(QuizAttempt.total_questions).label('total_responses'),
+            func.sum(QuizAttempt.correct_answers).label('correct_responses')
+        ).join(QuizAttempt, QuizAttempt.quiz_id == Quiz.id).group_by(Quiz.id, Quiz.title, Quiz.share_code).all()
+        click.echo("\n📊 QUIZ RESPONSES SUMMARY")
+        click.echo("="*40)
+        
+        for quiz in summary:
+            click.echo(f"\n📝 {quiz.title}")
+            click.echo(f"   👥 Users: {quiz.unique_users}")
+            click.echo(f"   📝 Attempts: {quiz.attempts}")
+            click.echo(f"   📊 Responses: {quiz.total_responses}")
+            click.echo(f"   ✅ Correct: {quiz.correct_responses}")
+            click.echo(f"   🔗 Share Code: {quiz.share_code}")
+
+@cli.command("quiz-stats")
+@click.option('--quiz-id', required=True, help='Quiz ID to analyse')
+def quiz_stats(quiz_id):
+    """Show the score distribution and per-question analysis for a quiz"""
+    quiz = Quiz.query.get(quiz_id)
+    if not quiz:
+        click.echo(f"❌ Quiz with ID {quiz_id} not found")
+        return
+    
+    buckets = db.session.query(QuizScoreBucket.percentage, QuizScoreBucket.attempts) \
+        .filter(QuizScoreBucket.quiz_id == quiz_id).order_by(QuizScoreBucket.percentage).all()
+    summary = score_summary(buckets)
+    _, questions = quiz_item_analysis(quiz_id)
+    
+    click.echo(f"\n📊 STATS FOR: {quiz.title}")
+    click.echo("="*50)
+    click.echo(f"📝 Attempts: {summary['attempts']}")
+    if summary['attempts']:
+        percentiles = ', '.join(f"{name}={value}%" for name, value in summary['percentiles'].items())
+        click.echo(f"📈 Mean: {summary['mean_percentage']}%  ({percentiles})")
+    
+    for question in questions:
+        click.echo(f"\n❓ Q{question['order']}: {question['text']}")
+        if not question['responses']:
+            click.echo("   No responses yet")
+            continue
+        click.echo(f"   ✅ Correct: {question['percent_correct']}% of {question['responses']}")
+        click.echo(f"   🎯 Discrimination: {question['discrimination_index']}")
+        for option in question['options'][:5]:
+            click.echo(f"   - {option['answer']}: {option['count']} ({option['percentage']}%)")
+
+@cli.command("export-quizzes")
+@click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson', help='Output format')
+@click.option('--output', type=click.File('w'), default='-', help='File to write to (default: stdout)')
+@click.option('--user-email', help='Only export quizzes owned by this user')
+def export_quizzes(export_format, output, user_email):
+    """Stream quizzes and their questions in the portable quiz bank format"""
+    for chunk in encode_quizzes(iter_quiz_records(quiz_export_rows(user_email)), export_format):
+        output.write(chunk)
+
+@cli.command("import-quizzes")
+@click.option('--format', 'import_format', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson', help='Input format')
+@click.option('--input', 'input_file', type=click.File('r'), default='-', help='File to read from (default: stdin)')
+@click.option('--owner-email', help='Give every imported quiz to this user instead of its user_email')
+@click.option('--batch-size', default=IMPORT_BATCH_SIZE, help='Questions validated and written per transaction')
+def import_quizzes_command(import_format, input_file, owner_email, batch_size):
+    """Import quizzes and questions, upserting on id"""
+    try:
+        summary = import_quizzes(input_file, import_format, owner_email=owner_email, batch_size=batch_size)
+    except LookupError as e:
+        click.echo(f"❌ {e}", err=True)
+        return
+    
+    click.echo(f"✅ Imported {summary['quizzes']} quizzes and {summary['questions']} questions", err=True)
+    if summary['error_count']:
+        click.echo(f"⚠️  Skipped {summary['error_count']} invalid records", err=True)
+        for error in summary['errors']:
+            click.echo(f"   line {error['line']}: {error['error']}", err=True)
+
+@cli.command("export-responses")
+@click.option('--quiz-id', required=True, help='Quiz ID to export responses for')
+@click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson', help='Output format')
+@click.option('--output', type=click.File('w'), default='-', help='File to write to (default: stdout)')
+def export_responses(quiz_id, export_format, output):
+    """Stream all responses for a quiz as NDJSON or CSV"""
+    if not Quiz.query.get(quiz_id):
+        click.echo(f"❌ Quiz with ID {quiz_id} not found", err=True)
+        return
+    
+    for chunk in iter_export(response_export_rows(quiz_id), RESPONSE_EXPORT_FIELDS, export_format):
+        output.write(chunk)
+
+@cli.command("flush-submissions")
+@click.option('--retry-dead-letters', is_flag=True, help='Queue submissions that repeatedly failed to write again first')
+def flush_submissions(retry_dead_letters):
+    """Write every queued submission to the database now"""
+    if submission_flusher is None:
+        click.echo("ℹ️  SUBMISSION_INGESTION_MODE is not 'queue'; nothing to flush")
+        return
+    
+    if retry_dead_letters:
+        click.echo(f"🔁 Requeued {submission_queue.requeue_dead_letters()} dead-lettered submissions")
+    written = submission_flusher.drain()
+    click.echo(f"✅ Flushed {written} queued submissions")
+    
+    dead_letters = submission_queue.dead_letters()
+    if dead_letters:
+        click.echo(f"⚠️  {len(dead_letters)} submissions could not be written and are in the dead letter table:", err=True)
+        for attempt_id, failures, error in dead_letters:
+            click.echo(f"   {attempt_id}: {failures} failures, last {error}", err=True)
+        click.echo("   Fix the cause, then run flask flush-submissions --retry-dead-letters", err=True)
 
 # Root route for domain access
-@app.route('/')
+@route('/')
 def index():
     return jsonify({
         'message': 'Welcome to Quizzy API!',
@@ -1051,8 +2003,74 @@ def index():
     })
 
 
-init_app(app)
-migrate = Migrate(app, db)
+def create_app(config=None):
+    """Build the Flask app.
+    
+    Creating it opens no database connections, so a server may build it
+    once and fork workers from it (gunicorn --preload); each worker then
+    opens its own connections. Apply schema changes with `flask db upgrade`.
+    """
+    flask_app = Flask(__name__, instance_path=INSTANCE_PATH)
+    flask_app.json = JSONProvider(flask_app)
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('SQLALCHEMY_DATABASE_URI')
+    flask_app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    flask_app.config['ADMIN_TOKEN'] = os.getenv('ADMIN_TOKEN')
+    flask_app.config.update(config or {})
+    # The primary, the replicas and the migrations all connect with the one installed Postgres driver
+    flask_app.config['SQLALCHEMY_DATABASE_URI'] = database_uri(flask_app.config['SQLALCHEMY_DATABASE_URI'])
+    flask_app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(flask_app.config['SQLALCHEMY_DATABASE_URI']))
+    # Read replicas are extra binds; replicas.py decides which reads go to them
+    flask_app.config.setdefault('SQLALCHEMY_BINDS', replica_binds(os.getenv('REPLICA_DATABASE_URIS'), engine_options, database_uri))
+    
+    CORS(flask_app, resources={
+        # Health endpoints - allow ANY origin (*)
+        r"/health/*": {
+            "origins": "*",
+            "methods": ["GET", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization"]
+        },
+        # All other endpoints - only specific client URLs
+        r"/api/*": {
+            "origins": API_CORS_ORIGINS,
+            "methods": API_CORS_METHODS,
+            "allow_headers": API_CORS_ALLOW_HEADERS,
+            "expose_headers": API_CORS_EXPOSE_HEADERS,
+            # "supports_credentials": True  # Allow cookies/auth headers
+        },
+    })
+    
+    db.init_app(flask_app)
+    migrate.init_app(flask_app, db)
+    for rule, view, options in routes:
+        flask_app.add_url_rule(rule, view_func=view, **options)
+    for command in cli.commands.values():
+        flask_app.cli.add_command(command)
+    if submission_flusher is not None:
+        submission_flusher.writer = functools.partial(write_queued_attempts, flask_app)
+        flask_app.before_request(submission_flusher.ensure_started)
+    init_metrics(flask_app, db)
+    init_query_budget(flask_app)
+    init_replicas(flask_app, db)
+    
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            init_pool_liveness(engine)
+    _live_apps.add(flask_app)
+    return flask_app
+
+# Apps whose pools are emptied in forked children; weak, so an app that is dropped (e.g. a test's) is not kept
+_live_apps = weakref.WeakSet()
+
+def _dispose_pools_after_fork():
+    """Pooled connections must not be shared with forked workers; each child starts with empty pools"""
+    for flask_app in list(_live_apps):
+        with flask_app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+os.register_at_fork(after_in_child=_dispose_pools_after_fork)
+
+app = create_app()
 
 
 
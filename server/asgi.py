@@ -0,0 +1,307 @@
+"""
+ASGI entry point: async handlers for the I/O-bound hot paths, Flask for the rest.
+
+These run as coroutines on an async SQLAlchemy engine (asyncpg for Postgres,
+aiosqlite for SQLite), so a request waiting on the database parks instead of
+holding a worker thread:
+
+    GET  /api/quizzes
+    GET  /api/quizzes/share/<share_code>
+    GET  /api/quizzes/<quiz_id>/responses
+    POST /api/quiz-responses
+
+Every other request, including other methods on those paths and CORS
+preflights, is passed to the Flask app on a thread pool. Both stacks share
+the models, caches, validation and response bodies in app.py.
+
+Select it with SERVER_MODE=asgi (see gunicorn.conf.py), or run it directly:
+
+    uvicorn asgi:application --workers 4
+"""
+
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Match, Mount, Route
+from werkzeug.http import parse_etags
+
+import app as quizzy
+from app import (
+    API_CORS_ALLOW_HEADERS, API_CORS_EXPOSE_HEADERS, API_CORS_METHODS, API_CORS_ORIGINS,
+    IDEMPOTENCY_KEY_HEADER, IDEMPOTENT_REPLAY_HEADER, QUIZ_LIST_FIELDS,
+    Question, Quiz, QuizAttempt, QuizResponse, QuizScoreBucket,
+    answer_key_cache, attempt_score, graded_submission, idempotency_cache, logger, queue_submission,
+    quiz_attempt_columns, quiz_list_columns, quiz_list_filter, quiz_payload, quiz_payload_cache, quiz_responses_page,
+    remember_submission, score_bucket_rows, score_bucket_upsert, share_code_cache,
+    submission_error, submission_idempotency_key, upsert_statement
+)
+from grading import build_answer_key
+from ingestion import QueueFull
+from metrics import REQUEST_LATENCY, REQUESTS
+from pooling import async_engine_options, init_pool_liveness
+from pagination import (
+    NEXT_CURSOR_HEADER, PaginationError, keyset_ordered, parse_fields, parse_page_args, split_page
+)
+from serialization import QUIZ_LISTING, dumps
+
+# Async driver used for each database the sync app can be configured with
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+
+def async_database_uri(uri):
+    """The sync database URI with its driver swapped for an async one"""
+    url = make_url(uri)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f'No async driver for {url.get_backend_name()}; set ASYNC_DATABASE_URI')
+    return url.set(drivername=driver)
+
+
+def create_engine_for(uri):
+    """The async engine, pooled according to DB_POOL_PROFILE like the Flask one (see pooling.py)"""
+    url = make_url(os.getenv('ASYNC_DATABASE_URI') or async_database_uri(uri))
+    engine = create_async_engine(url, **async_engine_options(url))
+    init_pool_liveness(engine.sync_engine)
+    return engine
+
+
+async_engine = create_engine_for(quizzy.app.config['SQLALCHEMY_DATABASE_URI'])
+Session = async_sessionmaker(async_engine, expire_on_commit=False)
+# As for the Flask engines: a forked worker starts with an empty pool instead of sharing the parent's connections
+os.register_at_fork(after_in_child=lambda: async_engine.sync_engine.dispose(close=False))
+
+
+def json_response(payload, status=200, headers=None):
+    return Response(dumps(payload), status_code=status, media_type='application/json', headers=headers)
+
+
+def error_response(message, status):
+    return json_response({'error': message}, status)
+
+
+def page_response(payload, next_cursor):
+    return json_response(payload, headers={NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None)
+
+
+def instrumented(endpoint, handler):
+    """Record the same request metrics as the Flask endpoint of that name"""
+    async def handle(request):
+        start = time.perf_counter()
+        response = await handler(request)
+        REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - start)
+        REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        return response
+    return handle
+
+
+async def get_quizzes(request):
+    try:
+        limit, cursor = parse_page_args(request.query_params)
+        fields = parse_fields(request.query_params, QUIZ_LIST_FIELDS)
+    except PaginationError as e:
+        return error_response(str(e), 400)
+
+    stmt = select(*quiz_list_columns(fields)).where(quiz_list_filter(request.query_params.get('user_id')))
+    async with Session() as session:
+        rows = (await session.execute(keyset_ordered(stmt, Quiz.created_at, Quiz.id, limit, cursor))).all()
+    quizzes, next_cursor = split_page(rows, Quiz.created_at, Quiz.id, limit)
+    return page_response(QUIZ_LISTING.only(fields).dump_rows(quizzes), next_cursor)
+
+
+async def load_quiz_payload(quiz_id):
+    async with Session() as session:
+        quiz = await session.get(Quiz, quiz_id)
+        if quiz is None:
+            return None
+        questions = (await session.scalars(
+            select(Question).where(Question.quiz_id == quiz_id).order_by(Question.order)
+        )).all()
+    return quiz_payload(quiz, questions)
+
+
+async def get_quiz_by_share_code(request):
+    share_code = request.path_params['share_code']
+    quiz_id = share_code_cache.get(share_code)
+    if quiz_id is None:
+        async with Session() as session:
+            quiz_id = await session.scalar(select(Quiz.id).where(Quiz.share_code == share_code))
+        if not quiz_id:
+            return error_response('Quiz not found', 404)
+        share_code_cache.set(share_code, quiz_id)
+
+    payload = quiz_payload_cache.get(quiz_id)
+    if payload is None:
+        payload = await load_quiz_payload(quiz_id)
+        if payload is None:
+            return error_response('Quiz not found', 404)
+        quiz_payload_cache.set(quiz_id, payload)
+
+    headers = {'ETag': f'"{payload.etag}"', 'Cache-Control': 'no-cache'}
+    if parse_etags(request.headers.get('if-none-match')).contains_weak(payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(payload.body, media_type='application/json', headers=headers)
+
+
+async def get_quiz_responses(request):
+    quiz_id = request.path_params['quiz_id']
+    async with Session() as session:
+        quiz = await session.get(Quiz, quiz_id)
+        if not quiz:
+            return error_response('Quiz not found', 404)
+        try:
+            limit, cursor = parse_page_args(request.query_params)
+        except PaginationError as e:
+            return error_response(str(e), 400)
+
+        total_attempts = await session.scalar(select(func.count(QuizAttempt.id)).where(QuizAttempt.quiz_id == quiz_id))
+        stmt = keyset_ordered(
+            select(*quiz_attempt_columns()).where(QuizAttempt.quiz_id == quiz_id),
+            QuizAttempt.submitted_at, QuizAttempt.id, limit, cursor
+        )
+        attempts, next_cursor = split_page((await session.execute(stmt)).all(), QuizAttempt.submitted_at, QuizAttempt.id, limit)
+    return page_response(quiz_responses_page(quiz, total_attempts, attempts, next_cursor), next_cursor)
+
+
+async def find_submission(session, quiz_id, idempotency_key):
+    """Async twin of app.find_submission"""
+    score = idempotency_cache.get((quiz_id, idempotency_key))
+    if score is not None:
+        return score
+
+    attempt = await session.scalar(
+        select(QuizAttempt).where(QuizAttempt.quiz_id == quiz_id, QuizAttempt.idempotency_key == idempotency_key)
+    )
+    if attempt is None:
+        return None
+    stored = await session.scalar(select(func.count(QuizResponse.id)).where(QuizResponse.attempt_id == attempt.id))
+    score = attempt_score(attempt, stored)
+    remember_submission(quiz_id, idempotency_key, score)
+    return score
+
+
+def replayed_submission_response(score):
+    return json_response({'message': 'Quiz responses already submitted', **score}, headers={IDEMPOTENT_REPLAY_HEADER: 'true'})
+
+
+async def load_answer_key(session, quiz_id):
+    """The quiz's answer key, or None if the quiz does not exist"""
+    answer_key = answer_key_cache.get(quiz_id)
+    if answer_key is None:
+        if not await session.scalar(select(Quiz.id).where(Quiz.id == quiz_id)):
+            return None
+        rows = await session.execute(
+            select(Question.id, Question.correct_answer, Question.points).where(Question.quiz_id == quiz_id)
+        )
+        answer_key = build_answer_key(rows.all())
+        answer_key_cache.set(quiz_id, answer_key)
+    return answer_key
+
+
+async def submit_quiz_responses(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        data = None
+    error = submission_error(data) if isinstance(data, dict) or data is None else 'Request body must be a JSON object'
+    if error:
+        return error_response(error, 400)
+
+    quiz_id = data['quiz_id']
+    idempotency_key = submission_idempotency_key(data, request.headers.get(IDEMPOTENCY_KEY_HEADER))
+    if idempotency_key is not None and len(idempotency_key) > 100:
+        return error_response(f'{IDEMPOTENCY_KEY_HEADER} must be at most 100 characters', 400)
+
+    async with Session() as session:
+        if idempotency_key is not None:
+            stored = await find_submission(session, quiz_id, idempotency_key)
+            if stored is not None:
+                return replayed_submission_response(stored)
+
+        answer_key = await load_answer_key(session, quiz_id)
+        if answer_key is None:
+            return error_response('Quiz not found', 404)
+
+        try:
+            attempt_row, answer_rows, score = graded_submission(data, idempotency_key, answer_key)
+
+            if quizzy.submission_queue is not None:
+                quizzy.submission_flusher.ensure_started()
+                try:
+                    await asyncio.to_thread(queue_submission, attempt_row, answer_rows)
+                    remember_submission(quiz_id, idempotency_key, score)
+                    return json_response({'message': 'Quiz responses accepted', **score}, 202)
+                except QueueFull:
+                    logger.warning('Submission queue full, writing synchronously', extra={'quiz_id': quiz_id})
+
+            await session.execute(insert(QuizAttempt), [attempt_row])
+            if answer_rows:
+                await session.execute(insert(QuizResponse), answer_rows)
+            await session.execute(
+                score_bucket_upsert(upsert_statement(QuizScoreBucket, async_engine.dialect.name)),
+                score_bucket_rows([attempt_row])
+            )
+            await session.commit()
+            remember_submission(quiz_id, idempotency_key, score)
+            return json_response({'message': 'Quiz responses submitted successfully', **score}, 201)
+
+        except IntegrityError:
+            # A concurrent retry with the same key committed first; answer with its result
+            await session.rollback()
+            stored = await find_submission(session, quiz_id, idempotency_key) if idempotency_key is not None else None
+            if stored is None:
+                logger.exception('Failed to store quiz responses', extra={'quiz_id': quiz_id})
+                return error_response('Failed to store quiz responses', 500)
+            return replayed_submission_response(stored)
+        except Exception as e:
+            await session.rollback()
+            logger.exception('Failed to store quiz responses', extra={'quiz_id': quiz_id})
+            return error_response(f'Failed to store quiz responses: {str(e)}', 500)
+
+
+class FallthroughRoute(Route):
+    """A route that ignores other methods on its path, so they reach the Flask app instead of getting a 405"""
+
+    def matches(self, scope):
+        match, child_scope = super().matches(scope)
+        if match == Match.PARTIAL:
+            return Match.NONE, {}
+        return match, child_scope
+
+
+def api_route(path, endpoint, handler, method):
+    return FallthroughRoute(path, instrumented(endpoint, handler), methods=[method], middleware=[Middleware(
+        CORSMiddleware,
+        allow_origins=API_CORS_ORIGINS,
+        allow_methods=API_CORS_METHODS,
+        allow_headers=API_CORS_ALLOW_HEADERS,
+        expose_headers=API_CORS_EXPOSE_HEADERS
+    )])
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await async_engine.dispose()
+
+
+application = Starlette(
+    routes=[
+        api_route('/api/quizzes', 'get_quizzes', get_quizzes, 'GET'),
+        api_route('/api/quizzes/share/{share_code}', 'get_quiz_by_share_code', get_quiz_by_share_code, 'GET'),
+        api_route('/api/quizzes/{quiz_id}/responses', 'get_quiz_responses', get_quiz_responses, 'GET'),
+        api_route('/api/quiz-responses', 'submit_quiz_responses', submit_quiz_responses, 'POST'),
+        Mount('/', app=WSGIMiddleware(quizzy.app, workers=int(os.getenv('ASGI_WSGI_THREADS', 10))))
+    ],
+    lifespan=lifespan
+)
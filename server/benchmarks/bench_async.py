@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Compare the sync (Flask) and async (asgi.py) stacks as concurrency grows.
+
+Seeds a temporary SQLite database (or --database-url), adds --latency-ms of
+simulated network round trip to every SQL statement on both stacks, then
+drives the same mix of read requests at each --concurrency level:
+
+    sync    Flask behind a pool of --threads worker threads, like one gunicorn
+            worker with that many threads; clients past the limit queue
+    async   the ASGI app on a single event loop, like one uvicorn worker,
+            limited only by its connection pool (ASYNC_POOL_SIZE + ASYNC_MAX_OVERFLOW)
+
+The sync stack's throughput flattens once concurrency passes --threads, while
+the async stack keeps scaling until its connection pool is exhausted or its
+event loop runs out of CPU; the slower the statements, the wider the gap.
+
+    python benchmarks/bench_async.py --concurrency 8 --concurrency 32 --concurrency 128
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_handlers import percentile, seed
+
+
+def request_paths(limit=20):
+    """The read requests to cycle through, aimed at the seeded quiz with the most attempts"""
+    from sqlalchemy import func
+
+    from app import db, QuizScoreBucket
+
+    hot_quiz_id = db.session.query(QuizScoreBucket.quiz_id) \
+        .group_by(QuizScoreBucket.quiz_id) \
+        .order_by(func.sum(QuizScoreBucket.attempts).desc(), QuizScoreBucket.quiz_id).limit(1).scalar()
+    return [f'/api/quizzes?limit={limit}', f'/api/quizzes/{hot_quiz_id}/responses?limit={limit}']
+
+
+def add_latency(engine, seconds, is_async=False):
+    """Sleep on every statement a new connection of `engine` executes, standing in for a database round trip"""
+    from sqlalchemy import event
+
+    def sleep(statement):
+        time.sleep(seconds)
+
+    @event.listens_for(engine.sync_engine if is_async else engine, 'connect')
+    def slow_connection(dbapi_connection, connection_record):
+        if is_async:
+            # aiosqlite runs each connection on its own thread, so this sleeps there, not on the event loop
+            dbapi_connection.run_async(lambda connection: connection.set_trace_callback(sleep))
+        else:
+            dbapi_connection.set_trace_callback(sleep)
+
+
+def summarize(timings, elapsed, errors):
+    timings.sort()
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'throughput_rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(statistics.median(timings), 1),
+        'p95_ms': round(percentile(timings, 95), 1),
+        'max_ms': round(timings[-1], 1)
+    }
+
+
+def run_sync(app, paths, concurrency, threads, total):
+    """`concurrency` closed-loop clients sharing `threads` worker threads"""
+    workers = threading.Semaphore(threads)
+    counter = iter(range(total))
+    lock = threading.Lock()
+    timings, errors = [], []
+
+    def client_loop():
+        client = app.test_client()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            with workers:
+                response = client.get(paths[i % len(paths)])
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(client_loop) for _ in range(concurrency)]:
+            future.result()
+    return summarize(timings, time.perf_counter() - started, len(errors))
+
+
+async def run_async(application, paths, concurrency, total):
+    """`concurrency` closed-loop clients on one event loop"""
+    import httpx
+
+    counter = iter(range(total))
+    timings, errors = [], []
+
+    async def client_loop(client):
+        for i in counter:
+            start = time.perf_counter()
+            response = await client.get(paths[i % len(paths)])
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        return summarize(timings, time.perf_counter() - started, len(errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='Throwaway database to use instead of a temporary SQLite file; '
+                                               'its tables are dropped and recreated. No latency is added to it')
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--quizzes', type=int, default=200)
+    parser.add_argument('--questions-per-quiz', type=int, default=10)
+    parser.add_argument('--attempts', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Simulated round trip per SQL statement')
+    parser.add_argument('--threads', type=int, default=8, help='Worker threads of the sync stack')
+    parser.add_argument('--async-pool-size', type=int, default=50, help='Connection pool size of the async stack')
+    parser.add_argument('--concurrency', type=int, action='append', help='Concurrent clients (repeatable)')
+    parser.add_argument('--requests', type=int, default=400, help='Requests per stack and concurrency level')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    args = parser.parse_args()
+    levels = args.concurrency or [1, 8, 32, 128]
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = args.database_url or \
+        'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['ASYNC_POOL_SIZE'] = str(args.async_pool_size)
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('QUERY_BUDGET_MODE', 'off')
+    from app import app, db
+    import asgi
+
+    seed(args)
+    with app.app_context():
+        paths = request_paths()
+        if not args.database_url:
+            add_latency(db.engine, args.latency_ms / 1000)
+            add_latency(asgi.async_engine, args.latency_ms / 1000, is_async=True)
+            db.engine.dispose()
+        sync_pool_limit = db.engine.pool.size() + db.engine.pool._max_overflow
+
+    if args.threads > sync_pool_limit:
+        print(f'⚠️  --threads {args.threads} exceeds the sync connection pool ({sync_pool_limit}); threads will queue on it')
+
+    async def run_async_levels():
+        results = {}
+        for level in levels:
+            results[level] = await run_async(asgi.application, paths, level, args.requests)
+        await asgi.async_engine.dispose()
+        return results
+
+    sync_results = {}
+    for level in levels:
+        with app.app_context():
+            sync_results[level] = run_sync(app, paths, level, args.threads, args.requests)
+    async_results = asyncio.run(run_async_levels())
+
+    print(f"{'clients':>8} {'sync rps':>10} {'p95 ms':>8} {'async rps':>10} {'p95 ms':>8} {'speedup':>8}")
+    for level in levels:
+        sync, async_ = sync_results[level], async_results[level]
+        print(f"{level:>8} {sync['throughput_rps']:>10.1f} {sync['p95_ms']:>8.1f} "
+              f"{async_['throughput_rps']:>10.1f} {async_['p95_ms']:>8.1f} "
+              f"{async_['throughput_rps'] / sync['throughput_rps']:>7.1f}x")
+        if sync['errors'] or async_['errors']:
+            print(f"         ⚠️  errors: sync {sync['errors']}, async {async_['errors']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'latency_ms': None if args.database_url else args.latency_ms,
+                    'threads': args.threads,
+                    'async_pool_size': args.async_pool_size,
+                    'requests': args.requests,
+                    'paths': paths
+                },
+                'sync': sync_results,
+                'async': async_results
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot request handlers in-process and gate on regressions.
+
+Seeds a database with the `seed-data` generator (a temporary SQLite file, or
+--database-url for a local Postgres), then sends each case's request through
+Flask's test client and records per request:
+
+    median_ms           wall time: the lowest of the --repeats round medians
+    p95_ms              wall time over every timed run
+    queries             SQL statements executed (the most frequent count)
+    alloc_peak_kib      peak memory allocated while handling it (tracemalloc,
+                        measured in separate runs so tracing does not skew timings)
+
+Timing is done in --repeats rounds of --iterations runs after warm-up, with
+the cases interleaved (every case once per round), so a burst of machine
+noise lands on one round of several cases instead of all of one case's runs.
+Noise only ever slows a round down, which is why the fastest round median is
+kept.
+
+Results are written as JSON. Given --baseline, the run is compared to an
+earlier result file and exits with status 1 if a case now issues more
+queries, or its median latency or allocation peak grew by more than
+--threshold (a fraction) and by more than an absolute floor
+(--min-delta-ms, --min-delta-kib), so sub-millisecond jitter on fast
+handlers does not fail the gate.
+
+    python benchmarks/bench_handlers.py --output baseline.json
+    python benchmarks/bench_handlers.py --baseline baseline.json --output current.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Case:
+    """One handler request; `request(client, i)` sends the i-th run, `setup(i)` runs untimed before it"""
+
+    def __init__(self, name, request, setup=None, expect=200):
+        self.name = name
+        self.request = request
+        self.setup = setup
+        self.expect = expect
+
+
+# What each force-deleted owner has: quizzes, and attempts across them
+OWNED_QUIZZES = 3
+OWNED_ATTEMPTS = 30
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, -(-q * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def insert_plan(plan):
+    """Insert everything the `seed-data` generator yields for `plan`"""
+    from sqlalchemy import insert
+
+    from app import db, share_code_allocator, record_scores, User, Quiz, Question, QuizAttempt, QuizResponse
+    from seeding import generate
+
+    models = {
+        'user': User,
+        'quiz': Quiz,
+        'question': Question,
+        'quiz_attempt': QuizAttempt,
+        'quiz_response': QuizResponse
+    }
+    for table, rows in generate(plan, share_code_allocator.next_code, now=datetime(2025, 1, 1)):
+        db.session.execute(insert(models[table]), rows)
+        if table == 'quiz_attempt':
+            record_scores(rows)
+        db.session.commit()
+
+
+def seed(args):
+    from app import app, db
+    from seeding import SeedPlan
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        insert_plan(SeedPlan(args.users, args.quizzes, args.questions_per_quiz, args.attempts, seed=args.seed))
+
+
+def build_cases(runs, seed):
+    """The benchmarked requests, aimed at the seeded quiz with the most attempts"""
+    from sqlalchemy import func
+
+    from app import (
+        db, invalidate_quiz_caches, share_code_cache, Question, Quiz, QuizAttempt, QuizScoreBucket, User
+    )
+    from seeding import SeedPlan, user_identity
+
+    hot_quiz_id = db.session.query(QuizScoreBucket.quiz_id) \
+        .group_by(QuizScoreBucket.quiz_id) \
+        .order_by(func.sum(QuizScoreBucket.attempts).desc(), QuizScoreBucket.quiz_id).limit(1).scalar()
+    hot_quiz = db.session.get(Quiz, hot_quiz_id)
+    share_code = hot_quiz.share_code
+    owner_email = hot_quiz.creator.email
+    questions = db.session.query(Question.id, Question.options) \
+        .filter(Question.quiz_id == hot_quiz_id).order_by(Question.order).all()
+    # Quiz takers without quizzes of their own, busiest first, one deleted per run
+    takers = db.session.query(User.email) \
+        .outerjoin(Quiz, Quiz.user_id == User.id).filter(Quiz.id.is_(None)) \
+        .outerjoin(QuizAttempt, QuizAttempt.user_email == User.email) \
+        .group_by(User.email).order_by(func.count(QuizAttempt.id).desc(), User.email) \
+        .limit(runs).all()
+    if len(takers) < runs:
+        raise SystemExit(f'Need {runs} users without quizzes for delete_user; seed more --users')
+
+    def submit(client, i):
+        return client.post('/api/quiz-responses', headers={'Idempotency-Key': str(uuid.uuid4())}, json={
+            'quiz_id': hot_quiz_id,
+            'user_name': f'Bench {i}',
+            'user_email': f'bench-{i}@example.com',
+            'responses': [{
+                'question_id': question.id,
+                'answer': question.options[i % len(question.options)] if question.options else 'answer'
+            } for question in questions]
+        })
+
+    def add_owner(i):
+        """A user owning a few quizzes with questions and attempts, force-deleted by run i"""
+        insert_plan(SeedPlan(1, OWNED_QUIZZES, len(questions), OWNED_ATTEMPTS, seed=seed + 1 + i))
+
+    def clear_quiz_caches(i):
+        invalidate_quiz_caches(hot_quiz_id)
+        share_code_cache.invalidate(share_code)
+
+    return [
+        Case('submit_quiz_responses', submit, expect=201),
+        Case('get_quizzes', lambda client, i: client.get('/api/quizzes?limit=20')),
+        Case('get_quiz_by_share_code', lambda client, i: client.get(f'/api/quizzes/share/{share_code}')),
+        Case('get_quiz_by_share_code (uncached)', lambda client, i: client.get(f'/api/quizzes/share/{share_code}'),
+             setup=clear_quiz_caches),
+        Case('get_quiz_responses', lambda client, i: client.get(f'/api/quizzes/{hot_quiz_id}/responses?limit=50')),
+        Case('delete_user', lambda client, i: client.delete(f'/api/users?user_email={takers[i].email}&force=true')),
+        Case('delete_user (owns quizzes)', lambda client, i: client.delete(f'/api/users?user_email={owner_email}'),
+             expect=409),
+        Case('delete_user (force, owns quizzes)',
+             lambda client, i: client.delete(f'/api/users?user_email={user_identity(seed + 1 + i, 0)[1]}&force=true'),
+             setup=add_owner),
+    ]
+
+
+def check(case, response):
+    if response.status_code != case.expect:
+        raise SystemExit(f'{case.name}: expected {case.expect}, got {response.status_code}: {response.data[:200]!r}')
+
+
+def time_case(app, case, warmup, iterations, offset):
+    """One round of a case: (milliseconds, statement count) per timed run.
+
+    `offset` keeps run indexes distinct across rounds, for cases that use up a row per run.
+    """
+    from sqlalchemy import event
+
+    from app import db
+
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    client = app.test_client()
+    runs = []
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        for i in range(offset, offset + warmup + iterations):
+            if case.setup:
+                case.setup(i)
+            statements.clear()
+            start = time.perf_counter()
+            response = case.request(client, i)
+            elapsed = time.perf_counter() - start
+            check(case, response)
+            if i >= offset + warmup:
+                runs.append((elapsed * 1000, len(statements)))
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+    return runs
+
+
+def trace_case(app, case, iterations, offset):
+    """Peak KiB allocated per run, traced separately so tracemalloc does not skew the timings"""
+    client = app.test_client()
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(offset, offset + iterations):
+            if case.setup:
+                case.setup(i)
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            response = case.request(client, i)
+            peaks.append((tracemalloc.get_traced_memory()[1] - base) / 1024)
+            check(case, response)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def summarize(rounds, peaks):
+    """A case's result from its timed rounds and traced runs"""
+    timings = sorted(ms for runs in rounds for ms, _ in runs)
+    round_medians = [statistics.median(ms for ms, _ in runs) for runs in rounds]
+    return {
+        'iterations': len(timings),
+        'median_ms': round(min(round_medians), 3),
+        'round_medians_ms': [round(median, 3) for median in round_medians],
+        'p95_ms': round(percentile(timings, 95), 3),
+        'queries': Counter(queries for runs in rounds for _, queries in runs).most_common(1)[0][0],
+        'alloc_peak_kib': round(statistics.median(peaks), 1) if peaks else None
+    }
+
+
+def compare(baseline, current, threshold, floors):
+    """Regressions of `current` against `baseline` case results, as messages.
+
+    A metric regresses when it grew by more than `threshold` (a fraction) and by
+    more than its absolute floor in `floors`, e.g. {'median_ms': 0.5}.
+    """
+    regressions = []
+    for name, result in current.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: queries {base['queries']} -> {result['queries']}")
+        for metric, floor in floors.items():
+            if not base.get(metric) or result.get(metric) is None:
+                continue
+            delta = result[metric] - base[metric]
+            if delta > floor and result[metric] > base[metric] * (1 + threshold):
+                change = (result[metric] / base[metric] - 1) * 100
+                regressions.append(f'{name}: {metric} {base[metric]} -> {result[metric]} (+{change:.0f}%)')
+    return regressions
+
+
+def print_results(cases, baseline=None):
+    print(f"{'case':<36} {'median ms':>10} {'p95 ms':>10} {'queries':>8} {'alloc KiB':>10}")
+    for name, result in cases.items():
+        line = (f"{name:<36} {result['median_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+                f"{result['queries']:>8} {result['alloc_peak_kib']:>10.1f}")
+        base = (baseline or {}).get(name)
+        if base:
+            line += f"   (baseline {base['median_ms']:.3f} ms, {base['queries']} queries, {base['alloc_peak_kib']} KiB)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='Throwaway database to use instead of a temporary SQLite file; '
+                                               'its tables are dropped and recreated')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--quizzes', type=int, default=500)
+    parser.add_argument('--questions-per-quiz', type=int, default=10)
+    parser.add_argument('--attempts', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=20, help='Timed runs per case per round')
+    parser.add_argument('--repeats', type=int, default=8, help='Interleaved timing rounds per case')
+    parser.add_argument('--alloc-iterations', type=int, default=10)
+    parser.add_argument('--case', action='append', help='Only run cases whose name starts with this (repeatable)')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against this results file and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed relative growth of median latency and allocation peak (default 0.25)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                        help='Median latency growth below this many milliseconds is never a regression (default 0.5)')
+    parser.add_argument('--min-delta-kib', type=float, default=16,
+                        help='Allocation peak growth below this many KiB is never a regression (default 16)')
+    args = parser.parse_args()
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = args.database_url or \
+        'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    from app import app, db
+
+    started = time.perf_counter()
+    seed(args)
+    print(f'Seeded {args.users} users, {args.quizzes} quizzes, {args.attempts} attempts '
+          f'in {time.perf_counter() - started:.1f}s')
+
+    runs_per_round = args.warmup + args.iterations
+    traced_from = args.repeats * runs_per_round
+    results = {}
+    with app.app_context():
+        cases = [
+            case for case in build_cases(traced_from + args.alloc_iterations, args.seed)
+            if not args.case or any(case.name.startswith(prefix) for prefix in args.case)
+        ]
+        rounds = {case.name: [] for case in cases}
+        for round_number in range(args.repeats):
+            for case in cases:
+                rounds[case.name].append(time_case(app, case, args.warmup, args.iterations, round_number * runs_per_round))
+                db.session.remove()
+        for case in cases:
+            results[case.name] = summarize(rounds[case.name], trace_case(app, case, args.alloc_iterations, traced_from))
+            db.session.remove()
+        dialect = db.engine.dialect.name
+
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': dialect,
+            'dataset': {key: getattr(args, key) for key in ('users', 'quizzes', 'questions_per_quiz', 'attempts', 'seed')},
+            'warmup': args.warmup,
+            'repeats': args.repeats
+        },
+        'cases': results
+    }
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['meta'].get('dataset') != report['meta']['dataset']:
+            print('⚠️  Baseline was recorded with a different dataset; comparisons may not be meaningful')
+
+    print_results(results, baseline and baseline['cases'])
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if baseline:
+        floors = {'median_ms': args.min_delta_ms, 'alloc_peak_kib': args.min_delta_kib}
+        regressions = compare(baseline['cases'], results, args.threshold, floors)
+        for regression in regressions:
+            print(f'❌ {regression}')
+        if regressions:
+            sys.exit(1)
+        print('✅ No regressions against the baseline')
+
+
+if __name__ == '__main__':
+    main()
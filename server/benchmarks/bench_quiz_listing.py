@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /api/quizzes against a seeded SQLite database.
+
+Compares the old listing (lazy-loading quiz.questions per quiz to count them)
+with the current endpoint, which counts questions in one aggregate query. The
+endpoint is paginated, so it is timed walking every page with the cursor;
+both sides return every public quiz.
+
+    python benchmarks/bench_quiz_listing.py --quizzes 10000 --questions-per-quiz 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+from sqlalchemy import event, insert
+
+from app import app, db, User, Quiz, Question
+from pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+
+
+def seed(quizzes, questions_per_quiz):
+    user_id = str(uuid.uuid4())
+    db.session.execute(insert(User), [{'id': user_id, 'username': 'bench', 'email': 'bench@example.com'}])
+    now = datetime.utcnow()
+    quiz_rows = [{
+        'id': str(uuid.uuid4()),
+        'title': f'Quiz {i}',
+        'description': 'Benchmark quiz',
+        'is_public': True,
+        'share_code': f'{i:08d}',
+        'user_id': user_id,
+        'created_at': now,
+        'updated_at': now
+    } for i in range(quizzes)]
+    db.session.execute(insert(Quiz), quiz_rows)
+    db.session.execute(insert(Question), [{
+        'id': str(uuid.uuid4()),
+        'text': f'Question {j}',
+        'question_type': 'multiple_choice',
+        'options': ['A', 'B', 'C', 'D'],
+        'correct_answer': 'A',
+        'points': 1,
+        'order': j + 1,
+        'quiz_id': row['id']
+    } for row in quiz_rows for j in range(questions_per_quiz)])
+    db.session.commit()
+
+
+def legacy_listing():
+    """The listing as it was before question counts were aggregated"""
+    quizzes = Quiz.query.filter_by(is_public=True).all()
+    return [{'id': quiz.id, 'question_count': len(quiz.questions)} for quiz in quizzes]
+
+
+def cursor_walk(client):
+    """Every page of the current listing, following X-Next-Cursor"""
+    quizzes, cursor = [], None
+    while True:
+        response = client.get('/api/quizzes', query_string={
+            'limit': MAX_PAGE_SIZE, 'fields': 'id,question_count', **({'cursor': cursor} if cursor else {})
+        })
+        quizzes.extend(response.get_json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return quizzes
+
+
+def measure(label, fn, repeat):
+    statements = []
+
+    def count(*args):
+        statements.append(1)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    timings = []
+    for _ in range(repeat):
+        statements.clear()
+        db.session.expunge_all()
+        start = time.perf_counter()
+        rows = len(fn())
+        timings.append(time.perf_counter() - start)
+    event.remove(db.engine, 'before_cursor_execute', count)
+
+    timings.sort()
+    print(f"{label:<24} rows={rows:<7} queries={len(statements):<7} "
+          f"median={timings[len(timings) // 2] * 1000:8.1f} ms  best={timings[0] * 1000:8.1f} ms")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quizzes', type=int, default=10000)
+    parser.add_argument('--questions-per-quiz', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        seed(args.quizzes, args.questions_per_quiz)
+        client = app.test_client()
+
+        print(f"GET /api/quizzes with {args.quizzes} public quizzes, {args.questions_per_quiz} questions each")
+        legacy_rows = measure('lazy question count', legacy_listing, args.repeat)
+        current_rows = measure('aggregate, every page', lambda: cursor_walk(client), args.repeat)
+        if legacy_rows != current_rows:
+            raise SystemExit(f'Row counts differ: {legacy_rows} vs {current_rows}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Compare JSON serialization of the largest responses before and after serialization.py.
+
+Seeds a temporary SQLite database (or --database-url) and loads, once:
+
+    quiz_listing    a page of --limit public quizzes with question counts
+    quiz_payload    the quiz with the most questions, and its questions
+    attempts_page   a page of --limit attempts of the busiest quiz
+
+Each is then serialized --iterations times along four paths:
+
+    handwritten     dicts built by hand with isoformat() per row, encoded by
+                    the json module with sorted keys (jsonify() before)
+    schema_json     the schemas in serialization.py, encoded by the json module
+                    (the fallback without orjson)
+    schema_orjson   the schemas, encoded by orjson
+    rows_orjson     the schemas zipping Core rows selected with schema.columns(),
+                    encoded by orjson; no ORM objects are built
+
+and timed as `serialize_ms`: median time to build and encode the response
+body. `load_and_serialize_ms` adds loading the data with the ORM (the first
+three paths) or as Core rows (rows_orjson), which is what a request pays.
+
+    python benchmarks/bench_serialization.py --quizzes 2000 --limit 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_handlers import seed
+
+PATHS = ('handwritten', 'schema_json', 'schema_orjson', 'rows_orjson')
+
+
+def jsonify_before(obj):
+    """What jsonify() wrote before: the json module with sorted keys and compact separators"""
+    return json.dumps(obj, sort_keys=True, separators=(',', ':')).encode()
+
+
+def handwritten_quiz(quiz, question_count):
+    return {
+        'id': quiz.id,
+        'title': quiz.title,
+        'description': quiz.description,
+        'is_public': quiz.is_public,
+        'share_code': quiz.share_code,
+        'user_id': quiz.user_id,
+        'created_at': quiz.created_at.isoformat(),
+        'question_count': question_count
+    }
+
+
+def build_cases(limit):
+    """Per case, a loader and a serializer for the ORM and Core row paths"""
+    from sqlalchemy import func, select
+
+    from app import db, quiz_attempt_columns, Question, Quiz, QuizAttempt, QuizScoreBucket
+    from serialization import PUBLIC_QUESTION, QUIZ, QUIZ_ATTEMPT, QUIZ_LISTING
+
+    question_count = select(func.count(Question.id)).where(Question.quiz_id == Quiz.id) \
+        .scalar_subquery().label('question_count')
+    big_quiz_id = db.session.query(Question.quiz_id).group_by(Question.quiz_id) \
+        .order_by(func.count(Question.id).desc(), Question.quiz_id).limit(1).scalar()
+    busy_quiz_id = db.session.query(QuizScoreBucket.quiz_id).group_by(QuizScoreBucket.quiz_id) \
+        .order_by(func.sum(QuizScoreBucket.attempts).desc(), QuizScoreBucket.quiz_id).limit(1).scalar()
+    newest_first = (Quiz.created_at.desc(), Quiz.id.desc())
+
+    def listing_orm():
+        return db.session.query(Quiz, question_count).filter(Quiz.is_public == True) \
+            .order_by(*newest_first).limit(limit).all()
+
+    def listing_rows():
+        return db.session.execute(select(*QUIZ.columns(Quiz), question_count)
+                                  .where(Quiz.is_public == True).order_by(*newest_first).limit(limit)).all()
+
+    def payload_orm():
+        return db.session.get(Quiz, big_quiz_id), \
+            Question.query.filter_by(quiz_id=big_quiz_id).order_by(Question.order).all()
+
+    def payload_rows():
+        return db.session.execute(select(*QUIZ.columns(Quiz)).where(Quiz.id == big_quiz_id)).one(), \
+            db.session.execute(select(*PUBLIC_QUESTION.columns(Question))
+                               .where(Question.quiz_id == big_quiz_id).order_by(Question.order)).all()
+
+    def attempts_orm():
+        return db.session.query(QuizAttempt).filter(QuizAttempt.quiz_id == busy_quiz_id) \
+            .order_by(QuizAttempt.submitted_at.desc(), QuizAttempt.id.desc()).limit(limit).all()
+
+    def attempts_rows():
+        return db.session.execute(select(*quiz_attempt_columns())
+                                  .where(QuizAttempt.quiz_id == busy_quiz_id)
+                                  .order_by(QuizAttempt.submitted_at.desc(), QuizAttempt.id.desc()).limit(limit)).all()
+
+    def payload_handwritten(data):
+        quiz, questions = data
+        body = handwritten_quiz(quiz, None)
+        del body['question_count']
+        body['questions'] = [{
+            'id': q.id, 'text': q.text, 'question_type': q.question_type,
+            'options': q.options, 'points': q.points, 'order': q.order
+        } for q in questions]
+        return body
+
+    def payload_schema(data):
+        quiz, questions = data
+        return {**QUIZ.dump(quiz), 'questions': PUBLIC_QUESTION.dump_many(questions)}
+
+    return {
+        'quiz_listing': {
+            'load': (listing_orm, listing_rows),
+            'handwritten': lambda rows: [handwritten_quiz(quiz, count) for quiz, count in rows],
+            'schema': lambda rows: [{**QUIZ.dump(quiz), 'question_count': count} for quiz, count in rows],
+            'rows': QUIZ_LISTING.dump_rows
+        },
+        'quiz_payload': {
+            'load': (payload_orm, payload_rows),
+            'handwritten': payload_handwritten,
+            'schema': payload_schema,
+            'rows': payload_schema
+        },
+        'attempts_page': {
+            'load': (attempts_orm, attempts_rows),
+            'handwritten': lambda attempts: [{
+                'attempt_id': a.id, 'user_name': a.user_name, 'user_email': a.user_email,
+                'user_phone': a.user_phone, 'submitted_at': a.submitted_at.isoformat(), 'responses': [],
+                'total_points': a.total_points, 'points_earned': a.points_earned,
+                'correct_answers': a.correct_answers, 'total_questions': a.total_questions,
+                'percentage': a.percentage
+            } for a in attempts],
+            'schema': lambda attempts: [{**a, 'responses': []} for a in QUIZ_ATTEMPT.dump_many(attempts)],
+            'rows': lambda attempts: [{**a, 'responses': []} for a in QUIZ_ATTEMPT.dump_rows(attempts)]
+        }
+    }
+
+
+def path_functions(case, path):
+    """(load, serialize) for one path of a case"""
+    import serialization
+
+    orjson = serialization.orjson
+
+    def with_stdlib(obj):
+        serialization.orjson = None
+        try:
+            return serialization.dumps(obj)
+        finally:
+            serialization.orjson = orjson
+
+    load_orm, load_rows = case['load']
+    if path == 'handwritten':
+        return load_orm, lambda data: jsonify_before(case['handwritten'](data))
+    if path == 'schema_json':
+        return load_orm, lambda data: with_stdlib(case['schema'](data))
+    if path == 'schema_orjson':
+        return load_orm, lambda data: serialization.dumps(case['schema'](data))
+    return load_rows, lambda data: serialization.dumps(case['rows'](data))
+
+
+def median_ms(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='Throwaway database to use instead of a temporary SQLite file; '
+                                               'its tables are dropped and recreated')
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--quizzes', type=int, default=500)
+    parser.add_argument('--questions-per-quiz', type=int, default=50)
+    parser.add_argument('--attempts', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--limit', type=int, default=200, help='Rows per listing page')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    args = parser.parse_args()
+
+    os.environ['SQLALCHEMY_DATABASE_URI'] = args.database_url or \
+        'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('QUERY_BUDGET_MODE', 'off')
+    from app import app, db
+    import serialization
+
+    if serialization.orjson is None:
+        raise SystemExit('orjson is not installed; `pip install orjson` to compare against it')
+
+    seed(args)
+    results = {}
+    with app.app_context():
+        for name, case in build_cases(args.limit).items():
+            results[name] = {}
+            bodies = set()
+            for path in PATHS:
+                load, serialize = path_functions(case, path)
+                data = load()
+                bodies.add(json.dumps(json.loads(serialize(data)), sort_keys=True))
+
+                def load_and_serialize():
+                    serialize(load())
+                    db.session.expunge_all()
+                results[name][path] = {
+                    'serialize_ms': median_ms(lambda: serialize(data), args.iterations),
+                    'load_and_serialize_ms': median_ms(load_and_serialize, args.iterations)
+                }
+            if len(bodies) != 1:
+                raise SystemExit(f'{name}: the paths disagree on the response body')
+
+    print(f"{'case':<15} {'path':<15} {'serialize ms':>13} {'speedup':>8} {'load+ser ms':>12} {'speedup':>8}")
+    for name, paths in results.items():
+        before = paths['handwritten']
+        for path, timing in paths.items():
+            print(f"{name:<15} {path:<15} {timing['serialize_ms']:>13.3f} "
+                  f"{before['serialize_ms'] / timing['serialize_ms']:>7.1f}x "
+                  f"{timing['load_and_serialize_ms']:>12.3f} "
+                  f"{before['load_and_serialize_ms'] / timing['load_and_serialize_ms']:>7.1f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {
+                    'limit': args.limit,
+                    'questions_per_quiz': args.questions_per_quiz,
+                    'iterations': args.iterations,
+                    'database': 'custom' if args.database_url else 'sqlite'
+                },
+                'results': results
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Load test Quizzy with scripted traffic scenarios.
+
+    viral      everyone opens the same share link (GET /api/quizzes/share/<code>);
+               half of the visits revalidate a cached copy with If-None-Match
+    burst      a live event: every worker submits answers to the same quiz
+    dashboard  the quiz owner's views: own quiz list, the quiz, a page of
+               responses, score stats, leaderboard and per-question stats
+
+Each scenario runs --concurrency closed-loop workers for --duration seconds
+and reports throughput and p50/p95/p99 latency per request type. The target
+is the most-attempted quiz among the newest public ones, unless --quiz-id is
+given, so seed a database first (`flask seed-data`).
+
+Requests go to a running server (--base-url), or through Flask's test client
+in this process (--in-process) against SQLALCHEMY_DATABASE_URI, e.g. a SQLite
+file standing in for Postgres:
+
+    python benchmarks/load_test.py --base-url http://localhost:5000 --duration 30
+    SQLALCHEMY_DATABASE_URI=sqlite:////tmp/quizzy.db python benchmarks/load_test.py --in-process
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+SCENARIOS = ['viral', 'burst', 'dashboard']
+PERCENTILES = (50, 95, 99)
+
+# How often the owner opens each dashboard view
+DASHBOARD_VIEWS = {
+    'own quizzes': 2,
+    'quiz': 3,
+    'responses': 3,
+    'stats': 2,
+    'leaderboard': 2,
+    'question stats': 1
+}
+
+
+class HttpTransport:
+    """Requests to a running server, one keep-alive session per worker thread"""
+
+    def __init__(self, base_url):
+        import requests
+        self.requests = requests
+        self.base_url = base_url.rstrip('/')
+        self.local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        if not hasattr(self.local, 'session'):
+            self.local.session = self.requests.Session()
+        response = self.local.session.request(method, self.base_url + path, json=body, headers=headers)
+        return response.status_code, response.headers, response.content
+
+
+class InProcessTransport:
+    """Requests through Flask's test client, one client per worker thread"""
+
+    def __init__(self):
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from app import app
+        self.app = app
+        self.local = threading.local()
+
+    def request(self, method, path, body=None, headers=None):
+        if not hasattr(self.local, 'client'):
+            self.local.client = self.app.test_client()
+        response = self.local.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.headers, response.data
+
+
+def get_json(transport, path):
+    status, _, body = transport.request('GET', path)
+    if status != 200:
+        raise SystemExit(f'GET {path} returned {status}: {body[:200]!r}')
+    return json.loads(body)
+
+
+def find_target(transport, quiz_id=None):
+    """The quiz, owner and share code every scenario aims at"""
+    if quiz_id is None:
+        quizzes = get_json(transport, '/api/quizzes?limit=50&fields=id')
+        if not quizzes:
+            raise SystemExit('No public quizzes found; seed the database first (flask seed-data)')
+        attempts = {
+            quiz['id']: get_json(transport, f"/api/quizzes/{quiz['id']}/stats")['attempts'] for quiz in quizzes
+        }
+        quiz_id = max(attempts, key=attempts.get)
+
+    quiz = get_json(transport, f'/api/quizzes/{quiz_id}')
+    _, headers, _ = transport.request('GET', f"/api/quizzes/share/{quiz['share_code']}")
+    return {
+        'quiz_id': quiz_id,
+        'user_id': quiz['user_id'],
+        'share_code': quiz['share_code'],
+        'etag': headers.get('ETag'),
+        'questions': quiz['questions']
+    }
+
+
+def viral(target, rng):
+    headers = {'If-None-Match': target['etag']} if target['etag'] and rng.random() < 0.5 else None
+    return 'share link', 'GET', f"/api/quizzes/share/{target['share_code']}", None, headers
+
+
+def burst(target, rng):
+    taker = uuid.uuid4().hex[:12]
+    body = {
+        'quiz_id': target['quiz_id'],
+        'user_name': f'Player {taker}',
+        'user_email': f'player-{taker}@example.com',
+        'responses': [{
+            'question_id': question['id'],
+            'answer': rng.choice(question['options']) if question['options'] else 'answer'
+        } for question in target['questions']]
+    }
+    return 'submit', 'POST', '/api/quiz-responses', body, {'Idempotency-Key': str(uuid.uuid4())}
+
+
+def dashboard(target, rng):
+    view = rng.choices(list(DASHBOARD_VIEWS), weights=list(DASHBOARD_VIEWS.values()))[0]
+    quiz_path = f"/api/quizzes/{target['quiz_id']}"
+    paths = {
+        'own quizzes': f"/api/quizzes?user_id={target['user_id']}&limit=20",
+        'quiz': quiz_path,
+        'responses': f'{quiz_path}/responses?limit=20',
+        'stats': f'{quiz_path}/stats',
+        'leaderboard': f'{quiz_path}/leaderboard',
+        'question stats': f'{quiz_path}/questions/stats'
+    }
+    return view, 'GET', paths[view], None, None
+
+
+def run_scenario(transport, scenario, target, concurrency, duration, seed=0):
+    """Run closed-loop workers until `duration` seconds have passed; returns (name, status, seconds) samples"""
+    samples = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(worker_index):
+        rng = random.Random(seed * 1000 + worker_index)
+        local = []
+        while time.perf_counter() < deadline:
+            name, method, path, body, headers = scenario(target, rng)
+            start = time.perf_counter()
+            try:
+                status = transport.request(method, path, body, headers)[0]
+            except Exception:
+                status = None
+            local.append((name, status, time.perf_counter() - start))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, -(-q * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, elapsed):
+    """Per request type: count, errors, requests per second and latency percentiles in milliseconds"""
+    by_name = {}
+    for name, status, seconds in samples:
+        by_name.setdefault(name, []).append((status, seconds))
+    by_name['all'] = [(status, seconds) for _, status, seconds in samples]
+    report = {}
+    for name, results in by_name.items():
+        latencies = sorted(seconds * 1000 for _, seconds in results)
+        report[name] = {
+            'requests': len(results),
+            'errors': sum(1 for status, _ in results if status is None or status >= 400),
+            'throughput': round(len(results) / elapsed, 1),
+            **{f'p{q}_ms': round(percentile(latencies, q), 2) for q in PERCENTILES},
+            'max_ms': round(latencies[-1], 2)
+        }
+    return report
+
+
+def print_report(scenario, report):
+    print(f'\n{scenario}')
+    print(f"{'request':<16} {'requests':>9} {'errors':>7} {'req/s':>9} "
+          + ' '.join(f'{f"p{q} ms":>9}' for q in PERCENTILES) + f" {'max ms':>9}")
+    for name, row in report.items():
+        print(f"{name:<16} {row['requests']:>9} {row['errors']:>7} {row['throughput']:>9.1f} "
+              + ' '.join(f"{row[f'p{q}_ms']:>9.2f}" for q in PERCENTILES) + f" {row['max_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target_group = parser.add_mutually_exclusive_group()
+    target_group.add_argument('--base-url', default='http://localhost:5000')
+    target_group.add_argument('--in-process', action='store_true', help="Use Flask's test client instead of HTTP")
+    parser.add_argument('--scenario', choices=SCENARIOS + ['all'], default='all')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per scenario')
+    parser.add_argument('--quiz-id', help='Quiz to aim at instead of the most-attempted recent one')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    transport = InProcessTransport() if args.in_process else HttpTransport(args.base_url)
+    target = find_target(transport, args.quiz_id)
+    print(f"Target quiz {target['quiz_id']} (share code {target['share_code']}, "
+          f"{len(target['questions'])} questions), {args.concurrency} workers, {args.duration:g}s per scenario")
+
+    results = {}
+    functions = {'viral': viral, 'burst': burst, 'dashboard': dashboard}
+    for name in SCENARIOS if args.scenario == 'all' else [args.scenario]:
+        samples, elapsed = run_scenario(transport, functions[name], target, args.concurrency, args.duration, args.seed)
+        results[name] = summarize(samples, elapsed)
+        print_report(name, results[name])
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'target': {k: target[k] for k in ('quiz_id', 'share_code')}, 'scenarios': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+Small in-process caches, with an optional shared tier for response payloads.
+
+Entries live in the memory of a single worker process. Writes made through
+another worker only invalidate that worker's copy (and the shared tier, when
+one is configured), so every cache also has a TTL that bounds how long a
+stale entry can be served.
+"""
+
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, namedtuple
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_size=1024, ttl=300, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        expires_at = self._clock() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Serialized JSON body of a response and its ETag
+CachedPayload = namedtuple('CachedPayload', ['etag', 'body'])
+
+
+def make_payload(body):
+    """Wrap a serialized body with a strong ETag derived from its content"""
+    return CachedPayload(hashlib.sha1(body).hexdigest(), body)
+
+
+class CacheBackend(ABC):
+    """A shared cache tier, e.g. Redis, storing bytes by key"""
+
+    @abstractmethod
+    def get(self, key):
+        """The bytes stored under key, or None"""
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        """Store bytes under key for ttl seconds (no expiry when falsy)"""
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+
+class RedisBackend(CacheBackend):
+    """Shared tier backed by Redis. Errors are treated as cache misses."""
+
+    def __init__(self, url, prefix='quizzy:'):
+        try:
+            import redis  # Optional dependency, only needed when a shared tier is configured
+        except ImportError:
+            raise RuntimeError(
+                'A Redis cache URL is configured but the redis package is not installed; `pip install redis`'
+            ) from None
+
+        self._client = redis.Redis.from_url(url)
+        self._errors = redis.RedisError
+        self._prefix = prefix
+
+    def get(self, key):
+        try:
+            return self._client.get(self._prefix + key)
+        except self._errors:
+            return None
+
+    def set(self, key, value, ttl):
+        try:
+            self._client.set(self._prefix + key, value, ex=ttl or None)
+        except self._errors:
+            pass
+
+    def delete(self, key):
+        try:
+            self._client.delete(self._prefix + key)
+        except self._errors:
+            pass
+
+
+class PayloadCache:
+    """Serialized response payloads in an in-process LRU in front of an optional shared backend"""
+
+    def __init__(self, local, shared=None, namespace='payload'):
+        self.local = local
+        self.shared = shared
+        self.namespace = namespace
+
+    def _shared_key(self, key):
+        return f'{self.namespace}:{key}'
+
+    def get(self, key):
+        payload = self.local.get(key)
+        if payload is None and self.shared is not None:
+            raw = self.shared.get(self._shared_key(key))
+            if raw is not None:
+                etag, body = raw.split(b'\n', 1)
+                payload = CachedPayload(etag.decode(), body)
+                self.local.set(key, payload)
+        return payload
+
+    def set(self, key, payload):
+        self.local.set(key, payload)
+        if self.shared is not None:
+            self.shared.set(self._shared_key(key), payload.etag.encode() + b'\n' + payload.body, self.local.ttl)
+
+    def invalidate(self, key):
+        self.local.invalidate(key)
+        if self.shared is not None:
+            self.shared.delete(self._shared_key(key))
+
+    def clear(self):
+        self.local.clear()
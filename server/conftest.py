@@ -0,0 +1,127 @@
+import functools
+import os
+import tempfile
+
+# Point the app at a throwaway SQLite database before it is imported
+_db_dir = tempfile.mkdtemp(prefix='quizzy-test-')
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(_db_dir, 'quizzy.db')
+os.environ['APP_ENV'] = 'test'
+
+import pytest
+from sqlalchemy import event
+
+import app as app_module
+from app import (
+    app as flask_app, db, User, Quiz, Question,
+    answer_key_cache, quiz_payload_cache, share_code_cache, idempotency_cache, item_analysis_cache,
+    write_queued_attempts
+)
+from ingestion import Flusher, SubmissionQueue
+
+
+@pytest.fixture
+def app():
+    # Let errors raised by request hooks, such as QueryBudgetExceeded, fail the test directly
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        answer_key_cache.clear()
+        quiz_payload_cache.clear()
+        share_code_cache.clear()
+        idempotency_cache.clear()
+        item_analysis_cache.clear()
+        yield flask_app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def query_counter(app):
+    """Collect every SQL statement executed while the fixture is active"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def quiz_factory(app):
+    """Create a quiz with the given number of questions"""
+    def make_quiz(question_count=3, is_public=True, email='owner@example.com'):
+        user = User.query.filter_by(email=email).first()
+        if not user:
+            user = User(username=email.split('@')[0], email=email)
+            db.session.add(user)
+            db.session.flush()
+        quiz = Quiz(
+            title='Quiz',
+            description='',
+            is_public=is_public,
+            share_code=os.urandom(4).hex().upper(),
+            user_id=user.id
+        )
+        db.session.add(quiz)
+        db.session.flush()
+        for i in range(question_count):
+            db.session.add(Question(
+                text=f'Question {i + 1}',
+                question_type='multiple_choice',
+                options=['A', 'B', 'C', 'D'],
+                correct_answer='A',
+                points=1 + (i % 3),
+                order=i + 1,
+                quiz_id=quiz.id
+            ))
+        db.session.commit()
+        return quiz.id
+    return make_quiz
+
+
+@pytest.fixture
+def submit(client):
+    """Post a submission to a quiz and check its status code.
+
+    `answers` is one answer for every question, or a list of answers for the
+    questions in order; `responses` replaces them with explicit response
+    objects. `status` is the expected status code, or None to skip the check.
+    """
+    def post(quiz_id, answers='A', name='Taker', email=None, responses=None, key=None, status=201, **fields):
+        if responses is None:
+            question_ids = [q.id for q in Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order)]
+            if isinstance(answers, str):
+                answers = [answers] * len(question_ids)
+            responses = [{'question_id': qid, 'answer': answer} for qid, answer in zip(question_ids, answers)]
+        response = client.post('/api/quiz-responses', json={
+            'quiz_id': quiz_id,
+            'user_name': name,
+            'user_email': email or f'{name.lower()}@example.com',
+            'responses': responses,
+            **fields
+        }, headers={'Idempotency-Key': key} if key else {})
+        if status is not None:
+            assert response.status_code == status, response.get_data(as_text=True)
+        return response
+    return post
+
+
+@pytest.fixture
+def submission_queue(tmp_path):
+    return SubmissionQueue(str(tmp_path / 'queue.db'), max_pending=10)
+
+
+@pytest.fixture
+def queue_mode(app, monkeypatch, submission_queue):
+    """Run the submission endpoint in write-behind mode without the background thread"""
+    flusher = Flusher(submission_queue, functools.partial(write_queued_attempts, app), batch_size=100)
+    monkeypatch.setattr(app_module, 'submission_queue', submission_queue)
+    monkeypatch.setattr(app_module, 'submission_flusher', flusher)
+    return flusher
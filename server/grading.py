@@ -0,0 +1,73 @@
+"""
+Grading engine for quiz submissions.
+
+The answer key for a quiz is loaded once per submission (one query over the
+quiz's questions) and every answer in the submission is graded in memory.
+"""
+
+from collections import namedtuple
+
+# Normalized correct answer and the points it is worth
+AnswerKeyEntry = namedtuple('AnswerKeyEntry', ['correct_answer', 'points'])
+
+GradedAnswer = namedtuple('GradedAnswer', ['question_id', 'answer', 'is_correct', 'points_earned', 'points_possible'])
+
+
+def normalize_answer(answer):
+    """Normalize an answer the same way for the key and for submissions"""
+    return str(answer).lower().strip()
+
+
+def build_answer_key(rows):
+    """Build an answer key from (id, correct_answer, points) rows"""
+    return {
+        question_id: AnswerKeyEntry(normalize_answer(correct_answer), points or 0)
+        for question_id, correct_answer, points in rows
+    }
+
+
+class GradeResult:
+    """Outcome of grading one submission"""
+
+    def __init__(self, answers, total_questions):
+        self.answers = answers
+        self.total_questions = total_questions
+        self.correct_answers = sum(1 for a in answers if a.is_correct)
+        self.total_points = sum(a.points_earned for a in answers)
+        self.max_points = sum(a.points_possible for a in answers)
+
+    @property
+    def percentage(self):
+        if self.total_questions == 0:
+            return 0
+        return round((self.correct_answers / self.total_questions) * 100)
+
+
+def grade_responses(answer_key, responses):
+    """Grade a submission's responses array against an answer key.
+
+    Responses without a question_id or answer, or pointing at a question that
+    is not part of the quiz, are skipped.
+    """
+    answers = []
+    for response_data in responses:
+        question_id = response_data.get('question_id')
+        answer = response_data.get('answer')
+
+        if not question_id or answer is None:
+            continue
+
+        entry = answer_key.get(question_id)
+        if entry is None:
+            continue
+
+        is_correct = normalize_answer(answer) == entry.correct_answer
+        answers.append(GradedAnswer(
+            question_id=question_id,
+            answer=answer,
+            is_correct=is_correct,
+            points_earned=entry.points if is_correct else 0,
+            points_possible=entry.points
+        ))
+
+    return GradeResult(answers, len(responses))
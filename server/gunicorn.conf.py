@@ -0,0 +1,32 @@
+# Gunicorn settings, loaded automatically from the working directory.
+import glob
+import os
+
+# SERVER_MODE=asgi serves the async routes in asgi.py on uvicorn workers, with
+# every other route falling through to the Flask app; wsgi (default) is Flask alone
+if os.getenv('SERVER_MODE', 'wsgi').lower() == 'asgi':
+    wsgi_app = 'asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'app:app'
+
+# The app sizes each worker's connection pool from these same variables (see pooling.py),
+# so set them here rather than with --workers/--threads
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+threads = int(os.getenv('WEB_THREADS', 1))
+
+
+def on_starting(server):
+    """Clear metric files left over from a previous run"""
+    multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(multiproc_dir, '*.db')):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    """Drop live gauges of a worker that exited"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,286 @@
+"""
+Write-behind ingestion for quiz submissions.
+
+In queue mode a graded submission is appended to a local SQLite queue (WAL
+journal) and the request returns straight away. A background flusher in each
+worker claims batches from the queue, hands them to a writer that inserts
+them into the main database, and only then removes them from the queue.
+
+Delivery is at-least-once: a crash between the database commit and the
+queue delete replays the batch. Every queued attempt carries its own id, and
+the writer skips ids that already exist, so replays never duplicate rows.
+Several workers can share one queue file; claims are leased, so a batch held
+by a worker that died is picked up again once the lease runs out.
+
+A batch the writer rejects is split in halves and retried until the
+submissions it cannot write are isolated, so one bad submission does not hold
+up the rest. Each of those keeps its lease, is retried once the lease runs
+out, and after max_failures failed writes is moved to the dead_letter table.
+Errors listed as transient (e.g. the database being unreachable) release the
+whole batch for the next flush instead.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger('quizzy.ingestion')
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds max_pending submissions"""
+
+
+class SubmissionQueue:
+    """Durable FIFO of pending submissions stored in a SQLite file"""
+
+    def __init__(self, path, max_pending=100000, lease_seconds=60, synchronous='NORMAL'):
+        self.path = path
+        self.max_pending = max_pending
+        self.lease_seconds = lease_seconds
+        self.synchronous = synchronous
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._inherited = []
+        self._conn = self._open()
+        self._pid = os.getpid()
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # NORMAL survives process crashes; FULL also survives power loss at the cost of an fsync per enqueue
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute('PRAGMA busy_timeout=5000')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS pending ('
+            ' seq INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' attempt_id TEXT NOT NULL UNIQUE,'
+            ' payload TEXT NOT NULL,'
+            ' enqueued_at REAL NOT NULL,'
+            ' claimed_until REAL NOT NULL DEFAULT 0,'
+            ' failures INTEGER NOT NULL DEFAULT 0)'
+        )
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(pending)')}
+        if 'failures' not in columns:
+            # Queue files written before failed writes were counted
+            conn.execute('ALTER TABLE pending ADD COLUMN failures INTEGER NOT NULL DEFAULT 0')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS dead_letter ('
+            ' seq INTEGER PRIMARY KEY,'
+            ' attempt_id TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' enqueued_at REAL NOT NULL,'
+            ' failures INTEGER NOT NULL,'
+            ' error TEXT,'
+            ' failed_at REAL NOT NULL)'
+        )
+        return conn
+
+    def _connection(self):
+        """This process's connection; one inherited across a fork is replaced, not used"""
+        if self._pid != os.getpid():
+            # Closing it could checkpoint or remove files the parent is still using, so it is only set aside
+            self._inherited.append(self._conn)
+            self._conn = self._open()
+            self._pid = os.getpid()
+        return self._conn
+
+    def __len__(self):
+        with self._lock:
+            return self._connection().execute('SELECT COUNT(*) FROM pending').fetchone()[0]
+
+    def enqueue(self, attempt_id, payload):
+        """Durably append a submission and return how many are now pending.
+
+        Re-enqueueing an attempt id that is still pending is a no-op.
+        """
+        with self._lock:
+            conn = self._connection()
+            pending = conn.execute('SELECT COUNT(*) FROM pending').fetchone()[0]
+            if pending >= self.max_pending:
+                raise QueueFull(f'{self.max_pending} submissions already pending')
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO pending (attempt_id, payload, enqueued_at) VALUES (?, ?, ?)',
+                (attempt_id, json.dumps(payload), time.time())
+            )
+            return pending + cursor.rowcount
+
+    def claim(self, limit):
+        """Lease up to `limit` of the oldest unclaimed submissions"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = conn.execute(
+                    'SELECT seq, payload FROM pending WHERE claimed_until < ? ORDER BY seq LIMIT ?',
+                    (now, limit)
+                ).fetchall()
+                conn.executemany(
+                    'UPDATE pending SET claimed_until = ? WHERE seq = ?',
+                    [(now + self.lease_seconds, seq) for seq, _ in rows]
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return [(seq, json.loads(payload)) for seq, payload in rows]
+
+    def ack(self, seqs):
+        """Remove submissions that have been written to the database"""
+        with self._lock:
+            self._connection().executemany('DELETE FROM pending WHERE seq = ?', [(seq,) for seq in seqs])
+
+    def release(self, seqs):
+        """Give up a claim so the submissions are retried on the next flush"""
+        with self._lock:
+            self._connection().executemany('UPDATE pending SET claimed_until = 0 WHERE seq = ?', [(seq,) for seq in seqs])
+
+    def fail(self, seq, error, max_failures):
+        """Count a failed write of one submission; returns True once it has been moved to dead_letter.
+
+        Until then it keeps its lease, so it is retried when the lease runs out rather than on the next flush.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('UPDATE pending SET failures = failures + 1 WHERE seq = ?', (seq,))
+                row = conn.execute('SELECT failures FROM pending WHERE seq = ?', (seq,)).fetchone()
+                dead = row is not None and row[0] >= max_failures
+                if dead:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO dead_letter (seq, attempt_id, payload, enqueued_at, failures, error, failed_at)'
+                        ' SELECT seq, attempt_id, payload, enqueued_at, failures, ?, ? FROM pending WHERE seq = ?',
+                        (error, time.time(), seq)
+                    )
+                    conn.execute('DELETE FROM pending WHERE seq = ?', (seq,))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return dead
+
+    def dead_letters(self):
+        """(attempt_id, failures, error) of every submission given up on, oldest first"""
+        with self._lock:
+            return self._connection().execute(
+                'SELECT attempt_id, failures, error FROM dead_letter ORDER BY seq'
+            ).fetchall()
+
+    def requeue_dead_letters(self):
+        """Move every dead-lettered submission back to the queue with its failures reset; returns how many"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                requeued = conn.execute(
+                    'INSERT OR IGNORE INTO pending (attempt_id, payload, enqueued_at)'
+                    ' SELECT attempt_id, payload, enqueued_at FROM dead_letter ORDER BY seq'
+                ).rowcount
+                conn.execute('DELETE FROM dead_letter')
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return requeued
+
+
+class Flusher:
+    """Background thread that moves queued submissions into the database in batches"""
+
+    def __init__(self, submission_queue, writer, batch_size=500, interval=1.0, max_failures=5, transient_errors=()):
+        self.queue = submission_queue
+        self.writer = writer
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_failures = max_failures
+        self.transient_errors = tuple(transient_errors)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        """Start the thread in this process; threads do not survive a fork"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='submission-flusher', daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        """Wake the flusher early, e.g. once a full batch is waiting"""
+        self._wake.set()
+
+    def stop(self, drain=True):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join()
+        if drain:
+            self.drain()
+
+    def flush_once(self):
+        """Write one batch; returns the number of submissions written"""
+        batch = self.queue.claim(self.batch_size)
+        return self._flush(batch) if batch else 0
+
+    def drain(self):
+        """Flush until the queue has nothing left to claim"""
+        total = 0
+        while True:
+            batch = self.queue.claim(self.batch_size)
+            if not batch:
+                return total
+            total += self._flush(batch)
+
+    def _flush(self, batch):
+        try:
+            return self._write(batch)
+        except Exception:
+            logger.exception('Failed to flush submissions', extra={'batch_size': len(batch)})
+            # Parts already written were acked; releasing them again does nothing
+            self.queue.release([seq for seq, _ in batch])
+            raise
+
+    def _write(self, batch):
+        """Write and ack a claimed batch, halving it around rejected submissions; returns how many were written"""
+        try:
+            self.writer([payload for _, payload in batch])
+        except self.transient_errors:
+            raise
+        except Exception as error:
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                return self._write(batch[:middle]) + self._write(batch[middle:])
+            seq, payload = batch[0]
+            dead = self.queue.fail(seq, repr(error), self.max_failures)
+            logger.warning(
+                'Moved a submission that could not be written to the dead letter table' if dead
+                else 'Failed to write a submission; it will be retried',
+                exc_info=True, extra={'attempt_id': payload.get('attempt', {}).get('id')}
+            )
+            return 0
+        self.queue.ack([seq for seq, _ in batch])
+        return len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                while self.flush_once() == self.batch_size and not self._stop.is_set():
+                    pass
+            except Exception:
+                # Already logged; back off until the next interval before retrying
+                continue
@@ -0,0 +1,110 @@
+"""
+Logging setup for the Quizzy server.
+
+Records from the request path are put on an in-memory queue and written to
+stdout by a background listener thread, so handlers never block on console
+I/O. Levels and output format default per environment (APP_ENV) and can be
+overridden with LOG_LEVEL / LOG_FORMAT. Per-answer grading traces go to the
+`quizzy.grading` logger and are sampled with GRADING_TRACE_SAMPLE_RATE.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+ENVIRONMENT_DEFAULTS = {
+    'development': {'level': 'DEBUG', 'format': 'text', 'trace_sample_rate': 1.0},
+    'test': {'level': 'WARNING', 'format': 'text', 'trace_sample_rate': 0.0},
+    'production': {'level': 'INFO', 'format': 'json', 'trace_sample_rate': 0.0},
+}
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+_hooks_registered = False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any `extra=` fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Let through a random fraction of records"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return self.rate >= 1 or random.random() < self.rate
+
+
+def _start_listener(log_queue, handler):
+    global _listener
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def configure_logging():
+    """Route the app's loggers through a non-blocking queue handler"""
+    environment = os.getenv('APP_ENV', 'production')
+    defaults = ENVIRONMENT_DEFAULTS.get(environment, ENVIRONMENT_DEFAULTS['production'])
+    level = os.getenv('LOG_LEVEL', defaults['level']).upper()
+    log_format = os.getenv('LOG_FORMAT', defaults['format'])
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if log_format == 'json':
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    log_queue = queue.SimpleQueue()
+    for name in ('quizzy', 'app', 'sqlalchemy'):
+        logger = logging.getLogger(name)
+        logger.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+        logger.propagate = False
+    logging.getLogger('quizzy').setLevel(level)
+    logging.getLogger('app').setLevel(level)
+
+    # SQL statement logging is opt-in; formatting every statement is expensive
+    logging.getLogger('sqlalchemy.engine').setLevel(os.getenv('SQLALCHEMY_LOG_LEVEL', 'WARNING').upper())
+    logging.getLogger('sqlalchemy.pool').setLevel(os.getenv('SQLALCHEMY_LOG_LEVEL', 'WARNING').upper())
+
+    grading_logger = logging.getLogger('quizzy.grading')
+    sample_rate = float(os.getenv('GRADING_TRACE_SAMPLE_RATE', defaults['trace_sample_rate']))
+    grading_logger.filters[:] = [SamplingFilter(sample_rate)]
+
+    global _hooks_registered
+    _stop_listener()
+    _start_listener(log_queue, stream_handler)
+    if not _hooks_registered:
+        atexit.register(_stop_listener)
+        # The listener thread does not survive a fork (e.g. gunicorn --preload); restart it in the child
+        os.register_at_fork(after_in_child=lambda: _start_listener(_listener.queue, *_listener.handlers))
+        _hooks_registered = True
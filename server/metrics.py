@@ -0,0 +1,186 @@
+"""
+Prometheus metrics for the Quizzy server.
+
+Request latency, in-flight requests and SQL statement counts/durations are
+recorded per Flask endpoint. SQL and pool metrics are collected through
+SQLAlchemy engine and pool events.
+
+When PROMETHEUS_MULTIPROC_DIR is set (it must be set before this module is
+imported), every gunicorn worker writes its samples there and /metrics
+aggregates all of them; see gunicorn.conf.py for the directory cleanup and
+dead-worker hooks.
+"""
+
+import os
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+REQUEST_LATENCY = Histogram(
+    'quizzy_request_latency_seconds', 'Request latency by Flask endpoint',
+    ['endpoint', 'method'], buckets=LATENCY_BUCKETS
+)
+REQUESTS = Counter(
+    'quizzy_requests_total', 'Requests by Flask endpoint and status code',
+    ['endpoint', 'method', 'status']
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'quizzy_requests_in_progress', 'Requests currently being handled',
+    ['endpoint'], multiprocess_mode='livesum'
+)
+SQL_QUERIES_PER_REQUEST = Histogram(
+    'quizzy_sql_queries_per_request', 'SQL statements executed per request',
+    ['endpoint'], buckets=QUERY_COUNT_BUCKETS
+)
+SQL_QUERY_DURATION = Histogram(
+    'quizzy_sql_query_duration_seconds', 'Duration of individual SQL statements',
+    ['endpoint'], buckets=LATENCY_BUCKETS
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    'quizzy_db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection',
+    buckets=LATENCY_BUCKETS
+)
+POOL_CHECKED_OUT = Gauge(
+    'quizzy_db_pool_checked_out', 'Connections currently checked out of the pool',
+    ['bind'], multiprocess_mode='livesum'
+)
+POOL_OVERFLOW = Gauge(
+    'quizzy_db_pool_overflow', 'Connections open beyond pool_size',
+    ['bind'], multiprocess_mode='livesum'
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            POOL_CHECKOUT_WAIT.observe(waited)
+            with self._stats_lock:
+                self._checkouts += 1
+                self._timeouts += timed_out
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def wait_stats(self):
+        """Checkouts from this pool and how long they waited, since it was created"""
+        with self._stats_lock:
+            return {
+                'checkouts': self._checkouts,
+                'checkout_timeouts': self._timeouts,
+                'wait_seconds_total': round(self._wait_total, 6),
+                'wait_seconds_mean': round(self._wait_total / self._checkouts, 6) if self._checkouts else 0.0,
+                'wait_seconds_max': round(self._wait_max, 6)
+            }
+
+
+def _endpoint_label():
+    return request.endpoint or 'unknown'
+
+
+def _record_pool_usage(bind, pool):
+    if isinstance(pool, QueuePool):
+        POOL_CHECKED_OUT.labels(bind).set(pool.checkedout())
+        POOL_OVERFLOW.labels(bind).set(max(pool.overflow(), 0))
+
+
+def _observe_statement(context):
+    """Count a finished statement, failed or not, against the current request"""
+    start = getattr(context, '_quizzy_start', None)
+    if start is None:
+        return
+    del context._quizzy_start
+    if has_request_context() and 'metrics_start' in g:
+        g.sql_queries += 1
+        SQL_QUERY_DURATION.labels(_endpoint_label()).observe(time.perf_counter() - start)
+
+
+# The start time lives on the statement's execution context rather than the
+# connection, so a statement that raises leaves nothing behind
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._quizzy_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _observe_statement(context)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    _observe_statement(exception_context.execution_context)
+
+
+def metrics_registry():
+    """The registry to expose: aggregated across workers in multiprocess mode"""
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def _listen_for_pool_usage(bind, engine):
+    # Listening on the engine follows it to the fresh pool it gets after a fork
+    event.listen(engine, 'checkout', lambda *args: _record_pool_usage(bind, engine.pool))
+    event.listen(engine, 'checkin', lambda *args: _record_pool_usage(bind, engine.pool))
+
+
+def init_metrics(app, db):
+    """Install request hooks, pool listeners and the /metrics endpoint on the app"""
+    with app.app_context():
+        engines = dict(db.engines)
+    for key, engine in engines.items():
+        _listen_for_pool_usage(key or 'primary', engine)
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_start = time.perf_counter()
+        g.sql_queries = 0
+        REQUESTS_IN_PROGRESS.labels(_endpoint_label()).inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        if 'metrics_start' in g:
+            endpoint = _endpoint_label()
+            REQUEST_LATENCY.labels(endpoint, request.method).observe(time.perf_counter() - g.metrics_start)
+            REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+            SQL_QUERIES_PER_REQUEST.labels(endpoint).observe(g.sql_queries)
+        return response
+
+    @app.teardown_request
+    def finish_request_metrics(exc):
+        if 'metrics_start' in g:
+            REQUESTS_IN_PROGRESS.labels(_endpoint_label()).dec()
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST)
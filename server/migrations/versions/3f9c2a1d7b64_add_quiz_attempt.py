@@ -0,0 +1,220 @@
+"""add quiz_attempt and slim quiz_response down to per-answer rows
+
+Revision ID: 3f9c2a1d7b64
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+Each submission becomes one quiz_attempt row holding the submitter's details
+and the score; quiz_response keeps only the graded answer and points to its
+attempt. Existing responses are grouped into attempts the same way the old
+responses view grouped them (quiz, email, name, phone).
+
+Tables created by db.create_all() on a fresh database already have this
+shape, in which case the upgrade does nothing.
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a1d7b64'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+question = sa.table(
+    'question',
+    sa.column('id', sa.String),
+    sa.column('points', sa.Integer),
+)
+
+quiz_response = sa.table(
+    'quiz_response',
+    sa.column('id', sa.String),
+    sa.column('attempt_id', sa.String),
+    sa.column('quiz_id', sa.String),
+    sa.column('question_id', sa.String),
+    sa.column('user_name', sa.String),
+    sa.column('user_email', sa.String),
+    sa.column('user_phone', sa.String),
+    sa.column('is_correct', sa.Boolean),
+    sa.column('points_earned', sa.Integer),
+    sa.column('submitted_at', sa.DateTime),
+)
+
+quiz_attempt = sa.table(
+    'quiz_attempt',
+    sa.column('id', sa.String),
+    sa.column('quiz_id', sa.String),
+    sa.column('user_name', sa.String),
+    sa.column('user_email', sa.String),
+    sa.column('user_phone', sa.String),
+    sa.column('submitted_at', sa.DateTime),
+    sa.column('total_questions', sa.Integer),
+    sa.column('correct_answers', sa.Integer),
+    sa.column('points_earned', sa.Integer),
+    sa.column('total_points', sa.Integer),
+    sa.column('percentage', sa.Integer),
+)
+
+
+def _backfill_attempts(bind):
+    """Create one attempt per (quiz, email, name, phone) group and link its answers.
+
+    Groups are read BATCH_SIZE at a time in key order, continuing after the
+    last group of the previous batch, so memory use does not grow with the
+    number of responses.
+    """
+    correct = sa.case((quiz_response.c.is_correct == sa.true(), 1), else_=0)
+    phone = sa.func.coalesce(quiz_response.c.user_phone, '')
+    group_key = (quiz_response.c.quiz_id, quiz_response.c.user_email, quiz_response.c.user_name, phone)
+    groups_query = (
+        sa.select(
+            quiz_response.c.quiz_id,
+            quiz_response.c.user_email,
+            quiz_response.c.user_name,
+            phone.label('user_phone'),
+            sa.func.min(quiz_response.c.submitted_at).label('submitted_at'),
+            sa.func.count(quiz_response.c.id).label('total_questions'),
+            sa.func.sum(correct).label('correct_answers'),
+            sa.func.sum(correct * question.c.points).label('points_earned'),
+            sa.func.sum(question.c.points).label('total_points'),
+        )
+        .select_from(quiz_response.join(question, quiz_response.c.question_id == question.c.id))
+        .where(quiz_response.c.attempt_id.is_(None))
+        .group_by(*group_key)
+        .order_by(*group_key)
+        .limit(BATCH_SIZE)
+    )
+
+    link = sa.update(quiz_response).where(
+        quiz_response.c.quiz_id == sa.bindparam('b_quiz_id'),
+        quiz_response.c.user_email == sa.bindparam('b_user_email'),
+        quiz_response.c.user_name == sa.bindparam('b_user_name'),
+        sa.func.coalesce(quiz_response.c.user_phone, '') == sa.bindparam('b_user_phone'),
+        quiz_response.c.attempt_id.is_(None),
+    ).values(attempt_id=sa.bindparam('b_attempt_id'))
+
+    last_key = None
+    while True:
+        query = groups_query
+        if last_key is not None:
+            query = query.where(sa.tuple_(*group_key) > sa.tuple_(*last_key))
+        groups = bind.execute(query).fetchall()
+        if not groups:
+            break
+        last = groups[-1]
+        last_key = (last.quiz_id, last.user_email, last.user_name, last.user_phone)
+
+        attempts, links = [], []
+        for group in groups:
+            attempt_id = str(uuid.uuid4())
+            total_questions = group.total_questions or 0
+            correct_answers = group.correct_answers or 0
+            attempts.append({
+                'id': attempt_id,
+                'quiz_id': group.quiz_id,
+                'user_name': group.user_name,
+                'user_email': group.user_email,
+                'user_phone': group.user_phone or None,
+                'submitted_at': group.submitted_at,
+                'total_questions': total_questions,
+                'correct_answers': correct_answers,
+                'points_earned': group.points_earned or 0,
+                'total_points': group.total_points or 0,
+                'percentage': round(correct_answers / total_questions * 100) if total_questions else 0,
+            })
+            links.append({
+                'b_attempt_id': attempt_id,
+                'b_quiz_id': group.quiz_id,
+                'b_user_email': group.user_email,
+                'b_user_name': group.user_name,
+                'b_user_phone': group.user_phone or '',
+            })
+        bind.execute(sa.insert(quiz_attempt), attempts)
+        bind.execute(link, links)
+
+    # Responses used to store the question's points even for wrong answers
+    bind.execute(
+        sa.update(quiz_response).where(quiz_response.c.is_correct == sa.false()).values(points_earned=0)
+    )
+
+    # Answers whose question no longer exists cannot be scored; drop them
+    bind.execute(sa.delete(quiz_response).where(quiz_response.c.attempt_id.is_(None)))
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = inspector.get_table_names()
+
+    if 'quiz_attempt' not in tables:
+        op.create_table(
+            'quiz_attempt',
+            sa.Column('id', sa.String(length=36), nullable=False),
+            sa.Column('quiz_id', sa.String(length=36), nullable=False),
+            sa.Column('user_name', sa.String(length=100), nullable=False),
+            sa.Column('user_email', sa.String(length=120), nullable=False),
+            sa.Column('user_phone', sa.String(length=20), nullable=True),
+            sa.Column('submitted_at', sa.DateTime(), nullable=True),
+            sa.Column('total_questions', sa.Integer(), nullable=False),
+            sa.Column('correct_answers', sa.Integer(), nullable=False),
+            sa.Column('points_earned', sa.Integer(), nullable=False),
+            sa.Column('total_points', sa.Integer(), nullable=False),
+            sa.Column('percentage', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['quiz_id'], ['quiz.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_quiz_attempt_quiz_id_submitted_at', 'quiz_attempt', ['quiz_id', 'submitted_at'])
+
+    if 'quiz_response' not in tables:
+        return
+    columns = {column['name'] for column in inspector.get_columns('quiz_response')}
+    if 'user_email' not in columns:
+        return
+
+    if 'attempt_id' not in columns:
+        with op.batch_alter_table('quiz_response') as batch_op:
+            batch_op.add_column(sa.Column('attempt_id', sa.String(length=36), nullable=True))
+
+    _backfill_attempts(bind)
+
+    with op.batch_alter_table('quiz_response') as batch_op:
+        batch_op.alter_column('attempt_id', existing_type=sa.String(length=36), nullable=False)
+        batch_op.create_index('ix_quiz_response_attempt_id', ['attempt_id'])
+        batch_op.create_foreign_key('fk_quiz_response_attempt_id', 'quiz_attempt', ['attempt_id'], ['id'])
+        batch_op.drop_column('user_name')
+        batch_op.drop_column('user_email')
+        batch_op.drop_column('user_phone')
+        batch_op.drop_column('submitted_at')
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_response') as batch_op:
+        batch_op.add_column(sa.Column('user_name', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('user_email', sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column('user_phone', sa.String(length=20), nullable=True))
+        batch_op.add_column(sa.Column('submitted_at', sa.DateTime(), nullable=True))
+
+    for column in ('user_name', 'user_email', 'user_phone', 'submitted_at'):
+        op.execute(
+            sa.update(quiz_response).values({
+                column: sa.select(quiz_attempt.c[column])
+                .where(quiz_attempt.c.id == quiz_response.c.attempt_id)
+                .scalar_subquery()
+            })
+        )
+
+    with op.batch_alter_table('quiz_response') as batch_op:
+        batch_op.alter_column('user_name', existing_type=sa.String(length=100), nullable=False)
+        batch_op.alter_column('user_email', existing_type=sa.String(length=120), nullable=False)
+        batch_op.drop_constraint('fk_quiz_response_attempt_id', type_='foreignkey')
+        batch_op.drop_index('ix_quiz_response_attempt_id')
+        batch_op.drop_column('attempt_id')
+
+    op.drop_index('ix_quiz_attempt_quiz_id_submitted_at', table_name='quiz_attempt')
+    op.drop_table('quiz_attempt')
@@ -0,0 +1,33 @@
+"""add share_code_counter for allocating share codes
+
+Revision ID: 4c8f1b9e6d27
+Revises: e7a3d2f08c15
+Create Date: 2026-10-18 18:00:00.000000
+
+Workers reserve blocks of numbers from this single-row counter and encode
+them into share codes, instead of generating random codes and checking them
+for collisions. The row is created by the first reservation.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8f1b9e6d27'
+down_revision = 'e7a3d2f08c15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('share_code_counter'):
+        op.create_table(
+            'share_code_counter',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('next_value', sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+
+def downgrade():
+    op.drop_table('share_code_counter')
@@ -0,0 +1,41 @@
+"""add secondary indexes for the hot listing and lookup filters
+
+Revision ID: 8d41e6b0c2a9
+Revises: 3f9c2a1d7b64
+Create Date: 2026-10-18 12:00:00.000000
+
+Indexes are built with CREATE INDEX CONCURRENTLY on PostgreSQL so the
+migration can run against a live database without blocking writes. That
+cannot happen inside a transaction, so each statement runs in an autocommit
+block. IF NOT EXISTS keeps the migration safe to re-run after a failed
+concurrent build has been dropped, and on databases created by
+db.create_all().
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41e6b0c2a9'
+down_revision = '3f9c2a1d7b64'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_question_quiz_id_order', 'question', ['quiz_id', 'order']),
+    ('ix_quiz_is_public_created_at', 'quiz', ['is_public', 'created_at', 'id']),
+    ('ix_quiz_user_id_created_at', 'quiz', ['user_id', 'created_at', 'id']),
+    ('ix_quiz_attempt_user_email', 'quiz_attempt', ['user_email']),
+    ('ix_quiz_response_quiz_id_question_id', 'quiz_response', ['quiz_id', 'question_id']),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""add an idempotency key to quiz_attempt
+
+Revision ID: b52e7c91a4d3
+Revises: 8d41e6b0c2a9
+Create Date: 2026-10-18 14:00:00.000000
+
+Retried submissions carry the key of the attempt they already created. The
+unique index on (quiz_id, idempotency_key) lets the server find that attempt
+and rejects a second insert from a concurrent retry. Attempts without a key
+are NULL and never collide.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52e7c91a4d3'
+down_revision = '8d41e6b0c2a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('quiz_attempt')}
+    if 'idempotency_key' not in columns:
+        op.add_column('quiz_attempt', sa.Column('idempotency_key', sa.String(length=100), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_quiz_attempt_quiz_id_idempotency_key', 'quiz_attempt', ['quiz_id', 'idempotency_key'],
+            unique=True, postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'uq_quiz_attempt_quiz_id_idempotency_key', table_name='quiz_attempt',
+            postgresql_concurrently=True, if_exists=True
+        )
+    with op.batch_alter_table('quiz_attempt') as batch_op:
+        batch_op.drop_column('idempotency_key')
@@ -0,0 +1,65 @@
+"""add quiz_score_bucket and the leaderboard index
+
+Revision ID: e7a3d2f08c15
+Revises: b52e7c91a4d3
+Create Date: 2026-10-18 16:00:00.000000
+
+quiz_score_bucket holds, per quiz, how many attempts scored each percentage.
+It is filled from the existing attempts here (whenever it is still empty) and kept current by every
+submission afterwards. The leaderboard index orders a quiz's attempts by
+rank so the top N can be read without sorting.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3d2f08c15'
+down_revision = 'b52e7c91a4d3'
+branch_labels = None
+depends_on = None
+
+quiz_score_bucket = sa.table(
+    'quiz_score_bucket',
+    sa.column('quiz_id', sa.String),
+    sa.column('percentage', sa.Integer),
+    sa.column('attempts', sa.Integer),
+)
+
+quiz_attempt = sa.table(
+    'quiz_attempt',
+    sa.column('quiz_id', sa.String),
+    sa.column('percentage', sa.Integer),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('quiz_score_bucket'):
+        op.create_table(
+            'quiz_score_bucket',
+            sa.Column('quiz_id', sa.String(length=36), sa.ForeignKey('quiz.id'), nullable=False),
+            sa.Column('percentage', sa.Integer(), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('quiz_id', 'percentage'),
+        )
+    # The app's create_all() may already have made the table, empty, on startup
+    if bind.execute(sa.select(sa.func.count()).select_from(quiz_score_bucket)).scalar() == 0:
+        op.execute(quiz_score_bucket.insert().from_select(
+            ['quiz_id', 'percentage', 'attempts'],
+            sa.select(quiz_attempt.c.quiz_id, quiz_attempt.c.percentage, sa.func.count())
+            .group_by(quiz_attempt.c.quiz_id, quiz_attempt.c.percentage)
+        ))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_quiz_attempt_leaderboard', 'quiz_attempt',
+            ['quiz_id', sa.text('percentage DESC'), sa.text('points_earned DESC'), 'submitted_at'],
+            postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_quiz_attempt_leaderboard', table_name='quiz_attempt', postgresql_concurrently=True, if_exists=True)
+    op.drop_table('quiz_score_bucket')
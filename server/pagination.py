@@ -0,0 +1,106 @@
+"""
+Keyset pagination and field projection helpers for listing endpoints.
+
+Listings are ordered newest first on (created_at, id). The cursor handed back
+to the client encodes the sort key of the last row on the page, so the next
+page is a range scan starting after it instead of an OFFSET.
+"""
+
+import base64
+from datetime import datetime
+
+from flask import jsonify
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class PaginationError(ValueError):
+    """Raised for malformed limit, cursor or fields parameters"""
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(created_at), row_id
+    except (ValueError, UnicodeDecodeError):
+        raise PaginationError('Invalid cursor')
+
+
+def parse_page_args(args):
+    """Read limit and cursor from the query string"""
+    try:
+        limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be positive')
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    cursor = args.get('cursor')
+    return limit, decode_cursor(cursor) if cursor else None
+
+
+def parse_fields(args, allowed):
+    """Read the optional comma-separated fields projection.
+
+    Returns the requested field names in the order of `allowed`, or all of
+    them when no projection was asked for.
+    """
+    fields = args.get('fields')
+    if not fields:
+        return list(allowed)
+    requested = {f.strip() for f in fields.split(',') if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [f for f in allowed if f in requested]
+
+
+def keyset_filter(created_col, id_col, cursor):
+    """Rows strictly after the cursor in (created_at DESC, id DESC) order"""
+    created_at, row_id = cursor
+    return or_(created_col < created_at, and_(created_col == created_at, id_col < row_id))
+
+
+def keyset_ordered(query, created_col, id_col, limit, cursor):
+    """Restrict a query or select to one page in keyset order, plus one row to tell whether another page exists"""
+    if cursor:
+        query = query.filter(keyset_filter(created_col, id_col, cursor))
+    return query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def paginate(query, created_col, id_col, limit, cursor):
+    """Apply keyset ordering to a query and fetch one page.
+
+    Returns the rows of the page and the cursor for the next one (or None).
+    """
+    return split_page(keyset_ordered(query, created_col, id_col, limit, cursor).all(), created_col, id_col, limit)
+
+
+def split_page(rows, created_col, id_col, limit):
+    """Drop the extra row fetched by keyset_ordered; returns the page and the next cursor (or None)"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_col.key), getattr(last, id_col.key))
+    return rows, next_cursor
+
+
+def page_response(payload, next_cursor):
+    """jsonify a page and expose the next cursor as a response header"""
+    response = jsonify(payload)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
@@ -0,0 +1,198 @@
+"""
+Connection pooling for the app's database engines, configured from the environment.
+
+DB_POOL_PROFILE picks how connections are pooled (by default `sqlite` for a
+SQLite URI and `direct` for anything else):
+
+direct
+    A pool per worker in front of Postgres. Each worker's pool is derived
+    from how many workers share the database:
+
+        pool_size     one connection per thread serving requests, plus one for
+                      work outside the request (share code reservations, the
+                      submission flusher)
+        max_overflow  whatever is left of the worker's share of DB_MAX_CONNECTIONS
+
+    so WEB_CONCURRENCY workers together never open more than DB_MAX_CONNECTIONS.
+    DB_POOL_SIZE and DB_MAX_OVERFLOW override the derived values.
+pgbouncer
+    PgBouncer in transaction pooling mode already pools server connections,
+    so the app keeps none of its own (NullPool). Consecutive transactions may
+    run on different server connections. psycopg2, the sync driver, never
+    prepares statements on the server; asyncpg's named prepared statements
+    are turned off for the async engine.
+sqlite
+    For local runs and tests: a pool without recycling or keepalives.
+
+Connections are not pinged on every checkout. Instead:
+
+- a connection that sat idle in the pool for DB_POOL_PING_IDLE seconds is
+  pinged before it is handed out, and replaced if the ping fails
+- connections are replaced after DB_POOL_RECYCLE seconds
+- TCP keepalives let the OS notice dead peers
+- a disconnect seen while running a statement invalidates the whole pool
+
+gunicorn.conf.py reads the worker and thread counts from the same variables.
+"""
+
+import os
+import time
+import uuid
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
+
+from metrics import InstrumentedQueuePool
+
+POOL_PROFILES = ('direct', 'pgbouncer', 'sqlite')
+
+# Postgres allows 100 connections by default; leave a few for migrations and admin sessions
+DEFAULT_MAX_CONNECTIONS = 90
+
+# The sync Postgres driver installed with the app (requirements.txt, Dockerfile), built on libpq
+# and so taking its connection parameters. SQLAlchemy 2.1 picks psycopg 3 for a bare
+# postgresql:// URI, so database_uri() names this one instead.
+POSTGRES_DRIVER = 'psycopg2'
+
+# libpq TCP keepalives: probe after 30s idle, every 10s, give up after 3 misses
+KEEPALIVE_ARGS = {'keepalives': 1, 'keepalives_idle': 30, 'keepalives_interval': 10, 'keepalives_count': 3}
+
+
+def database_uri(uri):
+    """`uri` with the installed Postgres driver named where it names none; other URIs unchanged"""
+    if not uri:
+        return uri
+    url = make_url(uri)
+    if url.drivername != 'postgresql':
+        return uri
+    return url.set(drivername=f'postgresql+{POSTGRES_DRIVER}').render_as_string(hide_password=False)
+
+
+def worker_count():
+    return int(os.getenv('WEB_CONCURRENCY', 1))
+
+
+def threads_per_worker():
+    """Threads that can run Flask requests at once in one worker"""
+    if os.getenv('SERVER_MODE', 'wsgi').lower() == 'asgi':
+        return int(os.getenv('ASGI_WSGI_THREADS', 10))
+    return int(os.getenv('WEB_THREADS', 1))
+
+
+def pool_sizing(workers, threads, max_connections):
+    """pool_size and max_overflow for each of `workers` processes sharing `max_connections`"""
+    per_worker = max_connections // workers
+    if per_worker < 1:
+        raise ValueError(f'DB_MAX_CONNECTIONS={max_connections} is too few for {workers} workers')
+    pool_size = min(threads + 1, per_worker)
+    return pool_size, per_worker - pool_size
+
+
+def pool_profile(uri):
+    """The DB_POOL_PROFILE in effect for a database URI"""
+    default = 'sqlite' if make_url(uri).get_backend_name() == 'sqlite' else 'direct'
+    profile = os.getenv('DB_POOL_PROFILE', default).lower()
+    if profile not in POOL_PROFILES:
+        raise ValueError(f"DB_POOL_PROFILE must be one of {', '.join(POOL_PROFILES)}, not {profile!r}")
+    return profile
+
+
+def _queue_pool_options(pool_size, max_overflow):
+    return {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_pre_ping': False,
+    }
+
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for this worker's engine on `uri`"""
+    profile = pool_profile(uri)
+    url = make_url(database_uri(uri))
+    if profile == 'pgbouncer':
+        # psycopg2 sends every statement unprepared, so nothing is left on a server connection
+        return {'poolclass': NullPool}
+
+    if profile == 'sqlite' and url.database in (None, '', ':memory:'):
+        # Every connection to an in-memory database is a new, empty database; share one
+        return {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+
+    pool_size, max_overflow = pool_sizing(
+        worker_count(), threads_per_worker(), int(os.getenv('DB_MAX_CONNECTIONS', DEFAULT_MAX_CONNECTIONS))
+    )
+    pool_size = int(os.getenv('DB_POOL_SIZE', pool_size))
+    max_overflow = int(os.getenv('DB_MAX_OVERFLOW', max_overflow))
+    options = {
+        **_queue_pool_options(pool_size, max_overflow),
+        'poolclass': InstrumentedQueuePool  # Records checkout waits for /metrics and /api/admin/pool
+    }
+    if profile == 'direct':
+        options['pool_recycle'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
+        # Hand out the most recently used connection, so the rest can sit idle and be recycled
+        options['pool_use_lifo'] = True
+        if url.get_backend_name() == 'postgresql' and url.get_driver_name() == POSTGRES_DRIVER:
+            options['connect_args'] = {**KEEPALIVE_ARGS, 'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 10))}
+    return options
+
+
+def async_engine_options(url):
+    """create_async_engine() options for the async engine on `url`, following the same profile"""
+    profile = pool_profile(url)
+    if profile == 'pgbouncer':
+        return {'poolclass': NullPool, 'connect_args': {
+            'statement_cache_size': 0,
+            'prepared_statement_cache_size': 0,
+            # Unique names, in case a statement is still prepared implicitly on a shared server connection
+            'prepared_statement_name_func': lambda: f'__quizzy_{uuid.uuid4().hex}__'
+        }}
+    if url.database in (None, '', ':memory:'):
+        return {}
+    options = _queue_pool_options(int(os.getenv('ASYNC_POOL_SIZE', 20)), int(os.getenv('ASYNC_MAX_OVERFLOW', 10)))
+    if profile == 'direct':
+        options['pool_recycle'] = int(os.getenv('DB_POOL_RECYCLE', 1800))
+        options['pool_use_lifo'] = True
+    return options
+
+
+def init_pool_liveness(engine, idle_seconds=None):
+    """Ping connections that were idle in the pool for `idle_seconds` before handing them out"""
+    if idle_seconds is None:
+        idle_seconds = float(os.getenv('DB_POOL_PING_IDLE', 60))
+    if idle_seconds <= 0 or isinstance(engine.pool, (NullPool, StaticPool)):
+        return
+
+    @event.listens_for(engine, 'checkin')
+    def mark_idle(dbapi_connection, connection_record):
+        connection_record.info['pool_idle_since'] = time.monotonic()
+
+    @event.listens_for(engine, 'checkout')
+    def ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        idle_since = connection_record.info.pop('pool_idle_since', None)
+        if idle_since is None or time.monotonic() - idle_since < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except engine.dialect.loaded_dbapi.Error as e:
+            if engine.dialect.is_disconnect(e, dbapi_connection, None):
+                # The pool discards this connection and retries the checkout with a new one
+                raise exc.DisconnectionError() from e
+            raise
+
+
+def pool_stats(engine, profile):
+    """Current usage of an engine's pool in this worker"""
+    pool = engine.pool
+    stats = {'profile': profile, 'pool': type(pool).__name__, 'pid': os.getpid()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'max_overflow': pool._max_overflow,
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0)
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.wait_stats())
+    return stats
@@ -0,0 +1,114 @@
+"""
+Per-request SQL query budgets and N+1 detection, for development and tests.
+
+Every statement executed while a request is handled is recorded through
+SQLAlchemy engine events. After the request, the count is checked against
+the budget declared on the view with @query_budget(n). Statements executed
+more than `max_repeats` times with the same SQL are reported as a likely
+N+1 (a lazy load or lookup run once per row of an earlier result), whether
+or not the view declares a budget.
+
+QUERY_BUDGET_MODE picks what a violation does:
+
+raise
+    Raise QueryBudgetExceeded, failing the request (and the test that made
+    it). The default under APP_ENV=test.
+warn
+    Log a warning on the `quizzy.queries` logger. The default in development.
+off
+    Install nothing. The default in production.
+"""
+
+import logging
+import os
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MODE_DEFAULTS = {'development': 'warn', 'test': 'raise', 'production': 'off'}
+
+# An identical statement run more often than this in one request is reported as an N+1
+DEFAULT_MAX_REPEATS = 3
+
+logger = logging.getLogger('quizzy.queries')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in `raise` mode when a request runs more statements than its view allows"""
+
+
+class QueryBudget:
+    def __init__(self, max_queries=None, max_repeats=DEFAULT_MAX_REPEATS):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+
+def query_budget(max_queries, max_repeats=DEFAULT_MAX_REPEATS):
+    """Declare how many SQL statements a view may run per request.
+
+    Goes below @app.route so the registered view carries the budget.
+    """
+    def decorate(view):
+        view.query_budget = QueryBudget(max_queries, max_repeats)
+        return view
+    return decorate
+
+
+def budget_violations(statements, budget):
+    """Messages describing how a request's statements break `budget`, empty if they do not"""
+    violations = []
+    if budget.max_queries is not None and len(statements) > budget.max_queries:
+        violations.append(f'ran {len(statements)} SQL statements, over its budget of {budget.max_queries}')
+    for statement, count in Counter(statements).most_common():
+        if count <= budget.max_repeats:
+            break
+        violations.append(f"ran the same statement {count} times (likely N+1): {' '.join(statement.split())[:200]}")
+    return violations
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    if conn.get_execution_options().get('query_budget_exempt'):
+        return  # Housekeeping such as replica lag checks, not the view's own work
+    if has_request_context() and 'query_budget_statements' in g:
+        g.query_budget_statements.append(statement)
+
+
+def init_query_budget(app, mode=None):
+    """Check every request against its view's query budget; returns the mode in effect"""
+    if mode is None:
+        environment = os.getenv('APP_ENV', 'production')
+        mode = os.getenv('QUERY_BUDGET_MODE', MODE_DEFAULTS.get(environment, 'off')).lower()
+    if mode == 'off':
+        return mode
+    if mode not in ('warn', 'raise'):
+        raise ValueError(f'QUERY_BUDGET_MODE must be off, warn or raise, not {mode!r}')
+
+    if not event.contains(Engine, 'before_cursor_execute', _record_statement):
+        event.listen(Engine, 'before_cursor_execute', _record_statement)
+
+    @app.before_request
+    def start_query_budget():
+        g.query_budget_statements = []
+
+    @app.after_request
+    def check_query_budget(response):
+        statements = g.pop('query_budget_statements', None)
+        view = app.view_functions.get(request.endpoint)
+        if statements is None or view is None:
+            return response
+        violations = budget_violations(statements, getattr(view, 'query_budget', None) or QueryBudget())
+        if not violations:
+            return response
+        if mode == 'raise':
+            raise QueryBudgetExceeded(f"{request.method} {request.path} ({request.endpoint}) " + '; '.join(violations))
+        for violation in violations:
+            logger.warning(f'{request.endpoint} {violation}', extra={
+                'endpoint': request.endpoint,
+                'path': request.path,
+                'sql_queries': len(statements)
+            })
+        return response
+
+    return mode
@@ -0,0 +1,200 @@
+"""
+Portable quiz bank format for moving quizzes between environments.
+
+Two encodings are supported, both streamed record by record:
+
+ndjson
+    One quiz per line, with its questions nested:
+    {"id", "title", "description", "is_public", "share_code", "user_email",
+     "created_at", "questions": [{"id", "text", "question_type", "options",
+     "correct_answer", "points", "order"}, ...]}
+
+csv
+    One question per row, with the quiz columns (QUIZ_CSV_FIELDS) repeated on
+    every row of the quiz and `options` JSON-encoded. Rows of one quiz are
+    consecutive; a quiz without questions is a single row with empty
+    question columns.
+
+Quizzes are owned by `user_email`, since user ids differ between
+environments. Imports upsert on quiz and question id.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import groupby
+
+from serialization import dumps
+
+QUIZ_FIELDS = ['id', 'title', 'description', 'is_public', 'share_code', 'user_email', 'created_at']
+QUESTION_FIELDS = ['id', 'text', 'question_type', 'options', 'correct_answer', 'points', 'order']
+QUIZ_CSV_FIELDS = ['quiz_' + field for field in QUIZ_FIELDS] + ['question_' + field for field in QUESTION_FIELDS]
+
+# Questions validated and written per transaction on import
+IMPORT_BATCH_SIZE = 1000
+
+
+class QuizRecordError(ValueError):
+    """Raised for a line that cannot be decoded into a quiz record"""
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def iter_quiz_records(rows):
+    """Group quiz-joined-question rows (ordered by quiz) into nested quiz records.
+
+    Each row has quiz_<field> and question_<field> columns; question_id is
+    None for a quiz without questions.
+    """
+    for _, quiz_rows in groupby(rows, key=lambda row: row._mapping['quiz_id']):
+        record = None
+        for row in quiz_rows:
+            mapping = row._mapping
+            if record is None:
+                record = {field: _plain(mapping['quiz_' + field]) for field in QUIZ_FIELDS}
+                record['questions'] = []
+            if mapping['question_id'] is not None:
+                record['questions'].append({field: mapping['question_' + field] for field in QUESTION_FIELDS})
+        yield record
+
+
+def encode_ndjson(records):
+    for record in records:
+        yield dumps(record, sort_keys=False).decode() + '\n'
+
+
+def encode_csv(records):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(QUIZ_CSV_FIELDS)
+    yield flush()
+    for record in records:
+        quiz_values = ['' if record[field] is None else record[field] for field in QUIZ_FIELDS]
+        for question in record['questions'] or [None]:
+            if question is None:
+                writer.writerow(quiz_values + [''] * len(QUESTION_FIELDS))
+            else:
+                writer.writerow(quiz_values + [
+                    json.dumps(question['options']) if field == 'options' else question[field]
+                    for field in QUESTION_FIELDS
+                ])
+        yield flush()
+
+
+def encode_quizzes(records, export_format):
+    if export_format == 'csv':
+        return encode_csv(records)
+    return encode_ndjson(records)
+
+
+def _csv_value(field, value):
+    """Turn a CSV cell back into the JSON type of the field, leaving bad values for validation to report"""
+    if value is None or value == '':
+        return None
+    if field == 'is_public':
+        return value.lower() in ('true', '1', 'yes')
+    if field in ('points', 'order'):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    if field == 'options':
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def read_ndjson(lines):
+    """Yield (line number, record) for each non-blank line; undecodable lines yield a QuizRecordError"""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, QuizRecordError(f'invalid JSON: {e}')
+            continue
+        yield line_number, record
+
+
+def read_csv(lines):
+    """Yield (line number of the quiz's first row, record), regrouping consecutive rows of a quiz"""
+    reader = csv.DictReader(lines)
+    missing = set(QUIZ_CSV_FIELDS) - set(reader.fieldnames or [])
+    if missing:
+        yield 1, QuizRecordError(f"missing columns: {', '.join(sorted(missing))}")
+        return
+
+    def numbered_rows():
+        for row in reader:
+            yield reader.line_num, row
+
+    # Rows without a quiz id belong to the same quiz as long as the title stays the same
+    for _, quiz_rows in groupby(numbered_rows(), key=lambda item: item[1]['quiz_id'] or ('title', item[1]['quiz_title'])):
+        record = None
+        for line_number, row in quiz_rows:
+            if record is None:
+                first_line = line_number
+                record = {field: _csv_value(field, row['quiz_' + field]) for field in QUIZ_FIELDS}
+                record['questions'] = []
+            if any(row['question_' + field] for field in QUESTION_FIELDS):
+                record['questions'].append({
+                    field: _csv_value(field, row['question_' + field]) for field in QUESTION_FIELDS
+                })
+        yield first_line, record
+
+
+def read_quizzes(lines, import_format):
+    if import_format == 'csv':
+        return read_csv(lines)
+    return read_ndjson(lines)
+
+
+def quiz_record_error(record):
+    """Why a quiz record (without its questions) is invalid, or None"""
+    if isinstance(record, QuizRecordError):
+        return str(record)
+    if not isinstance(record, dict):
+        return 'must be an object'
+    if not record.get('title') or not isinstance(record['title'], str):
+        return 'title is required'
+    for field in ('id', 'share_code', 'user_email', 'description'):
+        if record.get(field) is not None and not isinstance(record[field], str):
+            return f'{field} must be a string'
+    if not isinstance(record.get('questions', []), list):
+        return 'questions must be a list'
+    if record.get('created_at') is not None:
+        try:
+            datetime.fromisoformat(record['created_at'])
+        except (TypeError, ValueError):
+            return 'created_at must be an ISO 8601 timestamp'
+    return None
+
+
+def batched_records(numbered_records, batch_size=IMPORT_BATCH_SIZE):
+    """Group (line number, record) pairs into lists holding about batch_size questions each"""
+    batch = []
+    questions = 0
+    for line_number, record in numbered_records:
+        batch.append((line_number, record))
+        if isinstance(record, dict) and isinstance(record.get('questions'), list):
+            questions += len(record['questions'])
+        questions += 1
+        if questions >= batch_size:
+            yield batch
+            batch = []
+            questions = 0
+    if batch:
+        yield batch
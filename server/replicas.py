@@ -0,0 +1,212 @@
+"""
+Read-replica routing for db.session.
+
+With REPLICA_DATABASE_URIS set, each replica becomes a bind (replica_1,
+replica_2, ...) next to the primary. Reads are routed to a replica only
+where that was declared:
+
+    per route        @read_replica on a view
+    per transaction  with replica_reads(): ...  /  with primary_reads(): ...
+
+Everything else, including flushes, INSERT/UPDATE/DELETE and
+SELECT ... FOR UPDATE issued inside a replica block, goes to the primary.
+
+Replicas are skipped while they are more than REPLICA_MAX_LAG seconds
+behind. Lag is checked at most every REPLICA_LAG_CHECK_INTERVAL seconds per
+worker, and a replica whose check fails is skipped until the next one. With
+no usable replica, reads go to the primary.
+
+Read-your-writes: the response to a successful write carries an
+X-Primary-Until header, the time until which that client's reads should go
+to the primary (REPLICA_STICKY_SECONDS, by default REPLICA_MAX_LAG). A client
+that sends the header back on its next requests reads from the primary until
+then. The web client runs on another origin and sends no cookies, so a
+header it echoes is what makes the round trip; it is in the CORS allow and
+expose lists. A replica route that answers 404 is also retried on the
+primary, so a quiz created a moment ago is found even by clients that do
+not echo the header.
+"""
+
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+logger = logging.getLogger('quizzy.replicas')
+
+REPLICA_BIND_PREFIX = 'replica_'
+STICKY_HEADER = 'X-Primary-Until'
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+# Seconds of WAL the replica has received but not replayed; 0 once it has replayed everything it has
+POSTGRES_LAG_SQL = text(
+    'SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+)
+
+# Where reads in this context go: a ReplicaRoute, or None for the primary
+_route = ContextVar('replica_route', default=None)
+
+
+def replica_binds(uris, engine_options, database_uri=lambda uri: uri):
+    """SQLALCHEMY_BINDS entries for a comma-separated list of replica URIs, each passed through `database_uri`"""
+    binds = {}
+    for n, uri in enumerate((database_uri(uri.strip()) for uri in (uris or '').split(',') if uri.strip()), start=1):
+        # connect_args is reset so the primary's driver arguments do not leak into another backend
+        binds[f'{REPLICA_BIND_PREFIX}{n}'] = {'url': uri, 'connect_args': {}, **engine_options(uri)}
+    return binds
+
+
+def replica_lag(engine):
+    """Seconds `engine`'s database is behind its primary; 0 where the database cannot tell"""
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+    with engine.connect().execution_options(query_budget_exempt=True) as conn:
+        return float(conn.execute(POSTGRES_LAG_SQL).scalar())
+
+
+class ReplicaSet:
+    """The replica engines of one app and their last measured lag"""
+
+    def __init__(self, engines, max_lag, check_interval, probe=replica_lag, sticky_seconds=0):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.check_interval = check_interval
+        self.probe = probe
+        self._lags = {}
+        self._lock = threading.Lock()
+
+    def lag(self, name):
+        """The replica's lag in seconds, or None while it cannot be reached"""
+        now = time.monotonic()
+        with self._lock:
+            checked_at, lag = self._lags.get(name, (None, None))
+            if checked_at is not None and now - checked_at < self.check_interval:
+                return lag
+            # Claim the check so other threads keep using the last value meanwhile
+            self._lags[name] = (now, lag)
+        try:
+            lag = self.probe(self.engines[name])
+        except Exception:
+            logger.warning('Replica lag check failed; reading from the primary', exc_info=True, extra={'bind': name})
+            lag = None
+        with self._lock:
+            self._lags[name] = (now, lag)
+        return lag
+
+    def choose(self):
+        """A replica engine close enough to the primary, or None"""
+        usable = []
+        for name, engine in self.engines.items():
+            lag = self.lag(name)
+            if lag is not None and lag <= self.max_lag:
+                usable.append(engine)
+        return random.choice(usable) if usable else None
+
+
+class ReplicaRoute:
+    """The replica chosen for one replica_reads() block, and whether anything read from it"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.used = False
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica chosen by replica_reads(), and everything else to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        route = _route.get()
+        if bind is None and route is not None and not self._flushing and not is_write(clause):
+            route.used = True
+            return route.engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def is_write(clause):
+    return clause is not None and (
+        getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None
+    )
+
+
+@contextmanager
+def replica_reads():
+    """Send the reads in this block to a replica, if the app has one close enough to the primary"""
+    replicas = current_app.extensions.get('replicas') if has_app_context() else None
+    engine = replicas.choose() if replicas else None
+    token = _route.set(ReplicaRoute(engine) if engine is not None else None)
+    try:
+        yield _route.get()
+    finally:
+        _route.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads in this block to the primary, e.g. to fill a cache other requests will trust"""
+    token = _route.set(None)
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def wrote_recently(replicas):
+    """Whether this request's client made a write it should be able to read back"""
+    try:
+        until = float(request.headers.get(STICKY_HEADER, 0))
+    except ValueError:
+        return False
+    now = time.time()
+    # A value further ahead than any write could have set is not honoured
+    return now < until <= now + replicas.sticky_seconds + 1
+
+
+def read_replica(view):
+    """Serve a read-only view from a replica (see the module docstring for when it falls back to the primary)"""
+    @functools.wraps(view)
+    def routed(*args, **kwargs):
+        replicas = current_app.extensions.get('replicas')
+        if replicas is None or wrote_recently(replicas):
+            return view(*args, **kwargs)
+        with replica_reads() as route:
+            response = current_app.make_response(view(*args, **kwargs))
+        if route is not None and route.used and response.status_code == 404:
+            return view(*args, **kwargs)
+        return response
+    return routed
+
+
+def init_replicas(app, db):
+    """Route declared reads of `app` to its replica binds; does nothing without any"""
+    with app.app_context():
+        engines = {key: engine for key, engine in db.engines.items() if key and key.startswith(REPLICA_BIND_PREFIX)}
+    if not engines:
+        return None
+
+    max_lag = float(os.getenv('REPLICA_MAX_LAG', 5))
+    sticky_seconds = float(os.getenv('REPLICA_STICKY_SECONDS', max_lag))
+    replicas = ReplicaSet(
+        engines, max_lag, float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', 1)), sticky_seconds=sticky_seconds
+    )
+    app.extensions['replicas'] = replicas
+    # Replicas hold the primary's tables; keep db.create_all() and db.drop_all() off them
+    for key in engines:
+        db.metadatas.pop(key, None)
+
+    @app.after_request
+    def stick_to_primary(response):
+        if request.method in WRITE_METHODS and response.status_code < 400 and sticky_seconds > 0:
+            response.headers[STICKY_HEADER] = f'{time.time() + sticky_seconds:.3f}'
+        return response
+
+    return replicas
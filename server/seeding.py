@@ -0,0 +1,264 @@
+"""
+Synthetic quiz data at load-test scale.
+
+Everything is drawn from one seeded generator, so the same seed and sizes
+always produce the same data set. The shapes follow real quiz traffic:
+
+- quizzes per author: Zipf-like, a few prolific authors and a long tail
+- questions per quiz: Poisson around the requested mean, at least one
+- attempts per quiz: heavy-tailed (Pareto), a handful of viral quizzes take
+  most of the attempts
+- takers are registered users picked with the same skew, so some people take
+  many quizzes
+- each answer is right with a probability set by the taker's ability and the
+  question's difficulty, so scores spread out and questions discriminate
+- attempts cluster shortly after the quiz was created
+
+Rows come out as plain dicts in batches for multi-row inserts, in foreign
+key order; nothing here touches the database.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from grading import normalize_answer
+
+SEED_BATCH_SIZE = 5000
+
+# Quizzes whose questions, attempts and answers are generated together
+QUIZ_CHUNK_SIZE = 1000
+
+AUTHOR_SKEW = 1.1
+ATTEMPT_TAIL = 1.2
+QUIZ_AGE_DAYS = 365
+QUESTION_TYPE_SHARES = {'multiple_choice': 0.75, 'true_false': 0.2, 'text': 0.05}
+POINT_SHARES = {1: 0.7, 2: 0.2, 3: 0.1}
+PUBLIC_SHARE = 0.8
+
+TOPICS = [
+    'General Knowledge', 'Science', 'History', 'Geography', 'Math', 'Literature',
+    'Sports', 'Music', 'Technology', 'Art', 'Movies', 'Food', 'Nature', 'Space'
+]
+WORDS = [
+    'apple', 'river', 'copper', 'falcon', 'violin', 'glacier', 'saturn', 'maple',
+    'orbit', 'canyon', 'prism', 'tundra', 'quartz', 'comet', 'harbor', 'lantern'
+]
+
+
+class SeedPlan:
+    """How much to generate, and from which seed"""
+
+    def __init__(self, users, quizzes, questions_per_quiz, attempts, seed=0,
+                 batch_size=SEED_BATCH_SIZE, chunk_size=QUIZ_CHUNK_SIZE):
+        if users < 1 and (quizzes or attempts):
+            raise ValueError('quizzes and attempts need at least one user')
+        if quizzes < 1 and attempts:
+            raise ValueError('attempts need at least one quiz')
+        self.users = users
+        self.quizzes = quizzes
+        self.questions_per_quiz = questions_per_quiz
+        self.attempts = attempts
+        self.seed = seed
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+
+
+def _uuid(rng):
+    return str(uuid.UUID(bytes=rng.bytes(16), version=4))
+
+
+def _uuids(rng, count):
+    raw = rng.bytes(16 * count)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
+def _batches(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _skewed_weights(count, skew):
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    return weights / weights.sum()
+
+
+def _choice(rng, shares, size):
+    values = list(shares)
+    return [values[i] for i in rng.choice(len(values), size=size, p=list(shares.values()))]
+
+
+def user_identity(seed, n):
+    return f'seed{seed}-user{n}', f'seed{seed}-user{n}@example.com'
+
+
+def _user_rows(rng, plan, start, count, now):
+    rows = []
+    for n in range(start, start + count):
+        username, email = user_identity(plan.seed, n)
+        rows.append({
+            'id': _uuid(rng),
+            'username': username,
+            'email': email,
+            'created_at': now - timedelta(days=float(rng.uniform(0, QUIZ_AGE_DAYS * 2)))
+        })
+    return rows
+
+
+def _question(rng, topic, number, question_type, points):
+    if question_type == 'true_false':
+        options = ['True', 'False']
+    elif question_type == 'text':
+        options = []
+    else:
+        options = [str(w).capitalize() for w in rng.choice(WORDS, size=4, replace=False)]
+    correct = str(rng.choice(options)) if options else str(rng.choice(WORDS))
+    return {
+        'text': f'{topic} question {number}',
+        'question_type': question_type,
+        'options': options,
+        'correct_answer': correct,
+        'points': points
+    }
+
+
+def _wrong_answers(question):
+    """Answers a taker might give instead of the correct one"""
+    correct = normalize_answer(question['correct_answer'])
+    choices = [o for o in question['options'] if normalize_answer(o) != correct]
+    return choices or [w for w in WORDS if w != correct]
+
+
+def _attempt_rows(rng, plan, quiz, questions, difficulty, takers, now):
+    """Attempts and graded answers for `takers` (user indexes) of one quiz"""
+    abilities = rng.beta(5, 3, size=len(takers))
+    chances = np.clip(0.5 + abilities[:, None] - difficulty[None, :], 0.05, 0.95)
+    correct = rng.random(chances.shape) < chances
+    correct_counts = correct.sum(axis=1).tolist()
+    points = np.array([q['points'] for q in questions])
+    points_earned = (correct * points).sum(axis=1).tolist()
+    wrong_picks = rng.integers(0, 1 << 30, size=chances.shape).tolist()
+    # Most attempts come in the days right after a quiz is shared
+    age = (now - quiz['created_at']).total_seconds()
+    offsets = (rng.beta(1, 4, size=len(takers)) * age).tolist()
+    attempt_ids = _uuids(rng, len(takers))
+    answer_ids = iter(_uuids(rng, len(takers) * len(questions)))
+    wrong = [_wrong_answers(q) for q in questions]
+    total_points = int(points.sum())
+
+    attempts = []
+    answers = []
+    for i, taker in enumerate(takers.tolist()):
+        username, email = user_identity(plan.seed, taker)
+        attempt_id = attempt_ids[i]
+        for j, is_correct in enumerate(correct[i].tolist()):
+            question = questions[j]
+            answers.append({
+                'id': next(answer_ids),
+                'attempt_id': attempt_id,
+                'quiz_id': quiz['id'],
+                'question_id': question['id'],
+                'answer': question['correct_answer'] if is_correct else wrong[j][wrong_picks[i][j] % len(wrong[j])],
+                'is_correct': is_correct,
+                'points_earned': question['points'] if is_correct else 0
+            })
+        attempts.append({
+            'id': attempt_id,
+            'quiz_id': quiz['id'],
+            'user_name': username,
+            'user_email': email,
+            'user_phone': '',
+            'submitted_at': quiz['created_at'] + timedelta(seconds=offsets[i]),
+            'total_questions': len(questions),
+            'correct_answers': correct_counts[i],
+            'points_earned': points_earned[i],
+            'total_points': total_points,
+            # Same rounding as grading.GradeResult.percentage
+            'percentage': round((correct_counts[i] / len(questions)) * 100)
+        })
+    return attempts, answers
+
+
+def generate(plan, next_share_code, now=None):
+    """Yield (table name, rows) batches: users first, then each chunk of quizzes
+    with its questions, attempts and answers.
+
+    `next_share_code()` is called once per quiz.
+    """
+    rng = np.random.default_rng(plan.seed)
+    now = now or datetime.utcnow()
+
+    user_ids = []
+    for start in range(0, plan.users, plan.batch_size):
+        rows = _user_rows(rng, plan, start, min(plan.batch_size, plan.users - start), now)
+        user_ids.extend(row['id'] for row in rows)
+        yield 'user', rows
+    if not plan.quizzes:
+        return
+
+    # Skewed user popularity, shuffled so the busiest users are not simply the first ones created.
+    # Users are sampled by searching the cumulative weights, which are built once for all quizzes.
+    user_cdf = np.cumsum(rng.permutation(_skewed_weights(plan.users, AUTHOR_SKEW)))
+
+    def pick_users(size):
+        picks = np.searchsorted(user_cdf, rng.random(size) * user_cdf[-1], side='right')
+        return np.minimum(picks, plan.users - 1)
+
+    authors = pick_users(plan.quizzes)
+    question_counts = 1 + rng.poisson(max(plan.questions_per_quiz - 1, 0), size=plan.quizzes)
+    popularity = rng.pareto(ATTEMPT_TAIL, size=plan.quizzes) + 1e-9
+    attempt_counts = rng.multinomial(plan.attempts, popularity / popularity.sum())
+
+    for chunk_start in range(0, plan.quizzes, plan.chunk_size):
+        chunk = range(chunk_start, min(chunk_start + plan.chunk_size, plan.quizzes))
+        quizzes = []
+        topics = []
+        for i in chunk:
+            topic = TOPICS[rng.integers(len(TOPICS))]
+            topics.append(topic)
+            created_at = now - timedelta(days=float(rng.uniform(0, QUIZ_AGE_DAYS)))
+            quizzes.append({
+                'id': _uuid(rng),
+                'title': f'{topic} Quiz {i + 1}',
+                'description': f'Test your {topic.lower()} knowledge',
+                'is_public': bool(rng.random() < PUBLIC_SHARE),
+                'share_code': next_share_code(),
+                'user_id': user_ids[authors[i]],
+                'created_at': created_at,
+                'updated_at': created_at
+            })
+        for rows in _batches(quizzes, plan.batch_size):
+            yield 'quiz', rows
+
+        quiz_questions = []
+        question_rows = []
+        for quiz, topic, i in zip(quizzes, topics, chunk):
+            count = int(question_counts[i])
+            types = _choice(rng, QUESTION_TYPE_SHARES, count)
+            points = _choice(rng, POINT_SHARES, count)
+            questions = [{
+                'id': _uuid(rng),
+                'quiz_id': quiz['id'],
+                'order': j + 1,
+                **_question(rng, topic, j + 1, types[j], points[j])
+            } for j in range(count)]
+            quiz_questions.append(questions)
+            question_rows.extend(questions)
+        for rows in _batches(question_rows, plan.batch_size):
+            yield 'question', rows
+
+        for quiz, questions, i in zip(quizzes, quiz_questions, chunk):
+            attempt_count = int(attempt_counts[i])
+            if not attempt_count:
+                continue
+            difficulty = rng.beta(2, 2, size=len(questions))
+            takers = pick_users(attempt_count)
+            # Keep each batch of answers near batch_size rows
+            per_batch = max(1, plan.batch_size // len(questions))
+            for start in range(0, attempt_count, per_batch):
+                attempts, answers = _attempt_rows(
+                    rng, plan, quiz, questions, difficulty, takers[start:start + per_batch], now
+                )
+                yield 'quiz_attempt', attempts
+                yield 'quiz_response', answers
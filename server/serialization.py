@@ -0,0 +1,155 @@
+"""
+JSON shapes of the API's resources, and a fast encoder to write them.
+
+Each resource's shape is declared once as a Schema: its JSON keys in order,
+and the attribute each is read from where the two differ. A schema turns ORM
+objects, or Core rows read by column name, into dicts with one C-level
+attrgetter call per object. Rows selected with the schema's own columns
+(schema.columns(Model)) are zipped straight into dicts, without building ORM
+objects or looking anything up by name.
+
+Datetimes are left in the dicts and written in ISO 8601 by dumps(), instead
+of each handler calling isoformat() per row. dumps() uses orjson when it is
+installed (`pip install orjson`) and the standard library otherwise. Both
+write compact JSON with sorted keys, as Flask's jsonify() does; create_app()
+installs JSONProvider so jsonify() and request.get_json() use them as well.
+"""
+
+import json
+from datetime import date
+from operator import attrgetter
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson  # Optional dependency; several times faster than the json module
+except ImportError:
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(value):
+    """Encode what the json module cannot: dates in ISO 8601, the rest as Flask does"""
+    if isinstance(value, date):
+        return value.isoformat()
+    return DefaultJSONProvider.default(value)
+
+
+def dumps(obj, sort_keys=True):
+    """Compact JSON for `obj`, as UTF-8 bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS | (orjson.OPT_SORT_KEYS if sort_keys else 0))
+    return json.dumps(obj, default=_default, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, encoding and decoding with dumps() and loads()"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Options such as indent= are only understood by the json module
+            kwargs.setdefault('default', _default)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return json.dumps(obj, **kwargs)
+        return dumps(obj, self.sort_keys).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        if self.compact is False or (self.compact is None and self._app.debug):
+            return super().response(*args, **kwargs)  # Indented, by way of the json module
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, self.sort_keys) + b'\n', mimetype=self.mimetype)
+
+
+class Schema:
+    """The JSON shape of one resource.
+
+    `fields` are the keys in order; `sources` names the attribute a key is
+    read from when it differs, e.g. Schema('attempt_id', attempt_id='id').
+    """
+
+    def __init__(self, *fields, **sources):
+        self.fields = fields
+        self.sources = tuple(sources.get(field, field) for field in fields)
+        get = attrgetter(*self.sources)
+        # attrgetter returns a bare value rather than a tuple for a single attribute
+        self._values = get if len(fields) > 1 else lambda obj: (get(obj),)
+        self._projections = {}
+
+    def dump(self, obj):
+        """The dict for one ORM object, row or anything else with the source attributes"""
+        return dict(zip(self.fields, self._values(obj)))
+
+    def dump_many(self, objs):
+        fields, values = self.fields, self._values
+        return [dict(zip(fields, values(obj))) for obj in objs]
+
+    def dump_rows(self, rows):
+        """Dicts for Core rows whose leading columns are this schema's fields, in order (see columns())"""
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+    def columns(self, model):
+        """The model's columns for a select() whose rows dump_rows() can serialize"""
+        return [
+            getattr(model, source) if source == field else getattr(model, source).label(field)
+            for field, source in zip(self.fields, self.sources)
+        ]
+
+    def only(self, fields):
+        """The schema narrowed to `fields`, in the order given; for ?fields= projections"""
+        fields = tuple(fields)
+        projection = self._projections.get(fields)
+        if projection is None:
+            sources = dict(zip(self.fields, self.sources))
+            projection = self._projections[fields] = Schema(*fields, **{field: sources[field] for field in fields})
+        return projection
+
+    def extend(self, *fields, **sources):
+        """This schema with more fields after its own"""
+        own = {field: source for field, source in zip(self.fields, self.sources) if field != source}
+        return Schema(*self.fields, *fields, **own, **sources)
+
+
+USER = Schema('id', 'username', 'email', 'created_at')
+
+EVENT = Schema('id', 'user_id', 'user_email', 'event_details', 'status', 'created_at')
+
+QUIZ = Schema('id', 'title', 'description', 'is_public', 'share_code', 'user_id', 'created_at')
+
+# Quiz listings may add the number of questions, selected as a labelled subquery
+QUIZ_LISTING = QUIZ.extend('question_count')
+
+# A question as its quiz's owner sees it, answer included
+QUESTION = Schema('id', 'text', 'question_type', 'options', 'correct_answer', 'points', 'order', 'quiz_id')
+
+# A question as anyone taking the quiz sees it
+PUBLIC_QUESTION = Schema('id', 'text', 'question_type', 'options', 'points', 'order')
+
+QUIZ_ATTEMPT = Schema(
+    'attempt_id', 'user_name', 'user_email', 'user_phone', 'submitted_at',
+    'total_points', 'points_earned', 'correct_answers', 'total_questions', 'percentage',
+    attempt_id='id'
+)
+
+# An attempt on a quiz's leaderboard, which adds its rank; without the taker's contact details
+LEADERBOARD_ENTRY = QUIZ_ATTEMPT.only(
+    ['attempt_id', 'user_name', 'percentage', 'points_earned', 'total_points', 'submitted_at']
+)
+
+# A graded answer with the attempt it belongs to, as exported; read from a row joining both
+QUIZ_RESPONSE = Schema(
+    'response_id', 'attempt_id', 'submitted_at', 'user_name', 'user_email', 'user_phone',
+    'question_id', 'question_text', 'answer', 'is_correct', 'points_earned'
+)
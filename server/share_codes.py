@@ -0,0 +1,91 @@
+"""
+Collision-free share codes.
+
+Every quiz gets a distinct number from a database counter, and the number is
+turned into an 8-character code with a keyed permutation of the code space.
+Distinct numbers always give distinct codes, so there is nothing to check
+before inserting. Because the permutation is keyed (SHARE_CODE_KEY), codes
+of neighbouring quizzes look unrelated and cannot be guessed from each other.
+
+Each worker reserves a block of numbers at a time, so the counter is touched
+once per block rather than once per quiz.
+"""
+
+import hashlib
+import hmac
+import os
+import string
+import threading
+
+SHARE_CODE_ALPHABET = string.ascii_uppercase + string.digits
+SHARE_CODE_LENGTH = 8
+CODE_SPACE = len(SHARE_CODE_ALPHABET) ** SHARE_CODE_LENGTH
+
+# The permutation runs on 42-bit values (two 21-bit Feistel halves), the
+# smallest even width covering CODE_SPACE; values past it are cycle-walked back in
+_HALF_BITS = 21
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ROUNDS = 4
+
+
+class ShareCodesExhausted(Exception):
+    """Raised when the counter has run past the number of possible codes"""
+
+
+def _round_function(key, round_index, half):
+    digest = hmac.new(key, f'{round_index}:{half}'.encode(), hashlib.sha256).digest()
+    return int.from_bytes(digest[:4], 'big') & _HALF_MASK
+
+
+def permute(number, key):
+    """Map a number in [0, CODE_SPACE) to another, one-to-one, under `key`"""
+    value = number
+    while True:
+        left, right = value >> _HALF_BITS, value & _HALF_MASK
+        for round_index in range(_ROUNDS):
+            left, right = right, left ^ _round_function(key, round_index, right)
+        value = (left << _HALF_BITS) | right
+        if value < CODE_SPACE:
+            return value
+
+
+def encode_share_code(number, key):
+    """The share code for a counter value"""
+    if not 0 <= number < CODE_SPACE:
+        raise ShareCodesExhausted(f'share code number {number} is out of range')
+    value = permute(number, key)
+    chars = []
+    for _ in range(SHARE_CODE_LENGTH):
+        value, digit = divmod(value, len(SHARE_CODE_ALPHABET))
+        chars.append(SHARE_CODE_ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+class ShareCodeAllocator:
+    """Hands out share codes from blocks of counter values reserved with `reserve_block(size)`.
+
+    `reserve_block` must atomically advance the shared counter by `size` and
+    return the first value of the reserved range.
+    """
+
+    def __init__(self, reserve_block, key, block_size=100):
+        self.reserve_block = reserve_block
+        self.key = key.encode() if isinstance(key, str) else key
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._pid = os.getpid()
+
+    def next_code(self):
+        with self._lock:
+            # A block inherited across a fork is shared with the parent; start a fresh one
+            if self._pid != os.getpid():
+                self._next = self._end = 0
+                self._pid = os.getpid()
+            if self._next >= self._end:
+                self._next = self.reserve_block(self.block_size)
+                self._end = self._next + self.block_size
+            number = self._next
+            self._next += 1
+        return encode_share_code(number, self.key)
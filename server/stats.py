@@ -0,0 +1,74 @@
+"""
+Score statistics for a quiz, computed from its percentage histogram.
+
+Percentages are whole numbers from 0 to 100, so a quiz's scores are fully
+described by at most 101 (percentage, attempts) buckets. The buckets are kept
+up to date as attempts are written, and everything here reads only them, so
+the cost does not depend on how many attempts a quiz has.
+"""
+
+from collections import Counter
+
+from pagination import PaginationError
+
+PERCENTILES = (25, 50, 75, 90, 99)
+HISTOGRAM_BIN_WIDTH = 10
+
+DEFAULT_LEADERBOARD_SIZE = 10
+MAX_LEADERBOARD_SIZE = 100
+
+
+def count_percentages(attempt_rows):
+    """Count new attempts per (quiz_id, percentage) bucket"""
+    return Counter((row['quiz_id'], row['percentage']) for row in attempt_rows)
+
+
+def percentile(buckets, q):
+    """Nearest-rank percentile of the scores described by sorted (percentage, attempts) buckets"""
+    total = sum(attempts for _, attempts in buckets)
+    if total == 0:
+        return None
+    rank = max(1, -(-q * total // 100))
+    seen = 0
+    for percentage, attempts in buckets:
+        seen += attempts
+        if seen >= rank:
+            return percentage
+    return buckets[-1][0]
+
+
+def histogram(buckets, width=HISTOGRAM_BIN_WIDTH):
+    """Attempts per percentage range; the last range includes 100"""
+    bins = [0] * (100 // width)
+    for percentage, attempts in buckets:
+        bins[min(percentage // width, len(bins) - 1)] += attempts
+    return [{
+        'min_percentage': i * width,
+        'max_percentage': 100 if i == len(bins) - 1 else (i + 1) * width - 1,
+        'attempts': attempts
+    } for i, attempts in enumerate(bins)]
+
+
+def score_summary(buckets):
+    """Attempt count, mean, percentiles and histogram for sorted (percentage, attempts) buckets"""
+    buckets = [(percentage, attempts) for percentage, attempts in buckets if attempts > 0]
+    total = sum(attempts for _, attempts in buckets)
+    return {
+        'attempts': total,
+        'mean_percentage': round(sum(p * a for p, a in buckets) / total, 2) if total else None,
+        'min_percentage': buckets[0][0] if buckets else None,
+        'max_percentage': buckets[-1][0] if buckets else None,
+        'percentiles': {f'p{q}': percentile(buckets, q) for q in PERCENTILES},
+        'histogram': histogram(buckets)
+    }
+
+
+def parse_leaderboard_size(args):
+    """Read the number of leaderboard entries from the query string"""
+    try:
+        limit = int(args.get('limit', DEFAULT_LEADERBOARD_SIZE))
+    except ValueError:
+        raise PaginationError('limit must be an integer')
+    if limit < 1:
+        raise PaginationError('limit must be positive')
+    return min(limit, MAX_LEADERBOARD_SIZE)
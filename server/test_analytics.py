@@ -0,0 +1,92 @@
+from analytics import columns_from_batches, item_analysis
+
+
+def analyse(rows, question_ids):
+    return {stats['question_id']: stats for stats in item_analysis(columns_from_batches([rows]), question_ids)}
+
+
+def test_percent_correct_and_options():
+    stats = analyse([
+        ('a1', 100, 'q1', 'A', True),
+        ('a2', 0, 'q1', 'B', False),
+        ('a3', 50, 'q1', 'A', True),
+        ('a4', 50, 'q1', 'C', False),
+    ], ['q1'])['q1']
+
+    assert stats['responses'] == 4
+    assert stats['percent_correct'] == 50
+    assert stats['options'] == [
+        {'answer': 'A', 'count': 2, 'percentage': 50},
+        {'answer': 'B', 'count': 1, 'percentage': 25},
+        {'answer': 'C', 'count': 1, 'percentage': 25},
+    ]
+
+
+def test_discrimination_compares_top_and_bottom_scorers():
+    rows = []
+    for i in range(10):
+        score = i * 10
+        # q_easy: everyone right; q_good: only the top half right; q_bad: only the bottom half right
+        rows += [
+            (f'a{i}', score, 'q_easy', 'A', True),
+            (f'a{i}', score, 'q_good', 'A' if i >= 5 else 'B', i >= 5),
+            (f'a{i}', score, 'q_bad', 'A' if i < 5 else 'B', i < 5),
+        ]
+
+    stats = analyse(rows, ['q_easy', 'q_good', 'q_bad'])
+
+    assert stats['q_easy']['discrimination_index'] == 0
+    assert stats['q_good']['discrimination_index'] == 1
+    assert stats['q_bad']['discrimination_index'] == -1
+
+
+def test_unanswered_and_deleted_questions():
+    stats = analyse([('a1', 100, 'deleted', 'A', True)], ['q1'])
+
+    assert list(stats) == ['q1']
+    assert stats['q1']['responses'] == 0
+    assert stats['q1']['percent_correct'] is None
+    assert stats['q1']['options'] == []
+
+
+def test_batches_are_combined():
+    columns = columns_from_batches([[('a1', 100, 'q1', 'A', True)], [], [('a2', 0, 'q1', 'B', False)]])
+
+    assert len(columns) == 2
+
+
+def test_question_stats_endpoint(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    submit(quiz_id, ['A', 'A'])
+    submit(quiz_id, ['A', 'B'])
+
+    body = client.get(f'/api/quizzes/{quiz_id}/questions/stats').get_json()
+
+    assert body['attempts'] == 2
+    assert [q['text'] for q in body['questions']] == ['Question 1', 'Question 2']
+    assert [q['percent_correct'] for q in body['questions']] == [100, 50]
+
+
+def test_question_stats_are_cached_until_a_new_attempt(client, submit, quiz_factory, query_counter):
+    quiz_id = quiz_factory(question_count=2)
+    submit(quiz_id, ['A', 'A'])
+    client.get(f'/api/quizzes/{quiz_id}/questions/stats')
+
+    query_counter.clear()
+    client.get(f'/api/quizzes/{quiz_id}/questions/stats')
+    assert not any('quiz_response' in statement for statement in query_counter)
+
+    submit(quiz_id, ['B', 'B'])
+    body = client.get(f'/api/quizzes/{quiz_id}/questions/stats').get_json()
+    assert body['attempts'] == 2
+    assert body['questions'][0]['percent_correct'] == 50
+
+
+def test_quiz_stats_cli(app, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    submit(quiz_id, ['A'])
+
+    result = app.test_cli_runner().invoke(args=['quiz-stats', '--quiz-id', quiz_id])
+
+    assert 'Attempts: 1' in result.output
+    assert 'Correct: 100.0% of 1' in result.output
@@ -0,0 +1,96 @@
+import gc
+import os
+import weakref
+
+import pytest
+
+import app as app_module
+from app import create_app, db, schema_problems
+from pooling import pool_sizing
+
+
+def test_pool_sizing_splits_the_connection_budget_between_workers():
+    assert pool_sizing(workers=1, threads=1, max_connections=90) == (2, 88)
+    assert pool_sizing(workers=4, threads=8, max_connections=90) == (9, 13)
+    # More threads than a worker's share: the pool is capped and threads wait for a connection
+    assert pool_sizing(workers=30, threads=8, max_connections=90) == (3, 0)
+    with pytest.raises(ValueError):
+        pool_sizing(workers=100, threads=1, max_connections=90)
+
+
+def test_pool_is_sized_from_the_worker_count(monkeypatch):
+    monkeypatch.setenv('WEB_CONCURRENCY', '3')
+    monkeypatch.setenv('WEB_THREADS', '4')
+    monkeypatch.setenv('DB_MAX_CONNECTIONS', '30')
+
+    options = create_app().config['SQLALCHEMY_ENGINE_OPTIONS']
+
+    assert (options['pool_size'], options['max_overflow']) == (5, 5)
+
+
+def test_create_app_does_not_connect(tmp_path):
+    unreachable = 'sqlite:///' + str(tmp_path / 'missing' / 'quizzy.db')
+
+    factory_app = create_app({'SQLALCHEMY_DATABASE_URI': unreachable})
+
+    assert 'get_quiz_by_share_code' in factory_app.view_functions
+    assert 'check-schema' in factory_app.cli.commands
+    with factory_app.app_context():
+        assert db.engine.pool.checkedout() == 0
+
+
+def test_forked_worker_gets_its_own_pool(app):
+    with db.engine.connect():
+        parent_pool = db.engine.pool
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                with db.engine.connect() as conn:
+                    conn.exec_driver_sql('SELECT 1')
+                os._exit(0 if db.engine.pool is not parent_pool and parent_pool.checkedout() == 1 else 1)
+            except BaseException:
+                os._exit(2)
+        _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert db.engine.pool is parent_pool
+
+
+def test_one_fork_hook_empties_the_pools_of_every_live_app(tmp_path):
+    factory_app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'quizzy.db')})
+    with factory_app.app_context():
+        with db.engine.connect():
+            pass
+        pool = db.engine.pool
+
+    app_module._dispose_pools_after_fork()
+
+    with factory_app.app_context():
+        assert db.engine.pool is not pool
+    # Tracking an app for the hook does not keep it alive
+    tracked = weakref.ref(factory_app)
+    del factory_app
+    gc.collect()
+    assert tracked() is None
+
+
+def test_schema_problems_reports_missing_tables_and_migrations(app):
+    db.metadata.tables['event'].drop(db.engine)
+
+    problems = schema_problems()
+
+    assert problems[0] == 'missing tables: event'
+    assert problems[1].startswith('database is at migration none, the latest is ')
+
+
+def test_postgres_uri_without_a_driver_uses_the_installed_one(monkeypatch):
+    pytest.importorskip('psycopg2')
+    monkeypatch.setenv('REPLICA_DATABASE_URIS', 'postgresql://quizzy@replica/quizzy')
+    postgres_app = create_app({'SQLALCHEMY_DATABASE_URI': 'postgresql://quizzy-admin:test@db:5432/quizzy'})
+
+    with postgres_app.app_context():
+        # Engines are created without connecting; a missing driver would fail here
+        assert db.engine.dialect.driver == 'psycopg2'
+        assert db.engines['replica_1'].dialect.driver == 'psycopg2'
+        assert db.engine.url.password == 'test'
@@ -0,0 +1,120 @@
+import pytest
+from starlette.testclient import TestClient
+
+from app import QuizAttempt, QuizScoreBucket, Question, db
+from asgi import application, async_database_uri
+
+
+@pytest.fixture
+def async_client(app):
+    with TestClient(application) as client:
+        yield client
+
+
+def answers(quiz_id):
+    return [{'question_id': q.id, 'answer': 'A'} for q in Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order)]
+
+
+def test_async_database_uri_swaps_in_an_async_driver():
+    assert async_database_uri('postgresql://u:p@db/quizzy').drivername == 'postgresql+asyncpg'
+    assert async_database_uri('postgresql+psycopg2://db/quizzy').drivername == 'postgresql+asyncpg'
+    assert async_database_uri('sqlite:////tmp/q.db').drivername == 'sqlite+aiosqlite'
+    with pytest.raises(ValueError):
+        async_database_uri('mysql://db/quizzy')
+
+
+def test_quiz_listing_matches_flask(client, async_client, quiz_factory):
+    for _ in range(3):
+        quiz_factory()
+    quiz_factory(is_public=False)
+
+    for path in ('/api/quizzes?limit=2', '/api/quizzes?fields=id,question_count', '/api/quizzes?limit=0'):
+        sync, async_ = client.get(path), async_client.get(path)
+        assert async_.status_code == sync.status_code
+        assert async_.json() == sync.get_json()
+        assert async_.headers.get('X-Next-Cursor') == sync.headers.get('X-Next-Cursor')
+
+    cursor = async_client.get('/api/quizzes?limit=2').headers['X-Next-Cursor']
+    assert len(async_client.get(f'/api/quizzes?limit=2&cursor={cursor}').json()) == 1
+
+
+def test_quiz_listing_by_owner(client, async_client, quiz_factory):
+    own = quiz_factory(is_public=False, email='me@example.com')
+    quiz_factory(email='other@example.com')
+    user_id = client.get(f'/api/quizzes/{own}').get_json()['user_id']
+
+    assert [q['id'] for q in async_client.get(f'/api/quizzes?user_id={user_id}').json()] == [own]
+    assert client.get(f'/api/quizzes?user_id={user_id}').get_json() == async_client.get(f'/api/quizzes?user_id={user_id}').json()
+
+
+def test_share_code_lookup_matches_flask_and_revalidates(client, async_client, quiz_factory):
+    quiz_id = quiz_factory()
+    share_code = client.get(f'/api/quizzes/{quiz_id}').get_json()['share_code']
+
+    response = async_client.get(f'/api/quizzes/share/{share_code}')
+    assert response.status_code == 200
+    assert response.json() == client.get(f'/api/quizzes/share/{share_code}').get_json()
+    assert response.headers['ETag'] == client.get(f'/api/quizzes/share/{share_code}').headers['ETag']
+
+    revalidated = async_client.get(f'/api/quizzes/share/{share_code}', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+    assert async_client.get('/api/quizzes/share/NOPE1234').status_code == 404
+
+
+def test_quiz_responses_match_flask(client, async_client, quiz_factory):
+    quiz_id = quiz_factory()
+    for i in range(3):
+        client.post('/api/quiz-responses', json={
+            'quiz_id': quiz_id, 'user_name': f'T{i}', 'user_email': f't{i}@example.com', 'responses': answers(quiz_id)
+        })
+
+    path = f'/api/quizzes/{quiz_id}/responses?limit=2'
+    response = async_client.get(path)
+    assert response.json() == client.get(path).get_json()
+    assert response.json()['total_attempts'] == 3
+    assert async_client.get('/api/quizzes/missing/responses').status_code == 404
+    assert async_client.get(f'/api/quizzes/{quiz_id}/responses?limit=x').status_code == 400
+
+
+def test_submission_is_stored_scored_and_replayed(async_client, quiz_factory):
+    quiz_id = quiz_factory()
+    body = {'quiz_id': quiz_id, 'user_name': 'Async', 'user_email': 'async@example.com', 'responses': answers(quiz_id)}
+
+    created = async_client.post('/api/quiz-responses', json=body, headers={'Idempotency-Key': 'key-1'})
+    assert created.status_code == 201
+    assert created.json()['responses_stored'] == 3
+
+    replayed = async_client.post('/api/quiz-responses', json=body, headers={'Idempotency-Key': 'key-1'})
+    assert replayed.status_code == 200
+    assert replayed.headers['Idempotent-Replayed'] == 'true'
+    assert replayed.json()['attempt_id'] == created.json()['attempt_id']
+
+    db.session.expire_all()
+    assert QuizAttempt.query.filter_by(quiz_id=quiz_id).count() == 1
+    assert sum(b.attempts for b in QuizScoreBucket.query.filter_by(quiz_id=quiz_id)) == 1
+
+
+def test_submission_errors(async_client, quiz_factory):
+    quiz_id = quiz_factory()
+
+    assert async_client.post('/api/quiz-responses', json={'quiz_id': quiz_id}).status_code == 400
+    assert async_client.post('/api/quiz-responses', content=b'not json').status_code == 400
+    assert async_client.post('/api/quiz-responses', json={
+        'quiz_id': 'missing', 'user_name': 'A', 'user_email': 'a@example.com', 'responses': [{'question_id': 'q', 'answer': 'A'}]
+    }).status_code == 404
+
+
+def test_other_routes_fall_through_to_flask(async_client, quiz_factory):
+    quiz_factory()
+
+    assert async_client.get('/health').json()['status'] == 'healthy'
+    created = async_client.post('/api/quizzes', json={'title': 'Via Flask', 'user_email': 'owner@example.com'})
+    assert created.status_code == 201
+    assert async_client.get(f"/api/quizzes/{created.json()['id']}").json()['title'] == 'Via Flask'
+
+
+def test_async_routes_send_cors_headers(async_client):
+    response = async_client.get('/api/quizzes', headers={'Origin': 'http://localhost:5173'})
+
+    assert response.headers['access-control-allow-origin'] == 'http://localhost:5173'
+    assert 'X-Next-Cursor' in response.headers['access-control-expose-headers']
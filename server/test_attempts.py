@@ -0,0 +1,50 @@
+from app import QuizAttempt, QuizResponse
+
+
+def test_each_submission_is_its_own_attempt(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    first = submit(quiz_id, 'A').get_json()
+    second = submit(quiz_id, 'B').get_json()
+
+    body = client.get(f'/api/quizzes/{quiz_id}/responses').get_json()
+
+    assert body['total_attempts'] == 2
+    by_id = {attempt['attempt_id']: attempt for attempt in body['user_responses']}
+    assert by_id[first['attempt_id']]['percentage'] == 100
+    assert by_id[second['attempt_id']]['percentage'] == 0
+    assert by_id[second['attempt_id']]['points_earned'] == 0
+
+
+def test_responses_view_reads_attempts_without_aggregating_answers(client, submit, quiz_factory, query_counter):
+    quiz_id = quiz_factory(question_count=5)
+    for i in range(3):
+        submit(quiz_id, email=f'taker{i}@example.com')
+
+    query_counter.clear()
+    client.get(f'/api/quizzes/{quiz_id}/responses')
+
+    assert not any('quiz_response' in statement for statement in query_counter)
+    assert not any('GROUP BY' in statement.upper() for statement in query_counter)
+
+
+def test_deleting_a_quiz_removes_its_attempts(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    submit(quiz_id)
+
+    assert client.delete(f'/api/quizzes/{quiz_id}').status_code == 200
+    assert QuizAttempt.query.count() == 0
+    assert QuizResponse.query.count() == 0
+
+
+def test_view_responses_cli(app, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    submit(quiz_id)
+
+    runner = app.test_cli_runner()
+    detail = runner.invoke(args=['view-responses', '--quiz-id', quiz_id])
+    summary = runner.invoke(args=['view-responses'])
+
+    assert detail.exit_code == 0
+    assert 'Correct: 2/2 (100%)' in detail.output
+    assert summary.exit_code == 0
+    assert 'Attempts: 1' in summary.output
@@ -0,0 +1,109 @@
+import pytest
+
+from app import Question, User, db
+
+
+@pytest.fixture
+def owner(app):
+    db.session.add(User(username='owner', email='owner@example.com'))
+    db.session.commit()
+    return 'owner@example.com'
+
+
+def question(i, **fields):
+    return {'text': f'Question {i}', 'options': ['A', 'B'], 'correct_answer': 'A', **fields}
+
+
+def test_bulk_create_is_one_transaction_with_one_question_insert(client, owner, query_counter):
+    response = client.post('/api/quizzes/bulk', json={
+        'title': 'Big quiz',
+        'user_email': owner,
+        'questions': [question(i) for i in range(100)]
+    })
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [q['order'] for q in body['questions']] == list(range(1, 101))
+    assert Question.query.filter_by(quiz_id=body['id']).count() == 100
+    question_inserts = [s for s in query_counter if s.lstrip().upper().startswith('INSERT INTO QUESTION')]
+    assert len(question_inserts) == 1
+
+
+def test_bulk_create_validates_every_question_first(client, owner):
+    response = client.post('/api/quizzes/bulk', json={
+        'title': 'Broken',
+        'user_email': owner,
+        'questions': [question(0), {'text': 'No answer'}, question(2, points=-1), question(3, question_type='essay')]
+    })
+
+    assert response.status_code == 400
+    assert [e['index'] for e in response.get_json()['errors']] == [1, 2, 3]
+    assert Question.query.count() == 0
+
+
+def test_bulk_create_unknown_user(client, app):
+    response = client.post('/api/quizzes/bulk', json={'title': 'Quiz', 'user_email': 'nobody@example.com'})
+
+    assert response.status_code == 404
+
+
+def test_batch_adds_updates_and_reorders(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=3)
+    first, second, third = [q.id for q in Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order)]
+
+    response = client.post(f'/api/quizzes/{quiz_id}/questions/batch', json={
+        'add': [question('new')],
+        'update': [{'id': second, 'text': 'Renamed', 'points': 5}],
+        'order': [third, first, second]
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [q['id'] for q in body['questions'][:3]] == [third, first, second]
+    assert body['questions'][2]['text'] == 'Renamed'
+    assert body['questions'][2]['points'] == 5
+    assert body['questions'][3]['text'] == 'Question new'
+    assert body['questions'][3]['order'] == 4
+
+
+def test_batch_partial_reorder_keeps_unlisted_questions_after_the_listed_ones(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=4)
+    first, second, third, fourth = [q.id for q in Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order)]
+
+    response = client.post(f'/api/quizzes/{quiz_id}/questions/batch', json={
+        'add': [question('new')],
+        'order': [third, first]
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [q['id'] for q in body['questions'][:4]] == [third, first, second, fourth]
+    assert [q['order'] for q in body['questions']] == [1, 2, 3, 4, 5]
+    assert body['questions'][4]['text'] == 'Question new'
+
+
+def test_batch_appends_after_existing_questions(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+
+    body = client.post(f'/api/quizzes/{quiz_id}/questions/batch', json={'add': [question(1), question(2)]}).get_json()
+
+    assert [q['order'] for q in body['questions']] == [1, 2, 3, 4]
+
+
+def test_batch_rejects_questions_from_another_quiz(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    other_question = Question.query.filter_by(quiz_id=quiz_factory(question_count=1)).first().id
+
+    response = client.post(f'/api/quizzes/{quiz_id}/questions/batch', json={'update': [{'id': other_question, 'text': 'x'}]})
+
+    assert response.status_code == 400
+    assert response.get_json()['question_ids'] == [other_question]
+
+
+def test_batch_invalidates_cached_quiz(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    client.get(f'/api/quizzes/{quiz_id}')
+
+    client.post(f'/api/quizzes/{quiz_id}/questions/batch', json={'add': [question(2)]})
+
+    assert len(client.get(f'/api/quizzes/{quiz_id}').get_json()['questions']) == 2
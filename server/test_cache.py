@@ -0,0 +1,86 @@
+from app import Question
+from cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2, ttl=None)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_lru_cache_expires_entries_after_ttl():
+    clock = FakeClock()
+    cache = LRUCache(max_size=10, ttl=30, clock=clock)
+    cache.set('a', 1)
+    clock.now = 29
+    assert cache.get('a') == 1
+    clock.now = 30
+    assert cache.get('a') is None
+    assert len(cache) == 0
+
+
+def test_repeat_submissions_do_not_read_the_answer_key(submit, quiz_factory, query_counter):
+    quiz_id = quiz_factory(question_count=10)
+    question_ids = [q.id for q in Question.query.filter_by(quiz_id=quiz_id).all()]
+    answers = [{'question_id': qid, 'answer': 'A'} for qid in question_ids]
+
+    submit(quiz_id, responses=answers)
+
+    query_counter.clear()
+    for _ in range(20):
+        submit(quiz_id, responses=answers)
+
+    selects = [s for s in query_counter if s.lstrip().upper().startswith('SELECT')]
+    assert selects == []
+
+
+def test_question_update_invalidates_answer_key(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    question_id = Question.query.filter_by(quiz_id=quiz_id).first().id
+    answers = [{'question_id': question_id, 'answer': 'B'}]
+
+    assert submit(quiz_id, responses=answers).get_json()['correct_answers'] == 0
+
+    client.put(f'/api/questions/{question_id}', json={'correct_answer': 'B'})
+    assert submit(quiz_id, responses=answers).get_json()['correct_answers'] == 1
+
+
+def test_question_create_and_delete_invalidate_answer_key(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    first_id = Question.query.filter_by(quiz_id=quiz_id).first().id
+    first_answer = [{'question_id': first_id, 'answer': 'A'}]
+    submit(quiz_id, responses=first_answer)
+
+    created = client.post(f'/api/quizzes/{quiz_id}/questions', json={
+        'text': 'New question',
+        'correct_answer': 'Yes'
+    }).get_json()
+    new_answer = [{'question_id': created['id'], 'answer': 'yes'}]
+
+    # Warm the cache with a key that includes the new question, then drop it
+    submit(quiz_id, responses=first_answer)
+    client.delete(f'/api/questions/{created["id"]}')
+
+    assert submit(quiz_id, responses=new_answer).get_json()['responses_stored'] == 0
+
+
+def test_deleted_quiz_is_not_served_from_cache(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    answers = [{'question_id': 'missing', 'answer': 'A'}]
+
+    submit(quiz_id, responses=answers)
+    client.delete(f'/api/quizzes/{quiz_id}')
+    submit(quiz_id, responses=answers, status=404)
@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+
+
+def seed_responses(submit, quiz_id, takers=3):
+    for i in range(takers):
+        submit(quiz_id, name=f'Taker {i}', email=f'taker{i}@example.com')
+
+
+def test_export_streams_ndjson(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    seed_responses(submit, quiz_id)
+
+    response = client.get(f'/api/quizzes/{quiz_id}/responses/export')
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == 6
+    assert {row['question_text'] for row in rows} == {'Question 1', 'Question 2'}
+    assert len({row['attempt_id'] for row in rows}) == 3
+    assert all(row['is_correct'] for row in rows)
+
+
+def test_export_streams_csv(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    seed_responses(submit, quiz_id, takers=2)
+
+    response = client.get(f'/api/quizzes/{quiz_id}/responses/export?format=csv')
+
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 4
+    assert {row['user_email'] for row in rows} == {'taker0@example.com', 'taker1@example.com'}
+
+
+def test_export_validates_format_and_quiz(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    assert client.get(f'/api/quizzes/{quiz_id}/responses/export?format=xml').status_code == 400
+    assert client.get('/api/quizzes/missing/responses/export').status_code == 404
+
+
+def test_export_responses_cli(app, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=3)
+    seed_responses(submit, quiz_id, takers=1)
+
+    result = app.test_cli_runner().invoke(args=['export-responses', '--quiz-id', quiz_id, '--format', 'csv'])
+
+    assert result.exit_code == 0
+    lines = result.output.strip().splitlines()
+    assert lines[0].startswith('response_id,attempt_id,submitted_at')
+    assert len(lines) == 4
@@ -0,0 +1,60 @@
+from app import QuizAttempt, QuizResponse, Question
+from grading import build_answer_key, grade_responses
+
+
+def test_grade_responses_in_memory():
+    key = build_answer_key([('q1', ' Paris ', 2), ('q2', 'Mars', 1)])
+    result = grade_responses(key, [
+        {'question_id': 'q1', 'answer': 'paris'},
+        {'question_id': 'q2', 'answer': 'Venus'},
+        {'question_id': 'unknown', 'answer': 'x'},
+        {'question_id': 'q1'},
+    ])
+    assert [a.is_correct for a in result.answers] == [True, False]
+    assert result.correct_answers == 1
+    assert result.total_points == 2
+    assert result.total_questions == 4
+    assert result.percentage == 25
+
+
+def test_submission_is_graded_and_stored(submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=3)
+    questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order).all()
+
+    body = submit(quiz_id, [' a ', 'B', 'A']).get_json()
+
+    assert body['correct_answers'] == 2
+    assert body['total_points'] == questions[0].points + questions[2].points
+    assert body['percentage'] == 67
+    assert body['responses_stored'] == 3
+
+    stored = QuizResponse.query.filter_by(quiz_id=quiz_id).all()
+    assert len(stored) == 3
+    assert sum(r.points_earned for r in stored) == body['total_points']
+
+    attempt = QuizAttempt.query.get(body['attempt_id'])
+    assert attempt.user_email == 'taker@example.com'
+    assert attempt.correct_answers == 2
+    assert attempt.points_earned == body['total_points']
+    assert attempt.total_points == sum(q.points for q in questions)
+    assert attempt.percentage == 67
+    assert {r.attempt_id for r in stored} == {attempt.id}
+
+
+def test_submission_query_count_is_independent_of_quiz_size(submit, quiz_factory, query_counter):
+    counts = []
+    for size in (5, 50):
+        quiz_id = quiz_factory(question_count=size)
+        question_ids = [q.id for q in Question.query.filter_by(quiz_id=quiz_id).all()]
+
+        query_counter.clear()
+        response = submit(quiz_id, responses=[{'question_id': qid, 'answer': 'A'} for qid in question_ids])
+        assert response.get_json()['responses_stored'] == size
+
+        selects = [s for s in query_counter if s.lstrip().upper().startswith('SELECT')]
+        inserts = [s for s in query_counter if s.lstrip().upper().startswith('INSERT')]
+        assert len(selects) == 2  # quiz lookup + answer key
+        assert len(inserts) == 3  # the attempt row, one bulk insert for every answer, the score bucket upsert
+        counts.append(len(query_counter))
+
+    assert counts[0] == counts[1]
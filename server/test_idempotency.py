@@ -0,0 +1,77 @@
+import app as app_module
+from app import QuizAttempt, QuizResponse, Question, idempotency_cache
+
+
+def test_retry_returns_stored_result_without_writing(submit, quiz_factory, query_counter):
+    quiz_id = quiz_factory(question_count=3)
+    question_ids = [q.id for q in Question.query.filter_by(quiz_id=quiz_id)]
+    first = submit(quiz_id, key='retry-1')
+
+    query_counter.clear()
+    retry = submit(quiz_id, key='retry-1', responses=[{'question_id': qid, 'answer': 'B'} for qid in question_ids],
+                   status=200)
+
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json()['attempt_id'] == first.get_json()['attempt_id']
+    assert retry.get_json()['percentage'] == 100
+    # Served from the recent-key cache: no re-grading reads, no inserts
+    assert query_counter == []
+    assert QuizAttempt.query.count() == 1
+
+
+def test_retry_after_cache_eviction_reads_the_stored_attempt(submit, quiz_factory, query_counter):
+    quiz_id = quiz_factory(question_count=3)
+    first = submit(quiz_id, attempt_id='client-attempt-1').get_json()
+    idempotency_cache.clear()
+
+    query_counter.clear()
+    retry = submit(quiz_id, attempt_id='client-attempt-1', status=200)
+
+    assert retry.get_json() == {**first, 'message': 'Quiz responses already submitted'}
+    assert not any(statement.lstrip().upper().startswith('INSERT') for statement in query_counter)
+
+
+def test_concurrent_retry_is_rejected_by_the_unique_index(submit, quiz_factory, monkeypatch):
+    quiz_id = quiz_factory(question_count=2)
+    first = submit(quiz_id, key='race').get_json()
+    # The retry checks for the key before the first request has committed, then loses the insert race
+    find_submission = app_module.find_submission
+    lookups = []
+
+    def racing_find_submission(quiz_id, key):
+        lookups.append(key)
+        return None if len(lookups) == 1 else find_submission(quiz_id, key)
+
+    monkeypatch.setattr(app_module, 'find_submission', racing_find_submission)
+
+    retry = submit(quiz_id, key='race', status=200)
+
+    assert retry.get_json()['attempt_id'] == first['attempt_id']
+    assert QuizAttempt.query.count() == 1
+    assert QuizResponse.query.count() == 2
+
+
+def test_submissions_without_a_key_are_independent(submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    submit(quiz_id)
+    submit(quiz_id)
+
+    assert QuizAttempt.query.count() == 2
+
+
+def test_queued_retry_is_written_once(submit, quiz_factory, queue_mode, submission_queue):
+    quiz_id = quiz_factory(question_count=2)
+    submit(quiz_id, key='queued', status=202)
+    idempotency_cache.clear()
+    submit(quiz_id, key='queued', status=202)
+
+    assert len(submission_queue) == 1
+    queue_mode.drain()
+    assert QuizAttempt.query.count() == 1
+    assert QuizResponse.query.count() == 2
+
+
+def test_overlong_key_is_rejected(submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+
+    submit(quiz_id, key='x' * 101, status=400)
@@ -0,0 +1,84 @@
+"""
+EXPLAIN-based checks that the hot queries are served by the secondary indexes.
+
+Statements are captured from real requests against a seeded SQLite database
+and re-run under EXPLAIN QUERY PLAN with the same parameters.
+"""
+
+import pytest
+from sqlalchemy import event, text
+
+from app import db
+
+
+@pytest.fixture
+def captured(app):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def seeded(submit, quiz_factory):
+    quiz_ids = []
+    for i in range(20):
+        quiz_ids.append(quiz_factory(question_count=5, is_public=i % 2 == 0, email=f'owner{i % 4}@example.com'))
+    for quiz_id in quiz_ids[:5]:
+        for taker in range(3):
+            submit(quiz_id, email=f'owner{taker}@example.com')
+    return quiz_ids
+
+
+def query_plans(statements):
+    plans = []
+    with db.engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+            plans.append(' | '.join(row[-1] for row in rows))
+    return plans
+
+
+def assert_uses_index(statements, index_name):
+    plans = query_plans(statements)
+    assert any(index_name in plan for plan in plans), plans
+
+
+def test_public_listing_uses_is_public_index(client, seeded, captured):
+    client.get('/api/quizzes?fields=id,title,question_count')
+    assert_uses_index(captured, 'ix_quiz_is_public_created_at')
+    assert_uses_index(captured, 'ix_question_quiz_id_order')
+
+
+def test_answer_key_uses_question_quiz_index(app, seeded, captured):
+    from app import load_answer_key
+    load_answer_key(seeded[0])
+    assert_uses_index(captured, 'ix_question_quiz_id_order')
+
+
+def test_responses_view_uses_attempt_index(client, seeded, captured):
+    client.get(f'/api/quizzes/{seeded[0]}/responses')
+    assert_uses_index(captured, 'ix_quiz_attempt_quiz_id_submitted_at')
+
+
+def test_export_uses_response_quiz_index(client, seeded, captured):
+    client.get(f'/api/quizzes/{seeded[0]}/responses/export').get_data()
+    assert_uses_index(captured, 'ix_quiz_response_quiz_id_question_id')
+
+
+def test_delete_user_lookups_use_indexes(client, seeded, captured):
+    response = client.delete('/api/users?user_email=owner1@example.com')
+    assert response.status_code == 409
+    assert_uses_index(captured, 'ix_quiz_user_id_created_at')
+    assert_uses_index(captured, 'ix_quiz_attempt_user_email')
+
+
+def test_leaderboard_reads_attempts_in_index_order(client, seeded, captured):
+    client.get(f'/api/quizzes/{seeded[0]}/leaderboard')
+    plans = query_plans([c for c in captured if 'ORDER BY quiz_attempt.percentage' in c[0]])
+    assert any('ix_quiz_attempt_leaderboard' in plan and 'TEMP B-TREE' not in plan for plan in plans), plans
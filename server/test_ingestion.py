@@ -0,0 +1,149 @@
+import pytest
+
+import app as app_module
+import ingestion
+from app import QuizAttempt, QuizResponse, create_app, db, write_queued_attempts
+from ingestion import Flusher, QueueFull, SubmissionQueue
+
+
+def test_queue_reopens_its_connection_after_a_fork(submission_queue, monkeypatch):
+    submission_queue.enqueue('attempt-0', {'n': 0})
+    inherited = submission_queue._conn
+
+    monkeypatch.setattr(ingestion.os, 'getpid', lambda: -1)
+    submission_queue.enqueue('attempt-1', {'n': 1})
+
+    assert submission_queue._conn is not inherited
+    assert [payload['n'] for _, payload in submission_queue.claim(10)] == [0, 1]
+
+
+def test_queue_claims_in_order_and_acks(submission_queue):
+    for i in range(3):
+        submission_queue.enqueue(f'attempt-{i}', {'n': i})
+
+    batch = submission_queue.claim(2)
+    assert [payload['n'] for _, payload in batch] == [0, 1]
+    # Claimed entries are leased and not handed out again
+    assert [payload['n'] for _, payload in submission_queue.claim(10)] == [2]
+
+    submission_queue.ack([seq for seq, _ in batch])
+    assert len(submission_queue) == 1
+
+
+def test_queue_survives_reopening(tmp_path):
+    path = str(tmp_path / 'queue.db')
+    SubmissionQueue(path).enqueue('attempt-1', {'n': 1})
+
+    reopened = SubmissionQueue(path)
+
+    assert [payload for _, payload in reopened.claim(10)] == [{'n': 1}]
+
+
+def test_queue_rejects_when_full(submission_queue):
+    for i in range(10):
+        submission_queue.enqueue(f'attempt-{i}', {})
+
+    with pytest.raises(QueueFull):
+        submission_queue.enqueue('attempt-10', {})
+
+
+def test_transient_failure_releases_the_batch(submission_queue):
+    submission_queue.enqueue('attempt-1', {})
+    submission_queue.enqueue('attempt-2', {})
+    calls = []
+
+    def failing_writer(batch):
+        calls.append(batch)
+        raise ConnectionError('database unavailable')
+
+    with pytest.raises(ConnectionError):
+        Flusher(submission_queue, failing_writer, transient_errors=(ConnectionError,)).flush_once()
+
+    assert len(calls) == 1
+    assert len(submission_queue.claim(10)) == 2
+    assert submission_queue.dead_letters() == []
+
+
+def test_rejected_submission_does_not_hold_up_the_rest(submission_queue, monkeypatch):
+    for i in range(5):
+        submission_queue.enqueue(f'attempt-{i}', {'n': i})
+    written = []
+
+    def writer(batch):
+        if any(payload['n'] == 3 for payload in batch):
+            raise ValueError('quiz was deleted')
+        written.extend(payload['n'] for payload in batch)
+
+    flusher = Flusher(submission_queue, writer, max_failures=2)
+
+    assert flusher.flush_once() == 4
+    assert sorted(written) == [0, 1, 2, 4]
+    # The rejected submission keeps its lease and is retried once it runs out
+    assert flusher.drain() == 0
+    assert len(submission_queue) == 1
+
+    now = ingestion.time.time()
+    monkeypatch.setattr(ingestion.time, 'time', lambda: now + submission_queue.lease_seconds + 1)
+    assert flusher.drain() == 0
+    assert len(submission_queue) == 0
+    assert submission_queue.dead_letters() == [('attempt-3', 2, "ValueError('quiz was deleted')")]
+
+    assert submission_queue.requeue_dead_letters() == 1
+    assert [payload['n'] for _, payload in submission_queue.claim(10)] == [3]
+    assert submission_queue.dead_letters() == []
+
+
+def test_queued_submission_is_scored_and_written_on_flush(submit, quiz_factory, queue_mode):
+    quiz_id = quiz_factory(question_count=3)
+
+    body = submit(quiz_id, status=202).get_json()
+
+    assert body['percentage'] == 100
+    assert body['responses_stored'] == 3
+    assert QuizAttempt.query.count() == 0
+
+    assert queue_mode.drain() == 1
+    attempt = QuizAttempt.query.get(body['attempt_id'])
+    assert attempt.percentage == 100
+    assert QuizResponse.query.filter_by(attempt_id=attempt.id).count() == 3
+
+
+def test_replayed_batch_is_not_duplicated(app, submit, quiz_factory, queue_mode, submission_queue):
+    quiz_id = quiz_factory(question_count=2)
+    submit(quiz_id, status=202)
+    batch = submission_queue.claim(10)
+
+    # Crash after the database commit but before the ack: the batch is written twice
+    write_queued_attempts(app, [payload for _, payload in batch])
+    write_queued_attempts(app, [payload for _, payload in batch])
+
+    assert QuizAttempt.query.count() == 1
+    assert QuizResponse.query.count() == 2
+
+
+def test_full_queue_falls_back_to_synchronous_write(submit, quiz_factory, queue_mode, submission_queue):
+    quiz_id = quiz_factory(question_count=1)
+    for i in range(10):
+        submission_queue.enqueue(f'attempt-{i}', {})
+
+    response = submit(quiz_id, status=201)
+
+    assert QuizAttempt.query.get(response.get_json()['attempt_id']) is not None
+
+
+def test_create_app_binds_the_flusher_to_that_app(tmp_path, monkeypatch, submit, quiz_factory, queue_mode,
+                                                   submission_queue):
+    submit(quiz_factory(question_count=2), status=202)
+    (_, payload), = submission_queue.claim(10)
+    other_queue = SubmissionQueue(str(tmp_path / 'other-queue.db'))
+    monkeypatch.setattr(app_module, 'submission_flusher', Flusher(other_queue, None))
+
+    factory_app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'factory.db')})
+    with factory_app.app_context():
+        db.create_all()
+    other_queue.enqueue(payload['attempt']['id'], payload)
+
+    assert app_module.submission_flusher.drain() == 1
+    with factory_app.app_context():
+        assert QuizAttempt.query.count() == 1
+    assert QuizAttempt.query.count() == 0
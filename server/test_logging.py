@@ -0,0 +1,42 @@
+import json
+import logging
+
+from log_config import JsonFormatter, SamplingFilter
+
+
+def make_record(**extra):
+    record = logging.LogRecord('quizzy', logging.INFO, __file__, 1, 'Graded %s', ('answer',), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extra_fields():
+    entry = json.loads(JsonFormatter().format(make_record(quiz_id='q1', is_correct=True)))
+
+    assert entry['message'] == 'Graded answer'
+    assert entry['level'] == 'INFO'
+    assert entry['logger'] == 'quizzy'
+    assert entry['quiz_id'] == 'q1'
+    assert entry['is_correct'] is True
+
+
+def test_sampling_filter_rates():
+    records = [make_record() for _ in range(200)]
+    assert not any(SamplingFilter(0.0).filter(r) for r in records)
+    assert all(SamplingFilter(1.0).filter(r) for r in records)
+    assert 0 < sum(SamplingFilter(0.5).filter(r) for r in records) < 200
+
+
+def test_request_path_does_not_write_to_console(client, submit, quiz_factory, capfd):
+    quiz_id = quiz_factory(question_count=3)
+    capfd.readouterr()
+
+    client.post('/api/users', json={'username': 'owner', 'email': 'owner@example.com'})
+    client.get(f'/api/quizzes/{quiz_id}')
+    submit(quiz_id)
+    client.delete('/api/users?user_email=owner@example.com')
+
+    out, err = capfd.readouterr()
+    assert out == ''
+    assert err == ''
+    assert not logging.getLogger('sqlalchemy.engine').isEnabledFor(logging.INFO)
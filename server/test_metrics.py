@@ -0,0 +1,61 @@
+import pytest
+from flask import g
+from sqlalchemy import exc, text
+
+from app import create_app, db
+
+
+def sample(body, name, **labels):
+    for line in body.splitlines():
+        if line.startswith(name + '{') or line.startswith(name + ' '):
+            if all(f'{key}="{value}"' in line for key, value in labels.items()):
+                return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_metrics_endpoint_exposes_request_and_sql_metrics(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    before = client.get('/metrics').get_data(as_text=True)
+    submitted_before = sample(before, 'quizzy_requests_total', endpoint='submit_quiz_responses', status='201') or 0
+
+    submit(quiz_id)
+    client.get('/api/quizzes/share/missing')
+
+    response = client.get('/metrics')
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert sample(body, 'quizzy_requests_total', endpoint='submit_quiz_responses', status='201') == submitted_before + 1
+    assert sample(body, 'quizzy_requests_total', endpoint='get_quiz_by_share_code', status='404') >= 1
+    assert sample(body, 'quizzy_request_latency_seconds_count', endpoint='submit_quiz_responses') >= 1
+    assert sample(body, 'quizzy_sql_queries_per_request_sum', endpoint='submit_quiz_responses') >= 3
+    assert sample(body, 'quizzy_sql_query_duration_seconds_count', endpoint='submit_quiz_responses') >= 3
+    assert sample(body, 'quizzy_requests_in_progress', endpoint='submit_quiz_responses') == 0
+    assert sample(body, 'quizzy_db_pool_checkout_wait_seconds_count') >= 1
+    assert sample(body, 'quizzy_db_pool_checked_out') is not None
+
+
+def test_failed_statements_are_timed_and_leave_nothing_on_the_connection(app):
+    with app.test_request_context('/api/quizzes'):
+        g.metrics_start, g.sql_queries = 0, 0
+        with db.engine.connect() as conn:
+            with pytest.raises(exc.OperationalError):
+                conn.execute(text('SELECT * FROM no_such_table'))
+            conn.execute(text('SELECT 1'))
+            assert not any(key.startswith('quizzy') for key in conn.info)
+        assert g.sql_queries == 2
+
+
+def test_pool_usage_is_recorded_per_bind(tmp_path, monkeypatch):
+    monkeypatch.setenv('REPLICA_DATABASE_URIS', 'sqlite:///' + str(tmp_path / 'replica.db'))
+    replica_app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'primary.db'), 'TESTING': True})
+    with replica_app.app_context():
+        with db.engines['replica_1'].connect() as conn:
+            conn.execute(text('SELECT 1'))
+        with db.engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+    body = replica_app.test_client().get('/metrics').get_data(as_text=True)
+    assert sample(body, 'quizzy_db_pool_checked_out', bind='primary') is not None
+    assert sample(body, 'quizzy_db_pool_checked_out', bind='replica_1') is not None
@@ -0,0 +1,97 @@
+import sys
+
+import pytest
+
+from app import Quiz
+from cache import CacheBackend, LRUCache, PayloadCache, RedisBackend, make_payload
+
+
+class DictBackend(CacheBackend):
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def test_shared_tier_fills_the_local_tier():
+    shared = DictBackend()
+    writer = PayloadCache(LRUCache(ttl=None), shared=shared)
+    reader = PayloadCache(LRUCache(ttl=None), shared=shared)
+    payload = make_payload(b'{"id": "q1"}')
+
+    writer.set('q1', payload)
+    assert reader.get('q1') == payload
+    assert reader.local.get('q1') == payload
+
+    writer.invalidate('q1')
+    assert shared.data == {}
+
+
+def test_incomplete_backend_cannot_be_created():
+    class NoDelete(CacheBackend):
+        def get(self, key):
+            return None
+
+        def set(self, key, value, ttl):
+            pass
+
+    with pytest.raises(TypeError, match='delete'):
+        NoDelete()
+
+
+def test_redis_backend_without_redis_fails_when_configured(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'redis', None)
+
+    with pytest.raises(RuntimeError, match='pip install redis'):
+        RedisBackend('redis://localhost:6379/0')
+
+
+def test_hot_share_code_reads_do_no_db_work(client, quiz_factory, query_counter):
+    quiz_id = quiz_factory(question_count=3)
+    share_code = Quiz.query.get(quiz_id).share_code
+
+    first = client.get(f'/api/quizzes/share/{share_code}')
+    assert first.status_code == 200
+    assert len(first.get_json()['questions']) == 3
+
+    query_counter.clear()
+    for _ in range(10):
+        assert client.get(f'/api/quizzes/share/{share_code}').data == first.data
+        assert client.get(f'/api/quizzes/{quiz_id}').data == first.data
+    assert query_counter == []
+
+
+def test_if_none_match_returns_304(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    first = client.get(f'/api/quizzes/{quiz_id}')
+    etag = first.headers['ETag']
+
+    second = client.get(f'/api/quizzes/{quiz_id}', headers={'If-None-Match': etag})
+
+    assert second.status_code == 304
+    assert second.data == b''
+
+
+def test_writes_invalidate_cached_payload(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    share_code = Quiz.query.get(quiz_id).share_code
+    etag = client.get(f'/api/quizzes/share/{share_code}').headers['ETag']
+
+    client.put(f'/api/quizzes/{quiz_id}', json={'title': 'Renamed'})
+    renamed = client.get(f'/api/quizzes/share/{share_code}', headers={'If-None-Match': etag})
+    assert renamed.status_code == 200
+    assert renamed.get_json()['title'] == 'Renamed'
+
+    client.post(f'/api/quizzes/{quiz_id}/questions', json={'text': 'Another', 'correct_answer': 'A'})
+    assert len(client.get(f'/api/quizzes/{quiz_id}').get_json()['questions']) == 2
+
+    client.delete(f'/api/quizzes/{quiz_id}')
+    assert client.get(f'/api/quizzes/share/{share_code}').status_code == 404
+    assert client.get(f'/api/quizzes/{quiz_id}').status_code == 404
@@ -0,0 +1,128 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, StaticPool
+
+from metrics import InstrumentedQueuePool
+from pooling import async_engine_options, database_uri, engine_options, init_pool_liveness, pool_profile, pool_stats
+
+POSTGRES = 'postgresql://quizzy@db/quizzy'
+# The db service in docker-compose.yml
+COMPOSE_POSTGRES = 'postgresql://quizzy-admin:test@db:5432/quizzy'
+
+
+def test_profile_defaults_to_the_database_and_can_be_overridden(monkeypatch):
+    assert pool_profile('sqlite:////tmp/quizzy.db') == 'sqlite'
+    assert pool_profile(POSTGRES) == 'direct'
+
+    monkeypatch.setenv('DB_POOL_PROFILE', 'PgBouncer')
+    assert pool_profile(POSTGRES) == 'pgbouncer'
+
+    monkeypatch.setenv('DB_POOL_PROFILE', 'session')
+    with pytest.raises(ValueError):
+        pool_profile(POSTGRES)
+
+
+def test_direct_profile_recycles_and_keeps_alive_without_pre_ping(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '7')
+
+    options = engine_options(POSTGRES)
+
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert options['pool_pre_ping'] is False
+    assert options['pool_size'] == 7
+    assert options['pool_recycle'] == 1800
+    assert options['pool_use_lifo'] is True
+    assert options['connect_args']['keepalives'] == 1
+
+
+def test_pgbouncer_profile_leaves_pooling_to_pgbouncer(monkeypatch):
+    monkeypatch.setenv('DB_POOL_PROFILE', 'pgbouncer')
+
+    assert engine_options(POSTGRES) == {'poolclass': NullPool}
+    async_options = async_engine_options(make_url('postgresql+asyncpg://quizzy@pgbouncer/quizzy'))
+    assert async_options['poolclass'] is NullPool
+    assert async_options['connect_args']['statement_cache_size'] == 0
+    assert async_options['connect_args']['prepared_statement_cache_size'] == 0
+
+
+def test_pgbouncer_profile_builds_an_engine_for_the_compose_database(monkeypatch):
+    pytest.importorskip('psycopg2')
+    monkeypatch.setenv('DB_POOL_PROFILE', 'pgbouncer')
+
+    # Creating the engine imports the driver but opens no connection
+    engine = create_engine(database_uri(COMPOSE_POSTGRES), **engine_options(COMPOSE_POSTGRES))
+
+    assert engine.dialect.driver == 'psycopg2'
+    assert isinstance(engine.pool, NullPool)
+
+
+def test_sqlite_profile():
+    options = engine_options('sqlite:////tmp/quizzy.db')
+    assert options['poolclass'] is InstrumentedQueuePool
+    assert 'pool_recycle' not in options and not options['pool_pre_ping']
+
+    assert engine_options('sqlite://')['poolclass'] is StaticPool
+
+
+def make_engine(tmp_path):
+    return create_engine(
+        'sqlite:///' + str(tmp_path / 'pool.db'), poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0
+    )
+
+
+def test_idle_connections_are_pinged_and_dead_ones_replaced(tmp_path):
+    engine = make_engine(tmp_path)
+    init_pool_liveness(engine, idle_seconds=0.01)
+
+    with engine.connect() as conn:
+        first = conn.connection.dbapi_connection
+    first.close()  # The server went away while the connection sat in the pool
+    time.sleep(0.02)
+
+    with engine.connect() as conn:
+        assert conn.execute(text('SELECT 1')).scalar() == 1
+        assert conn.connection.dbapi_connection is not first
+
+
+def test_recently_used_connections_are_not_pinged(tmp_path, monkeypatch):
+    engine = make_engine(tmp_path)
+    init_pool_liveness(engine, idle_seconds=60)
+    pings = []
+    monkeypatch.setattr(engine.dialect, 'do_ping', lambda dbapi_connection: pings.append(dbapi_connection))
+
+    for _ in range(3):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+    assert pings == []
+
+
+def test_pool_stats_report_usage_and_waits(tmp_path):
+    engine = make_engine(tmp_path)
+
+    with engine.connect():
+        stats = pool_stats(engine, 'sqlite')
+
+    assert stats['profile'] == 'sqlite'
+    assert (stats['size'], stats['checked_out'], stats['checkouts']) == (1, 1, 1)
+    assert stats['wait_seconds_max'] >= 0
+    assert pool_stats(engine, 'sqlite')['checked_out'] == 0
+
+
+def test_admin_pool_endpoint_needs_the_admin_token(app, client, monkeypatch):
+    assert client.get('/api/admin/pool').status_code == 404
+
+    monkeypatch.setitem(app.config, 'ADMIN_TOKEN', 'secret')
+    assert client.get('/api/admin/pool').status_code == 401
+    assert client.get('/api/admin/pool', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+
+    client.get('/api/quizzes')
+    response = client.get('/api/admin/pool', headers={'Authorization': 'Bearer secret'})
+    assert response.status_code == 200
+    stats = response.get_json()['default']
+    assert stats['profile'] == 'sqlite'
+    assert stats['pool'] == 'InstrumentedQueuePool'
+    assert stats['checkouts'] >= 1
@@ -0,0 +1,81 @@
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+import query_budget
+from app import QuizAttempt, QuizResponse, Quiz
+from query_budget import QueryBudget, QueryBudgetExceeded, budget_violations, init_query_budget
+
+
+def test_budget_violations_reports_count_and_repeats():
+    statements = ['SELECT quiz'] + ['SELECT question WHERE quiz_id = ?'] * 5
+
+    assert budget_violations(statements, QueryBudget(6)) == [
+        'ran the same statement 5 times (likely N+1): SELECT question WHERE quiz_id = ?'
+    ]
+    violations = budget_violations(statements, QueryBudget(2, max_repeats=5))
+    assert violations == ['ran 6 SQL statements, over its budget of 2']
+    assert budget_violations(statements, QueryBudget(max_repeats=5)) == []
+
+
+def make_app(mode):
+    engine = create_engine('sqlite://')
+    test_app = Flask(__name__)
+    test_app.config['TESTING'] = True
+
+    @test_app.route('/lookups/<int:count>')
+    @query_budget.query_budget(2)
+    def lookups(count):
+        with engine.connect() as conn:
+            for _ in range(count):
+                conn.execute(text('SELECT 1'))
+        return 'ok'
+
+    init_query_budget(test_app, mode=mode)
+    return test_app
+
+
+def test_raise_mode_fails_requests_over_budget():
+    client = make_app('raise').test_client()
+
+    assert client.get('/lookups/2').status_code == 200
+    with pytest.raises(QueryBudgetExceeded, match='over its budget of 2'):
+        client.get('/lookups/3')
+
+
+def test_warn_mode_logs_and_serves_the_response(monkeypatch):
+    warnings = []
+    monkeypatch.setattr(query_budget.logger, 'warning', lambda message, **kwargs: warnings.append(message))
+    client = make_app('warn').test_client()
+
+    assert client.get('/lookups/5').status_code == 200
+    assert warnings == [
+        'lookups ran 5 SQL statements, over its budget of 2',
+        'lookups ran the same statement 5 times (likely N+1): SELECT 1'
+    ]
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        init_query_budget(Flask(__name__), mode='strict')
+
+
+def test_endpoints_are_checked_against_their_declared_budget(app, client, quiz_factory, monkeypatch):
+    quiz_id = quiz_factory()
+    monkeypatch.setattr(app.view_functions['get_quiz'], 'query_budget', QueryBudget(1))
+
+    with pytest.raises(QueryBudgetExceeded, match='get_quiz'):
+        client.get(f'/api/quizzes/{quiz_id}')
+
+
+def test_delete_quiz_does_not_load_answers_per_attempt(client, submit, quiz_factory, query_counter):
+    quiz_id = quiz_factory()
+    for i in range(10):
+        submit(quiz_id, email=f'taker{i}@example.com')
+    query_counter.clear()
+
+    assert client.delete(f'/api/quizzes/{quiz_id}').status_code == 200
+    assert len(query_counter) <= 6
+    assert Quiz.query.get(quiz_id) is None
+    assert QuizAttempt.query.filter_by(quiz_id=quiz_id).count() == 0
+    assert QuizResponse.query.filter_by(quiz_id=quiz_id).count() == 0
@@ -0,0 +1,155 @@
+import io
+import json
+
+from app import Question, Quiz, QuizAttempt, User, db, import_quizzes
+from quiz_transfer import QUIZ_CSV_FIELDS
+
+
+def export(client, export_format='ndjson', **params):
+    response = client.get('/api/quizzes/export', query_string={'format': export_format, **params})
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def import_body(client, body, import_format='ndjson', **params):
+    return client.post('/api/quizzes/import', query_string={'format': import_format, **params}, data=body.encode())
+
+
+def wipe_quizzes():
+    Question.query.delete()
+    Quiz.query.delete()
+    db.session.commit()
+
+
+def snapshot():
+    return sorted(
+        (quiz.id, quiz.title, quiz.share_code, quiz.user_id,
+         tuple((q.id, q.text, q.order, tuple(q.options), q.correct_answer, q.points)
+               for q in sorted(quiz.questions, key=lambda q: q.order)))
+        for quiz in Quiz.query.all()
+    )
+
+
+def test_ndjson_export_nests_questions_in_order(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=3)
+    quiz_factory(question_count=0)
+
+    lines = export(client).splitlines()
+    records = [json.loads(line) for line in lines]
+
+    assert len(records) == 2
+    # Written by serialization.dumps, as the other exports: compact, keys in field order
+    assert lines[0].startswith('{"id":')
+    record = next(r for r in records if r['id'] == quiz_id)
+    assert record['user_email'] == 'owner@example.com'
+    assert [q['order'] for q in record['questions']] == [1, 2, 3]
+
+
+def test_round_trip_recreates_quizzes(client, quiz_factory):
+    for export_format in ('ndjson', 'csv'):
+        quiz_factory(question_count=3)
+        quiz_factory(question_count=0)
+        before = snapshot()
+        body = export(client, export_format)
+        wipe_quizzes()
+
+        summary = import_body(client, body, export_format).get_json()
+
+        assert summary['error_count'] == 0
+        assert snapshot() == before
+        wipe_quizzes()
+
+
+def test_import_upserts_on_id(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    record = json.loads(export(client))
+    record['title'] = 'Renamed'
+    record['questions'][0]['text'] = 'Edited'
+    record['questions'].append({'id': 'new-question', 'text': 'Added', 'correct_answer': 'B', 'order': 3})
+
+    summary = import_body(client, json.dumps(record) + '\n').get_json()
+
+    assert summary['quizzes'] == 1
+    assert summary['questions'] == 3
+    assert Quiz.query.count() == 1
+    assert db.session.get(Quiz, quiz_id).title == 'Renamed'
+    assert [q.text for q in Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order)] == \
+        ['Edited', 'Question 2', 'Added']
+
+
+def test_import_keeps_attempts_of_updated_quizzes(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+    submit(quiz_id)
+
+    import_body(client, export(client))
+
+    assert QuizAttempt.query.filter_by(quiz_id=quiz_id).count() == 1
+
+
+def test_invalid_records_are_reported_and_skipped(client, quiz_factory):
+    quiz_factory(question_count=1)
+    good = export(client).strip()
+    wipe_quizzes()
+    body = '\n'.join([
+        good,
+        '{not json',
+        json.dumps({'title': 'No owner', 'user_email': 'nobody@example.com'}),
+        json.dumps({'title': 'Bad question', 'user_email': 'owner@example.com', 'questions': [{'text': 'x'}]}),
+    ]) + '\n'
+
+    summary = import_body(client, body).get_json()
+
+    assert summary['quizzes'] == 1
+    assert [error['line'] for error in summary['errors']] == [2, 4, 3]
+    assert 'question 0' in summary['errors'][1]['error']
+
+
+def test_owner_override_and_share_code_conflicts(client, quiz_factory):
+    quiz_factory(question_count=1)
+    record = json.loads(export(client))
+    taken_code = record['share_code']
+    db.session.add(User(username='newowner', email='new@example.com'))
+    db.session.commit()
+    record['id'] = 'copied-quiz'
+    record['questions'][0]['id'] = 'copied-question'
+
+    import_body(client, json.dumps(record) + '\n', owner_email='new@example.com')
+
+    copy = db.session.get(Quiz, 'copied-quiz')
+    assert copy.creator.email == 'new@example.com'
+    assert copy.share_code != taken_code
+    assert import_body(client, '', owner_email='missing@example.com').status_code == 404
+
+
+def test_import_works_in_small_batches(app):
+    db.session.add(User(username='owner', email='owner@example.com'))
+    db.session.commit()
+    lines = [json.dumps({
+        'id': f'quiz-{i}', 'title': f'Quiz {i}', 'user_email': 'owner@example.com',
+        'questions': [{'text': f'Q{j}', 'correct_answer': 'A'} for j in range(3)]
+    }) + '\n' for i in range(10)]
+
+    summary = import_quizzes(io.StringIO(''.join(lines)), 'ndjson', batch_size=4)
+
+    assert summary['quizzes'] == 10
+    assert Question.query.count() == 30
+
+
+def test_csv_header_is_documented_fields(client, quiz_factory):
+    quiz_factory(question_count=1)
+
+    assert export(client, 'csv').splitlines()[0].split(',') == QUIZ_CSV_FIELDS
+
+
+def test_cli_round_trip(app, quiz_factory, tmp_path):
+    quiz_factory(question_count=2)
+    before = snapshot()
+    path = tmp_path / 'bank.ndjson'
+    runner = app.test_cli_runner()
+
+    runner.invoke(args=['export-quizzes', '--output', str(path)])
+    wipe_quizzes()
+    result = runner.invoke(args=['import-quizzes', '--input', str(path)])
+
+    assert 'Imported 1 quizzes and 2 questions' in result.output
+    assert snapshot() == before
@@ -0,0 +1,102 @@
+def test_quiz_listing_counts_questions_in_one_query(client, quiz_factory, query_counter):
+    sizes = [0, 2, 5]
+    quiz_ids = [quiz_factory(question_count=n) for n in sizes]
+    quiz_factory(question_count=3, is_public=False)
+
+    query_counter.clear()
+    response = client.get('/api/quizzes')
+
+    assert response.status_code == 200
+    counts = {quiz['id']: quiz['question_count'] for quiz in response.get_json()}
+    assert counts == dict(zip(quiz_ids, sizes))
+    assert len(query_counter) == 1
+
+
+def collect_pages(client, url):
+    items, pages, cursor = [], 0, None
+    while True:
+        response = client.get(url, query_string={'limit': 2, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200
+        items.extend(response.get_json())
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return items, pages
+
+
+def test_quiz_listing_keyset_pagination(client, quiz_factory):
+    quiz_ids = [quiz_factory(question_count=1) for _ in range(5)]
+
+    items, pages = collect_pages(client, '/api/quizzes')
+
+    assert pages == 3
+    assert sorted(q['id'] for q in items) == sorted(quiz_ids)
+    assert [q['created_at'] for q in items] == sorted((q['created_at'] for q in items), reverse=True)
+
+
+def test_quiz_listing_field_projection(client, quiz_factory, query_counter):
+    quiz_factory(question_count=2)
+
+    query_counter.clear()
+    response = client.get('/api/quizzes?fields=title,question_count')
+
+    assert response.get_json() == [{'title': 'Quiz', 'question_count': 2}]
+    assert 'description' not in query_counter[0]
+
+
+def test_listing_rejects_bad_parameters(client):
+    assert client.get('/api/quizzes?limit=abc').status_code == 400
+    assert client.get('/api/quizzes?cursor=not-a-cursor').status_code == 400
+    assert client.get('/api/users?fields=password').status_code == 400
+
+
+def test_user_listing_pagination(client, quiz_factory):
+    for i in range(3):
+        quiz_factory(question_count=0, email=f'user{i}@example.com')
+
+    items, pages = collect_pages(client, '/api/users')
+
+    assert pages == 2
+    assert sorted(u['email'] for u in items) == [f'user{i}@example.com' for i in range(3)]
+
+
+def test_quiz_responses_pagination(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    for i in range(3):
+        submit(quiz_id, ['A', 'B'], name=f'Taker {i}', email=f'taker{i}@example.com')
+
+    first = client.get(f'/api/quizzes/{quiz_id}/responses?limit=2').get_json()
+    assert first['total_attempts'] == 3
+    assert len(first['user_responses']) == 2
+    assert first['user_responses'][0]['correct_answers'] == 1
+    assert first['user_responses'][0]['percentage'] == 50
+
+    second = client.get(f'/api/quizzes/{quiz_id}/responses?limit=2&cursor={first["next_cursor"]}').get_json()
+    assert len(second['user_responses']) == 1
+    assert second['next_cursor'] is None
+    emails = {u['user_email'] for u in first['user_responses'] + second['user_responses']}
+    assert emails == {f'taker{i}@example.com' for i in range(3)}
+
+
+def test_force_deleting_a_user_removes_their_quizzes(client, submit, quiz_factory):
+    from app import Question, Quiz, QuizAttempt, QuizResponse, QuizScoreBucket, User
+
+    owned = [quiz_factory(question_count=2), quiz_factory(question_count=1)]
+    kept = quiz_factory(question_count=1, email='other@example.com')
+    for quiz_id in owned + [kept]:
+        submit(quiz_id)
+    client.get(f'/api/quizzes/{owned[0]}')
+
+    confirm = client.delete('/api/users?user_email=owner@example.com')
+    assert confirm.status_code == 409
+    assert confirm.get_json()['quiz_count'] == 2
+
+    response = client.delete('/api/users?user_email=owner@example.com&force=true')
+
+    assert response.status_code == 200
+    assert response.get_json()['cascaded_deletions'] == {'quizzes_deleted': 2, 'quiz_titles': ['Quiz', 'Quiz']}
+    assert User.query.filter_by(email='owner@example.com').count() == 0
+    assert [quiz.id for quiz in Quiz.query.all()] == [kept]
+    for model in (Question, QuizAttempt, QuizResponse, QuizScoreBucket):
+        assert {row.quiz_id for row in model.query.all()} == {kept}
+    assert client.get(f'/api/quizzes/{owned[0]}').status_code == 404
@@ -0,0 +1,152 @@
+import pytest
+from sqlalchemy import insert
+
+from app import API_CORS_ORIGINS, Quiz, User, create_app, db, quiz_payload_cache, share_code_cache
+from replicas import STICKY_HEADER, ReplicaSet, primary_reads, replica_reads
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """An app on a primary and one replica, two SQLite files that are never synced"""
+    monkeypatch.setenv('REPLICA_DATABASE_URIS', 'sqlite:///' + str(tmp_path / 'replica.db'))
+    monkeypatch.setenv('REPLICA_LAG_CHECK_INTERVAL', '0')
+    replica_app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'primary.db'), 'TESTING': True})
+    with replica_app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica_1'])
+        quiz_payload_cache.clear()
+        share_code_cache.clear()
+        yield replica_app
+        db.session.remove()
+    quiz_payload_cache.clear()
+    share_code_cache.clear()
+
+
+def add_quiz(engine, title, share_code):
+    """Insert a public quiz, and its owner, straight into one database"""
+    with engine.begin() as conn:
+        conn.execute(insert(User).values(id=f'u-{share_code}', username=share_code, email=f'{share_code}@example.com'))
+        conn.execute(insert(Quiz).values(
+            id=f'q-{share_code}', title=title, is_public=True, share_code=share_code, user_id=f'u-{share_code}'
+        ))
+    return f'q-{share_code}'
+
+
+def titles(response):
+    return [quiz['title'] for quiz in response.get_json()]
+
+
+def test_read_only_routes_read_from_the_replica(replica_app):
+    add_quiz(db.engines['replica_1'], 'On the replica', 'REPLICA1')
+    client = replica_app.test_client()
+
+    assert titles(client.get('/api/quizzes')) == ['On the replica']
+    assert client.get('/api/quizzes/q-REPLICA1/questions').get_json() == []
+
+
+def test_writes_go_to_the_primary(replica_app):
+    client = replica_app.test_client()
+
+    response = client.post('/api/users', json={'username': 'writer', 'email': 'writer@example.com'})
+
+    assert response.status_code == 201
+    assert User.query.filter_by(email='writer@example.com').count() == 1
+    with replica_reads():
+        assert User.query.filter_by(email='writer@example.com').count() == 0
+
+
+def test_client_reads_its_own_writes_from_the_primary(replica_app):
+    writer = replica_app.test_client()
+    writer.post('/api/users', json={'username': 'writer', 'email': 'writer@example.com'})
+    created = writer.post('/api/quizzes', json={'title': 'Just created', 'user_email': 'writer@example.com'})
+
+    assert created.status_code == 201
+    assert created.headers.get('Set-Cookie') is None
+    sticky = {STICKY_HEADER: created.headers[STICKY_HEADER]}
+    assert titles(writer.get('/api/quizzes', headers=sticky)) == ['Just created']
+    # Without the header, reads go to the replica, which has not caught up
+    assert titles(writer.get('/api/quizzes')) == []
+    # A value further ahead than a write could have set is ignored
+    assert titles(writer.get('/api/quizzes', headers={STICKY_HEADER: '9999999999'})) == []
+
+
+def test_cross_origin_client_lists_its_new_quiz(replica_app):
+    """The web client's flow: another origin, no cookies, the header echoed from an interceptor"""
+    origin = {'Origin': API_CORS_ORIGINS[0]}
+    client = replica_app.test_client(use_cookies=False)
+    client.post('/api/users', json={'username': 'writer', 'email': 'writer@example.com'}, headers=origin)
+
+    created = client.post('/api/quizzes', json={'title': 'Just created', 'user_email': 'writer@example.com'},
+                          headers=origin)
+    assert created.status_code == 201
+    assert STICKY_HEADER in created.headers['Access-Control-Expose-Headers'].split(', ')
+
+    preflight = client.options('/api/quizzes', headers={
+        **origin, 'Access-Control-Request-Method': 'GET', 'Access-Control-Request-Headers': STICKY_HEADER.lower()
+    })
+    assert STICKY_HEADER.lower() in preflight.headers['Access-Control-Allow-Headers'].lower()
+
+    listing = f"/api/quizzes?user_id={created.get_json()['user_id']}"
+    sticky = {**origin, STICKY_HEADER: created.headers[STICKY_HEADER]}
+    assert titles(client.get(listing, headers=sticky)) == ['Just created']
+    assert titles(client.get(listing, headers=origin)) == []
+
+
+def test_miss_on_the_replica_is_retried_on_the_primary(replica_app):
+    add_quiz(db.engine, 'Only on the primary', 'PRIMARY1')
+    client = replica_app.test_client()
+
+    response = client.get('/api/quizzes/share/PRIMARY1')
+
+    assert response.status_code == 200
+    assert response.get_json()['title'] == 'Only on the primary'
+    assert client.get('/api/quizzes/share/NOWHERE1').status_code == 404
+
+
+def test_lagging_or_unreachable_replica_is_skipped(replica_app):
+    add_quiz(db.engine, 'On the primary', 'PRIMARY1')
+    add_quiz(db.engines['replica_1'], 'On the replica', 'REPLICA1')
+    replicas = replica_app.extensions['replicas']
+    client = replica_app.test_client()
+
+    replicas.probe = lambda engine: replicas.max_lag + 1
+    assert titles(client.get('/api/quizzes')) == ['On the primary']
+
+    def unreachable(engine):
+        raise ConnectionError('replica down')
+    replicas.probe = unreachable
+    assert titles(client.get('/api/quizzes')) == ['On the primary']
+
+    replicas.probe = lambda engine: 0.0
+    assert titles(client.get('/api/quizzes')) == ['On the replica']
+
+
+def test_routing_per_transaction(replica_app):
+    add_quiz(db.engines['replica_1'], 'On the replica', 'REPLICA1')
+
+    assert Quiz.query.count() == 0
+    with replica_reads():
+        assert Quiz.query.count() == 1
+        with primary_reads():
+            assert Quiz.query.count() == 0
+        # Flushes inside a replica block still go to the primary
+        db.session.add(User(username='writer', email='writer@example.com'))
+        db.session.commit()
+        assert User.query.filter_by(email='writer@example.com').count() == 0
+    assert User.query.filter_by(email='writer@example.com').count() == 1
+
+
+def test_lag_checks_are_cached_for_the_interval():
+    calls = []
+    replicas = ReplicaSet({'replica_1': 'engine'}, max_lag=5, check_interval=60, probe=lambda e: calls.append(e) or 1.0)
+
+    assert replicas.choose() == 'engine'
+    assert replicas.choose() == 'engine'
+    assert calls == ['engine']
+
+
+def test_app_without_replicas_reads_from_the_primary(client, quiz_factory):
+    quiz_factory()
+
+    assert len(client.get('/api/quizzes').get_json()) == 1
+    assert STICKY_HEADER not in client.post('/api/users', json={'username': 'a', 'email': 'a@example.com'}).headers
@@ -0,0 +1,73 @@
+from collections import Counter
+
+from sqlalchemy import func
+
+from app import db, Quiz, Question, QuizAttempt, QuizResponse, QuizScoreBucket, User
+from grading import build_answer_key, grade_responses
+from seeding import SeedPlan, generate
+
+
+def collect(plan):
+    codes = iter(range(10 ** 6))
+    tables = {}
+    for table, rows in generate(plan, lambda: f'{next(codes):08d}'):
+        tables.setdefault(table, []).extend(rows)
+    return tables
+
+
+def test_same_seed_gives_same_data():
+    plan = SeedPlan(users=20, quizzes=10, questions_per_quiz=5, attempts=200, seed=7)
+    first, second = collect(plan), collect(plan)
+    assert first['quiz_response'] == second['quiz_response']
+    assert collect(SeedPlan(20, 10, 5, 200, seed=8))['quiz'] != first['quiz']
+
+
+def test_batches_respect_batch_size_and_foreign_key_order():
+    plan = SeedPlan(users=30, quizzes=12, questions_per_quiz=4, attempts=300, batch_size=50, chunk_size=5)
+    seen = set()
+    order = []
+    for table, rows in generate(plan, iter(range(100)).__next__):
+        assert 0 < len(rows) <= 50
+        if table == 'question':
+            assert {row['quiz_id'] for row in rows} <= seen
+        if table == 'quiz':
+            seen.update(row['id'] for row in rows)
+        order.append(table)
+    assert order[0] == 'user' and order.index('quiz') < order.index('question') < order.index('quiz_attempt')
+
+
+def test_attempts_are_skewed_towards_a_few_quizzes():
+    tables = collect(SeedPlan(users=200, quizzes=100, questions_per_quiz=3, attempts=5000, seed=1))
+    per_quiz = Counter(row['quiz_id'] for row in tables['quiz_attempt']).most_common()
+    assert sum(count for _, count in per_quiz[:10]) > 5000 / 2
+
+
+def test_seed_data_command_writes_consistent_rows(app):
+    result = app.test_cli_runner().invoke(args=[
+        'seed-data', '--users', '25', '--quizzes', '15', '--questions-per-quiz', '4', '--attempts', '120', '--seed', '3'
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert User.query.count() == 25
+    assert Quiz.query.count() == 15
+    assert QuizAttempt.query.count() == 120
+    assert len({quiz.share_code for quiz in Quiz.query}) == 15
+    # Score buckets match the attempts written
+    assert db.session.query(func.sum(QuizScoreBucket.attempts)).scalar() == 120
+
+    # Every stored score is what grading the stored answers gives
+    attempt = QuizAttempt.query.order_by(QuizAttempt.id).first()
+    key = build_answer_key(db.session.query(Question.id, Question.correct_answer, Question.points)
+                           .filter(Question.quiz_id == attempt.quiz_id))
+    answers = [{'question_id': r.question_id, 'answer': r.answer} for r in QuizResponse.query.filter_by(attempt_id=attempt.id)]
+    graded = grade_responses(key, answers)
+    assert (graded.correct_answers, graded.total_points, graded.percentage) == \
+        (attempt.correct_answers, attempt.points_earned, attempt.percentage)
+    assert len(answers) == attempt.total_questions
+
+
+def test_create_dummy_data_allows_more_quizzes_than_titles(app):
+    result = app.test_cli_runner().invoke(args=['create-dummy-data', '--users', '2', '--quizzes', '12'])
+
+    assert result.exit_code == 0, result.output
+    assert Quiz.query.count() == 12
@@ -0,0 +1,76 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+import serialization
+from app import Question, Quiz, QuizAttempt, db
+from serialization import PUBLIC_QUESTION, QUIZ, QUIZ_ATTEMPT, Schema, dumps, loads
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def encoder(request, monkeypatch):
+    """Run a test with orjson and again with the standard library fallback"""
+    if request.param == 'orjson':
+        pytest.importorskip('orjson')
+    else:
+        monkeypatch.setattr(serialization, 'orjson', None)
+    return request.param
+
+
+def test_dumps_writes_compact_sorted_json_with_iso_datetimes(encoder):
+    value = {'b': datetime(2026, 1, 2, 3, 4, 5), 'a': [datetime(2026, 1, 2, 3, 4, 5, 120)], 'c': Decimal('1.5'), 'd': 'é'}
+
+    assert dumps(value) == '{"a":["2026-01-02T03:04:05.000120"],"b":"2026-01-02T03:04:05","c":"1.5","d":"é"}'.encode()
+    assert dumps({'b': 1, 'a': 2}, sort_keys=False) == b'{"b":1,"a":2}'
+    assert loads(b'{"a": [1, "\\u00e9"]}') == {'a': [1, 'é']}
+
+
+def test_schema_reads_objects_and_rows_alike(app, quiz_factory):
+    quiz_id = quiz_factory(question_count=2)
+    quiz = db.session.get(Quiz, quiz_id)
+    row = db.session.execute(select(*QUIZ.columns(Quiz)).where(Quiz.id == quiz_id)).one()
+
+    assert QUIZ.dump(quiz) == QUIZ.dump(row) == QUIZ.dump_rows([row])[0]
+    assert list(QUIZ.dump(quiz)) == list(QUIZ.fields)
+    assert QUIZ.dump(quiz)['created_at'] == quiz.created_at
+
+    questions = Question.query.filter_by(quiz_id=quiz_id).order_by(Question.order).all()
+    rows = db.session.execute(
+        select(*PUBLIC_QUESTION.columns(Question)).where(Question.quiz_id == quiz_id).order_by(Question.order)
+    ).all()
+    assert PUBLIC_QUESTION.dump_many(questions) == PUBLIC_QUESTION.dump_rows(rows)
+    assert 'correct_answer' not in PUBLIC_QUESTION.dump(questions[0])
+
+
+def test_renamed_fields_are_read_from_their_source():
+    class Attempt:
+        id = 'a1'
+        user_name, user_email, user_phone = 'Ann', 'ann@example.com', None
+        submitted_at = datetime(2026, 1, 1)
+        total_points = points_earned = correct_answers = total_questions = percentage = 0
+
+    assert QUIZ_ATTEMPT.dump(Attempt())['attempt_id'] == 'a1'
+    assert 'id' not in QUIZ_ATTEMPT.dump(Attempt())
+    assert QUIZ_ATTEMPT.columns(QuizAttempt)[0].name == 'attempt_id'
+
+
+def test_projections_keep_the_requested_order_and_sources():
+    projection = QUIZ_ATTEMPT.only(['percentage', 'attempt_id'])
+
+    assert projection.fields == ('percentage', 'attempt_id')
+    assert projection.sources == ('percentage', 'id')
+    assert QUIZ_ATTEMPT.only(['percentage', 'attempt_id']) is projection
+    assert Schema('id').dump_rows([('x', 'ignored')]) == [{'id': 'x'}]
+
+
+def test_jsonify_and_request_bodies_use_the_encoder(client, encoder):
+    created = client.post('/api/users', json={'username': 'ann', 'email': 'ann@example.com'})
+
+    body = created.get_data()
+    assert body.endswith(b'}\n')
+    assert json.loads(body)['created_at'] == datetime.fromisoformat(json.loads(body)['created_at']).isoformat()
+    assert list(json.loads(body)) == sorted(json.loads(body))
+    assert client.post('/api/users', data=b'{not json', content_type='application/json').status_code == 400
@@ -0,0 +1,76 @@
+import app as app_module
+from app import Quiz, User, db, reserve_share_code_block
+from share_codes import SHARE_CODE_ALPHABET, SHARE_CODE_LENGTH, ShareCodeAllocator, encode_share_code
+
+
+def test_codes_are_distinct_and_well_formed():
+    codes = [encode_share_code(n, b'key') for n in range(20000)]
+
+    assert len(set(codes)) == len(codes)
+    assert all(len(code) == SHARE_CODE_LENGTH and set(code) <= set(SHARE_CODE_ALPHABET) for code in codes)
+
+
+def test_codes_depend_on_the_key():
+    assert encode_share_code(1, b'one') != encode_share_code(1, b'two')
+
+
+def test_allocator_reserves_one_block_per_block_size():
+    reserved = []
+
+    def reserve_block(size):
+        reserved.append(size)
+        return (len(reserved) - 1) * size
+
+    allocator = ShareCodeAllocator(reserve_block, key='key', block_size=10)
+    codes = [allocator.next_code() for _ in range(25)]
+
+    assert reserved == [10, 10, 10]
+    assert codes == [encode_share_code(n, b'key') for n in range(25)]
+
+
+def test_allocator_drops_its_block_after_a_fork(monkeypatch):
+    starts = iter([0, 100])
+    allocator = ShareCodeAllocator(lambda size: next(starts), key='key', block_size=100)
+    allocator.next_code()
+
+    monkeypatch.setattr(app_module.os, 'getpid', lambda: -1)
+
+    assert allocator.next_code() == encode_share_code(100, b'key')
+
+
+def test_counter_blocks_do_not_overlap(app):
+    first = reserve_share_code_block(50)
+    second = reserve_share_code_block(50)
+
+    assert first == 0
+    assert second == 50
+
+
+def create_quiz(client, title='Quiz'):
+    if not User.query.filter_by(email='owner@example.com').first():
+        db.session.add(User(username='owner', email='owner@example.com'))
+        db.session.commit()
+    return client.post('/api/quizzes', json={'title': title, 'user_email': 'owner@example.com'})
+
+
+def test_create_quiz_does_not_look_up_share_codes(client, query_counter):
+    create_quiz(client)
+
+    query_counter.clear()
+    response = create_quiz(client)
+
+    assert response.status_code == 201
+    assert not any('quiz.share_code =' in statement for statement in query_counter)
+
+
+def test_colliding_share_code_is_retried(client, monkeypatch):
+    taken = create_quiz(client, 'First').get_json()['share_code']
+    real_next_code = app_module.share_code_allocator.next_code
+    codes = iter([taken])
+    monkeypatch.setattr(app_module.share_code_allocator, 'next_code', lambda: next(codes, None) or real_next_code())
+
+    response = create_quiz(client, 'Second')
+
+    assert response.status_code == 201
+    assert response.get_json()['share_code'] != taken
+    assert Quiz.query.count() == 2
@@ -0,0 +1,95 @@
+from app import QuizScoreBucket, write_queued_attempts
+from stats import histogram, percentile, score_summary
+
+
+def answers(correct, questions):
+    """The first `correct` of `questions` answered right"""
+    return ['A'] * correct + ['B'] * (questions - correct)
+
+
+def test_percentile_uses_nearest_rank():
+    buckets = [(20, 1), (50, 2), (100, 1)]
+
+    assert percentile(buckets, 25) == 20
+    assert percentile(buckets, 50) == 50
+    assert percentile(buckets, 75) == 50
+    assert percentile(buckets, 99) == 100
+    assert percentile([], 50) is None
+
+
+def test_histogram_puts_full_marks_in_the_last_bin():
+    bins = histogram([(0, 1), (95, 2), (100, 3)])
+
+    assert len(bins) == 10
+    assert bins[0] == {'min_percentage': 0, 'max_percentage': 9, 'attempts': 1}
+    assert bins[-1] == {'min_percentage': 90, 'max_percentage': 100, 'attempts': 5}
+
+
+def test_summary_of_no_attempts():
+    summary = score_summary([])
+
+    assert summary['attempts'] == 0
+    assert summary['mean_percentage'] is None
+    assert summary['percentiles']['p50'] is None
+
+
+def test_stats_are_updated_on_each_submission(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=4)
+    for name, correct in [('a', 4), ('b', 2), ('c', 2), ('d', 0)]:
+        submit(quiz_id, answers(correct, 4), name=name)
+
+    body = client.get(f'/api/quizzes/{quiz_id}/stats').get_json()
+
+    assert body['attempts'] == 4
+    assert body['mean_percentage'] == 50
+    assert body['min_percentage'] == 0
+    assert body['max_percentage'] == 100
+    assert body['percentiles']['p50'] == 50
+    assert [b['attempts'] for b in body['histogram'] if b['attempts']] == [1, 2, 1]
+
+
+def test_stats_read_only_the_score_buckets(client, submit, quiz_factory, query_counter):
+    quiz_id = quiz_factory(question_count=2)
+    for i in range(5):
+        submit(quiz_id, answers(i % 3, 2), name=f'taker{i}')
+
+    query_counter.clear()
+    client.get(f'/api/quizzes/{quiz_id}/stats')
+
+    assert not any('quiz_attempt' in statement for statement in query_counter)
+
+
+def test_leaderboard_ranks_by_percentage_then_points_then_time(client, submit, quiz_factory):
+    quiz_id = quiz_factory(question_count=3)
+    submit(quiz_id, answers(2, 3), name='first')
+    submit(quiz_id, answers(3, 3), name='best')
+    submit(quiz_id, answers(2, 3), name='second')
+    submit(quiz_id, answers(0, 3), name='last')
+
+    body = client.get(f'/api/quizzes/{quiz_id}/leaderboard?limit=3').get_json()
+
+    assert [entry['user_name'] for entry in body['leaderboard']] == ['best', 'first', 'second']
+    assert [entry['rank'] for entry in body['leaderboard']] == [1, 2, 3]
+    assert 'user_email' not in body['leaderboard'][0]
+    # Same fields and timestamp format as the attempt in the responses listing
+    listed = {a['attempt_id']: a for a in client.get(f'/api/quizzes/{quiz_id}/responses').get_json()['user_responses']}
+    for entry in body['leaderboard']:
+        assert {k: v for k, v in entry.items() if k != 'rank'}.items() <= listed[entry['attempt_id']].items()
+
+
+def test_leaderboard_rejects_bad_limit(client, quiz_factory):
+    quiz_id = quiz_factory(question_count=1)
+
+    assert client.get(f'/api/quizzes/{quiz_id}/leaderboard?limit=zero').status_code == 400
+    assert client.get('/api/quizzes/missing/leaderboard').status_code == 404
+
+
+def test_replayed_flush_does_not_count_attempts_twice(app, submit, quiz_factory, queue_mode, submission_queue):
+    quiz_id = quiz_factory(question_count=2)
+    submit(quiz_id, status=202)
+    batch = [payload for _, payload in submission_queue.claim(10)]
+
+    write_queued_attempts(app, batch)
+    write_queued_attempts(app, batch)
+
+    assert QuizScoreBucket.query.filter_by(quiz_id=quiz_id).one().attempts == 1